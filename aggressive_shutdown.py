@@ -2,34 +2,236 @@
 """
 Aggressive SMY02 shutdown - comprehensive FM/RF disable sequence.
 
-Tries multiple disable methods to ensure FM and RF are completely off.
+Resets and mutes the device, then checks LEVEL?/FM?. Only if RF or FM
+is still active does it fall back to trying multiple disable methods.
 Use this if normal shutdown leaves signal present.
+
+The first fallback alias the device accepts in each group is cached per *IDN? in
+~/.smy02_cmdmap.json, so later runs send only the known-good command.
 """
 
+import json
+import re
 import pyvisa
+from pathlib import Path
 from time import sleep
 import logging
 
+from src.visa_cache import get_rm
+from src.visa_sync import sync_write
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
 
+
+# Common-case shutdown: one write, confirmed with *OPC?.
+RESET_CMD = "*CLS;*RST;LEVEL:OFF"
+# The instrument may drop off the bus while resetting; wait this long after
+# RESET_CMD before reading its state back.
+RESET_SETTLE_S = 0.5
+
+# Alternative spellings tried if the reset did not silence the output.
+DISABLE_CMDS = (
+    "OUTP OFF",
+    "OUTP:STAT OFF",
+    "OUTPUT OFF",
+    "SOUR:OUTP OFF",
+    "RFOUT:STATE OFF",
+)
+FM_DISABLE_CMDS = (
+    "FM:OFF",
+    "FM OFF",
+    "FM:STAT OFF",
+    "FM:STATE OFF",
+    "MOD:TYPE OFF",
+    "MOD OFF",
+    "SOUR:MOD:TYPE OFF",
+    "SOUR:MOD OFF",
+)
+LFO_CMDS = (
+    "LFO:STAT OFF",
+    "LFO OFF",
+    "LFO:STATE OFF",
+    "SOUR:LFO:STAT OFF",
+    "SOUR:MOD:LFO:STAT OFF",
+)
+
+# LEVEL -30 unmutes the output, so the defaults end with LEVEL:OFF again.
+DEFAULT_CMDS = (
+    ("RF 100000000", "Reset frequency to 100 MHz"),
+    ("LEVEL -30", "Reset level to -30 dBm"),
+    ("LEVEL:OFF", "Mute output"),
+)
+
+# Verification reads, sent as one compound query. Values of the numeric
+# ones are parsed as floats; LEVEL? answers "LEVEL:OFF" while muted, so it
+# is text.
+VERIFY_QUERIES = (
+    ("RF?", "RF Frequency"),
+    ("LEVEL?", "Output Level"),
+    ("FM?", "FM Status"),
+    ("AF?", "Audio Frequency"),
+    ("*ESR?", "Event Status Register"),
+    ("ERR?", "Error Queue"),
+)
+NUMERIC_QUERIES = frozenset(("RF?", "AF?", "*ESR?"))
+# Not implemented on every firmware; queried separately so an error here
+# cannot spoil the compound read above.
+OPTIONAL_QUERIES = (
+    ("LFO:STAT?", "LFO Status (if exists)"),
+)
+
+# Per-device record of which alias in each group the instrument accepted,
+# keyed by *IDN? so a different unit or firmware is probed afresh.
+CMDMAP_PATH = Path.home() / ".smy02_cmdmap.json"
+
+ESR_COMMAND_ERROR = 0x20
+
+
+def value_only(resp):
+    """
+    Drop the SMY02 response header, e.g. "RF  144.000000E+6" -> ["144.000000E+6"].
+
+    Applied to each field of the compound verification reply after it has
+    been split on ';'.
+    """
+    return resp.split()[-1:]
+
+
+def drain_errors(instr, limit=20):
+    """Read ERR? until the queue reports 0, logging each entry at DEBUG."""
+    try:
+        for _ in range(limit):
+            resp = instr.query("ERR?").strip()
+            code = re.search(r"-?\d+", resp)
+            if code is None or int(code.group()) == 0:
+                return
+            logger.debug(f"  Device error: {resp}")
+    except pyvisa.errors.VisaIOError as e:
+        logger.debug(f"  ERR? failed: {e}")
+
+
+def load_cmdmap():
+    """Load the cached command map, or an empty one if missing/corrupt."""
+    try:
+        return json.loads(CMDMAP_PATH.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cmdmap(cmdmap):
+    """Persist the command map; failure only costs a re-probe next run."""
+    try:
+        CMDMAP_PATH.write_text(json.dumps(cmdmap, indent=2))
+    except OSError as e:
+        logger.debug(f"Could not save command map: {e}")
+
+
+def send_accepted(instr, cmds, known, group):
+    """
+    Send the alias from `cmds` that the device accepts.
+
+    If `known` already records an accepted alias for `group` only that one
+    is sent. Otherwise aliases are tried in order and the first one that
+    does not set the command-error bit in *ESR? is recorded in `known`.
+
+    Returns:
+        The accepted command, or None if every alias was rejected
+    """
+    cached = known.get(group)
+    if cached:
+        logger.info(f"  Sending (cached): {cached}")
+        sync_write(instr, cached)
+        return cached
+
+    # Start from a clean ESR; reading *ESR? below clears it between probes.
+    # Probe outcomes are collected and logged once per group.
+    sync_write(instr, "*CLS")
+    tried = []
+    accepted = None
+    for cmd in cmds:
+        try:
+            instr.write(cmd)
+            esr = int(instr.query("*ESR?").strip().split()[-1])
+        except Exception as e:
+            tried.append(f"{cmd} (exception: {e})")
+            continue
+        tried.append(f"{cmd} (ESR={esr})")
+        if not esr & ESR_COMMAND_ERROR:
+            accepted = cmd
+            known[group] = cmd
+            break
+    logger.info(f"  Probed: {', '.join(tried)}")
+    if accepted is None:
+        logger.warning(f"  No {group} command accepted by device")
+    return accepted
+
+
+def output_is_off(instr):
+    """Return True if LEVEL? reports the RF mute and FM? reports FM off."""
+    try:
+        level, fm = instr.query("LEVEL?;FM?").split(";")
+    except Exception as e:
+        logger.debug(f"Readback after reset failed: {e}")
+        return False
+    return "OFF" in level.upper() and "OFF" in fm.upper()
+
+
+def alias_fallback(instr, idn):
+    """Disable RF, FM and LFO with the alias groups, then set safe defaults and re-mute."""
+    cmdmap = load_cmdmap()
+    known = dict(cmdmap.get(idn, {}))
+    
+    logger.info("STEP 2: Disable RF Output (Multiple Methods)")
+    logger.info("-" * 70)
+    send_accepted(instr, DISABLE_CMDS, known, "rf_off")
+    logger.info("")
+    
+    logger.info("STEP 3: Disable FM Modulation (Multiple Methods)")
+    logger.info("-" * 70)
+    send_accepted(instr, FM_DISABLE_CMDS, known, "fm_off")
+    logger.info("")
+    
+    logger.info("STEP 4: Disable LFO/Tone Generation")
+    logger.info("-" * 70)
+    send_accepted(instr, LFO_CMDS, known, "lfo_off")
+    logger.info("")
+    
+    logger.info("STEP 5: Set Safe Defaults")
+    logger.info("-" * 70)
+    # Writes don't report errors themselves; harvest the error queue once
+    # afterwards, which also waits for the writes to be processed.
+    for cmd, desc in DEFAULT_CMDS:
+        instr.write(cmd)
+    logger.info("  " + "\n  ".join(f"{desc}: {cmd}" for cmd, desc in DEFAULT_CMDS))
+    drain_errors(instr)
+    logger.info("")
+    
+    if known != cmdmap.get(idn):
+        cmdmap[idn] = known
+        save_cmdmap(cmdmap)
+
+
 def aggressive_shutdown():
     """Aggressively disable all RF and modulation on SMY02."""
     
-    rm = pyvisa.ResourceManager()
-    devices = rm.list_resources()
+    rm = get_rm()
     
-    if "GPIB0::28::INSTR" not in devices:
-        logger.error("Device GPIB0::28::INSTR not found")
+    # Open the known address directly instead of enumerating the bus first.
+    try:
+        instr = rm.open_resource("GPIB0::28::INSTR")
+    except pyvisa.errors.VisaIOError as e:
+        logger.error(f"Device GPIB0::28::INSTR not found: {e}")
         return False
     
-    instr = rm.open_resource("GPIB0::28::INSTR")
     instr.timeout = 5000
     instr.read_termination = '\r\n'
     instr.write_termination = '\r\n'
+    # Drain each response in a single low-level read.
+    instr.chunk_size = 65536
     
     try:
         logger.info("=" * 70)
@@ -39,131 +241,51 @@ def aggressive_shutdown():
         idn = instr.query("*IDN?")
         logger.info(f"Device: {idn}\n")
         
-        # ============ STEP 1: DISABLE RF OUTPUT (Multiple Methods) ============
-        logger.info("STEP 1: Disable RF Output")
-        logger.info("-" * 70)
-        
-        disable_cmds = [
-            "OUTP OFF",
-            "OUTP:STAT OFF",
-            "OUTPUT OFF",
-            "SOUR:OUTP OFF",
-            "RFOUT:STATE OFF",
-        ]
-        
-        for cmd in disable_cmds:
-            try:
-                logger.info(f"  Sending: {cmd}")
-                instr.write(cmd)
-                sleep(0.2)
-            except Exception as e:
-                logger.debug(f"    (exception: {e})")
-        
-        logger.info("")
-        
-        # ============ STEP 2: DISABLE FM MODULATION (Multiple Methods) ============
-        logger.info("STEP 2: Disable FM Modulation")
-        logger.info("-" * 70)
-        
-        fm_disable_cmds = [
-            "FM:OFF",
-            "FM OFF",
-            "FM:STAT OFF",
-            "FM:STATE OFF",
-            "MOD:TYPE OFF",
-            "MOD OFF",
-            "SOUR:MOD:TYPE OFF",
-            "SOUR:MOD OFF",
-        ]
-        
-        for cmd in fm_disable_cmds:
-            try:
-                logger.info(f"  Sending: {cmd}")
-                instr.write(cmd)
-                sleep(0.2)
-            except Exception as e:
-                logger.debug(f"    (exception: {e})")
-        
-        logger.info("")
-        
-        # ============ STEP 3: DISABLE LFO/TONE ============
-        logger.info("STEP 3: Disable LFO/Tone Generation")
+        # ============ STEP 1: RESET AND MUTE ============
+        # *RST turns modulation off and restores defaults; LEVEL:OFF is the
+        # actual RF mute on the SMY02. Normally this is all that's needed.
+        logger.info("STEP 1: Reset and Mute")
         logger.info("-" * 70)
+        logger.info(f"  Sending: {RESET_CMD}")
+        sync_write(instr, RESET_CMD)
+        sleep(RESET_SETTLE_S)
         
-        lfo_cmds = [
-            "LFO:STAT OFF",
-            "LFO OFF",
-            "LFO:STATE OFF",
-            "SOUR:LFO:STAT OFF",
-            "SOUR:MOD:LFO:STAT OFF",
-        ]
-        
-        for cmd in lfo_cmds:
-            try:
-                logger.info(f"  Sending: {cmd}")
-                instr.write(cmd)
-                sleep(0.2)
-            except Exception as e:
-                logger.debug(f"    (exception: {e})")
-        
-        logger.info("")
-        
-        # ============ STEP 4: SET SAFE DEFAULTS ============
-        logger.info("STEP 4: Set Safe Defaults")
-        logger.info("-" * 70)
-        
-        default_cmds = [
-            ("RF 100000000", "Reset frequency to 100 MHz"),
-            ("LEVEL -30", "Reset level to -30 dBm"),
-        ]
-        
-        for cmd, desc in default_cmds:
-            try:
-                logger.info(f"  {desc}: {cmd}")
-                instr.write(cmd)
-                sleep(0.2)
-            except Exception as e:
-                logger.debug(f"    (exception: {e})")
-        
-        logger.info("")
-        
-        # ============ STEP 5: RESET AND CLEAR ============
-        logger.info("STEP 5: Reset Device")
-        logger.info("-" * 70)
-        
-        logger.info("  Sending: *RST (reset to factory defaults)")
-        instr.write("*RST")
-        sleep(0.5)
-        
-        logger.info("  Sending: *CLS (clear status)")
-        instr.write("*CLS")
-        sleep(0.2)
-        
-        logger.info("")
+        if output_is_off(instr):
+            logger.info("  RF muted and FM off after reset; skipping alias fallback")
+            logger.info("")
+        else:
+            logger.warning("  RF or FM still active after reset; trying alias fallback")
+            logger.info("")
+            alias_fallback(instr, idn.strip())
         
         # ============ VERIFICATION ============
         logger.info("=" * 70)
         logger.info("VERIFICATION - Final Device State:")
         logger.info("-" * 70)
         
-        sleep(0.5)
-        
-        queries = [
-            ("RF?", "RF Frequency"),
-            ("LEVEL?", "Output Level"),
-            ("FM?", "FM Status"),
-            ("AF?", "Audio Frequency"),
-            ("LFO:STAT?", "LFO Status (if exists)"),
-            ("*ESR?", "Event Status Register"),
-            ("ERR?", "Error Queue"),
-        ]
+        lines = []
+        try:
+            resp = instr.query(";".join(q for q, _ in VERIFY_QUERIES))
+            parts = [p.strip() for p in resp.split(";")]
+        except Exception:
+            parts = []
+        for i, (query, desc) in enumerate(VERIFY_QUERIES):
+            try:
+                value = parts[i]
+                if query in NUMERIC_QUERIES:
+                    value = f"{float(value_only(value)[0]):g}"
+                lines.append(f"  {desc:25s} ({query:15s}): {value}")
+            except (IndexError, ValueError):
+                lines.append(f"  {desc:25s} ({query:15s}): TIMEOUT/ERROR")
         
-        for query, desc in queries:
+        for query, desc in OPTIONAL_QUERIES:
             try:
                 resp = instr.query(query)
-                logger.info(f"  {desc:25s} ({query:15s}): {resp.strip()}")
-            except Exception as e:
-                logger.warning(f"  {desc:25s} ({query:15s}): TIMEOUT/ERROR")
+                lines.append(f"  {desc:25s} ({query:15s}): {resp.strip()}")
+            except Exception:
+                lines.append(f"  {desc:25s} ({query:15s}): TIMEOUT/ERROR")
+        failed = any(line.endswith("TIMEOUT/ERROR") for line in lines)
+        logger.log(logging.WARNING if failed else logging.INFO, "\n".join(lines))
         
         logger.info("")
         logger.info("=" * 70)
@@ -181,9 +303,7 @@ def aggressive_shutdown():
         return True
         
     except Exception as e:
-        logger.error(f"Error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception(f"Error: {e}")
         return False
     finally:
         instr.close()
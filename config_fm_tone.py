@@ -7,33 +7,47 @@ the exact command sequence that worked in the user's session.
 """
 
 import pyvisa
-from time import sleep
 import logging
 
+from src.visa_cache import get_rm
+from src.visa_sync import sync_write
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
 
+
+# Setup sequence from the interactive session, sent as one compound command.
+FM_TONE_CONFIG = (
+    "RF 144000000",
+    "LEVEL -20",
+    "FM:INT 1.000E+3",
+    "AF 1000",
+    "FM:ON",
+    "OUTP ON",
+)
+VERIFY_QUERIES = ("RF?", "LEVEL?", "FM?", "AF?")
+
+
 def configure_smy02_fm_tone():
     """Configure SMY02 for 144 MHz FM with 1 kHz tone."""
     
-    rm = pyvisa.ResourceManager()
-    
-    # List devices
-    devices = rm.list_resources()
-    logger.info(f"Available devices: {devices}")
+    rm = get_rm()
     
-    if "GPIB0::28::INSTR" not in devices:
-        logger.error("Device GPIB0::28::INSTR not found")
+    # Open the known address directly instead of enumerating the bus first.
+    try:
+        instr = rm.open_resource("GPIB0::28::INSTR")
+    except pyvisa.errors.VisaIOError as e:
+        logger.error(f"Device GPIB0::28::INSTR not found: {e}")
         return False
     
-    # Open device
-    instr = rm.open_resource("GPIB0::28::INSTR")
     instr.timeout = 5000
     instr.read_termination = '\r\n'
     instr.write_termination = '\r\n'
+    # Drain each response in a single low-level read.
+    instr.chunk_size = 65536
     
     try:
         # Verify connection
@@ -41,91 +55,28 @@ def configure_smy02_fm_tone():
         logger.info(f"Device ID: {idn}")
         
         # Clear status
-        instr.write("*CLS")
-        sleep(0.1)
+        sync_write(instr, "*CLS")
         
         # Query initial status
         esr = instr.query("*ESR?")
         logger.info(f"Initial *ESR?: {esr}")
         
-        # ============ SET FREQUENCY ============
-        logger.info("Setting frequency to 144 MHz...")
-        instr.write("RF 144000000")
-        sleep(0.2)
-        esr = instr.query("*ESR?")
-        logger.info(f"After RF 144000000: *ESR? = {esr}")
-        
-        # Verify frequency
-        try:
-            rf_resp = instr.query("RF?")
-            logger.info(f"RF? -> {rf_resp}")
-        except Exception as e:
-            logger.warning(f"RF? query timed out or failed: {e}")
-        
-        # ============ SET AMPLITUDE ============
-        logger.info("Setting amplitude to -20 dBm...")
-        instr.write("LEVEL -20")
-        sleep(0.2)
-        esr = instr.query("*ESR?")
-        logger.info(f"After LEVEL -20: *ESR? = {esr}")
-        
-        # Verify amplitude
-        try:
-            level_resp = instr.query("LEVEL?")
-            logger.info(f"LEVEL? -> {level_resp}")
-        except Exception as e:
-            logger.warning(f"LEVEL? query timed out or failed: {e}")
-        
-        # ============ CONFIGURE FM TONE ============
-        logger.info("Configuring FM modulation with 1 kHz tone...")
-        
-        # Set FM tone frequency (method 1: FM:INT)
-        instr.write("FM:INT 1.000E+3")
-        sleep(0.2)
-        esr = instr.query("*ESR?")
-        logger.info(f"After FM:INT 1.000E+3: *ESR? = {esr}")
-        
-        # Verify FM:INT
-        try:
-            fm_resp = instr.query("FM?")
-            logger.info(f"FM? -> {fm_resp}")
-        except Exception as e:
-            logger.warning(f"FM? query timed out: {e}")
-        
-        # Also set via AF (audio frequency / tone frequency)
-        logger.info("Setting audio frequency to 1000 Hz...")
-        instr.write("AF 1000")
-        sleep(0.2)
+        # ============ CONFIGURE (single compound write) ============
+        # SCPI allows chaining commands with ';' so the whole setup
+        # goes out in one GPIB transaction.
+        cfg = ";".join(FM_TONE_CONFIG)
+        logger.info(f"Applying configuration: {cfg}")
+        sync_write(instr, cfg)
         esr = instr.query("*ESR?")
-        logger.info(f"After AF 1000: *ESR? = {esr}")
+        logger.info(f"After configuration: *ESR? = {esr}")
         
-        # Verify AF
+        # ============ VERIFY (single compound query) ============
         try:
-            af_resp = instr.query("AF?")
-            logger.info(f"AF? -> {af_resp}")
+            resp = instr.query(";".join(VERIFY_QUERIES))
+            for query, value in zip(VERIFY_QUERIES, resp.split(";")):
+                logger.info(f"{query} -> {value.strip()}")
         except Exception as e:
-            logger.warning(f"AF? query timed out: {e}")
-        
-        # ============ ENABLE FM ============
-        logger.info("Enabling FM modulation (FM:ON)...")
-        instr.write("FM:ON")
-        sleep(0.2)
-        esr = instr.query("*ESR?")
-        logger.info(f"After FM:ON: *ESR? = {esr}")
-        
-        # Verify FM enabled
-        try:
-            fm_resp = instr.query("FM?")
-            logger.info(f"FM? after FM:ON -> {fm_resp}")
-        except Exception as e:
-            logger.warning(f"FM? query timed out: {e}")
-        
-        # ============ ENABLE RF OUTPUT ============
-        logger.info("Enabling RF output...")
-        instr.write("OUTP ON")
-        sleep(0.2)
-        esr = instr.query("*ESR?")
-        logger.info(f"After OUTP ON: *ESR? = {esr}")
+            logger.warning(f"Verification query timed out or failed: {e}")
         
         logger.info("✓ Configuration complete!")
         logger.info("Device should now output 144 MHz FM with 1 kHz tone at -20 dBm")
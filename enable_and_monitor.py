@@ -7,35 +7,66 @@ This script:
 2. Sets level to -20 dBm
 3. Enables FM modulation with 1 kHz tone
 4. Enables RF output
-5. Stays connected and periodically checks status
+5. Stays connected and reports status when the device requests service
+   (GPIB SRQ), with a periodic heartbeat read as a fallback
 """
 
 import pyvisa
-from time import sleep
+from time import monotonic
 import logging
 import sys
 
+from src.visa_cache import get_rm
+from src.visa_sync import sync_write
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
 
+
+CONFIG_CMDS = (
+    "RF 144000000",
+    "LEVEL -20",
+    "FM:INT 1.000E+3",
+    "AF 1000",
+    "FM:ON",
+    "OUTP ON",
+)
+READBACK_QUERIES = ("RF?", "LEVEL?", "FM?", "AF?", "*ESR?")
+SHUTDOWN_CMDS = ("LEVEL:OFF", "FM:OFF", "OUTP OFF")
+MONITOR_QUERIES = ("*ESR?", "FM?", "RF?", "LEVEL?")
+
+SRQ_WAIT_MS = 30000
+# Read status anyway after this long without an SRQ, for setups where the
+# instrument never asserts SRQ (e.g. not on a GPIB interface).
+HEARTBEAT_S = 60
+
+
+def read_status(instr):
+    """Read the monitored values in one compound query; *ESR? clears the SRQ cause."""
+    resp = instr.query(";".join(MONITOR_QUERIES))
+    return dict(zip(MONITOR_QUERIES, (v.strip() for v in resp.split(";"))))
+
+
 def enable_and_monitor():
     """Configure SMY02 and monitor for TinySA testing."""
     
-    rm = pyvisa.ResourceManager()
-    devices = rm.list_resources()
+    rm = get_rm()
     
-    if "GPIB0::28::INSTR" not in devices:
-        logger.error("Device GPIB0::28::INSTR not found")
+    # Open the known address directly instead of enumerating the bus first.
+    try:
+        instr = rm.open_resource("GPIB0::28::INSTR")
+    except pyvisa.errors.VisaIOError as e:
+        logger.error(f"Device GPIB0::28::INSTR not found: {e}")
         return False
     
-    # Open device
-    instr = rm.open_resource("GPIB0::28::INSTR")
     instr.timeout = 5000
     instr.read_termination = '\r\n'
     instr.write_termination = '\r\n'
+    # Drain each response in a single low-level read.
+    instr.chunk_size = 65536
     
     try:
         logger.info("=" * 70)
@@ -47,54 +78,22 @@ def enable_and_monitor():
         logger.info(f"Device: {idn}\n")
         
         # Clear status
-        instr.write("*CLS")
-        sleep(0.1)
+        sync_write(instr, "*CLS")
         
         # ============ CONFIGURE ============
-        logger.info("CONFIGURATION STEPS:")
+        logger.info("CONFIGURATION:")
         logger.info("-" * 70)
         
-        # 1. Set frequency
-        logger.info("1. Setting frequency to 144 MHz...")
-        instr.write("RF 144000000")
-        sleep(0.2)
-        rf = instr.query("RF?")
-        logger.info(f"   → {rf.strip()}\n")
-        
-        # 2. Set amplitude
-        logger.info("2. Setting amplitude to -20 dBm...")
-        instr.write("LEVEL -20")
-        sleep(0.2)
-        level = instr.query("LEVEL?")
-        logger.info(f"   → {level.strip()}\n")
-        
-        # 3. Set FM tone frequency
-        logger.info("3. Setting FM tone frequency to 1 kHz...")
-        instr.write("FM:INT 1.000E+3")
-        sleep(0.2)
-        fm_int = instr.query("FM?")
-        logger.info(f"   → {fm_int.strip()}\n")
-        
-        # 4. Set audio frequency
-        logger.info("4. Setting audio frequency to 1000 Hz...")
-        instr.write("AF 1000")
-        sleep(0.2)
-        af = instr.query("AF?")
-        logger.info(f"   → {af.strip()}\n")
+        # RF 144 MHz, -20 dBm, 1 kHz FM tone, FM on, output on -- chained
+        # with ';' so the whole setup is a single GPIB transaction.
+        cfg = ";".join(CONFIG_CMDS)
+        logger.info(f"Sending: {cfg}")
+        sync_write(instr, cfg)
         
-        # 5. Enable FM
-        logger.info("5. Enabling FM modulation...")
-        instr.write("FM:ON")
-        sleep(0.2)
-        fm_stat = instr.query("FM?")
-        logger.info(f"   → {fm_stat.strip()}\n")
-        
-        # 6. Enable output
-        logger.info("6. Enabling RF output...")
-        instr.write("OUTP ON")
-        sleep(0.2)
-        esr = instr.query("*ESR?")
-        logger.info(f"   → RF output enabled (*ESR: {esr.strip()})\n")
+        resp = instr.query(";".join(READBACK_QUERIES))
+        for query, value in zip(READBACK_QUERIES, resp.split(";")):
+            logger.info(f"   {query:8s} → {value.strip()}")
+        logger.info("")
         
         logger.info("=" * 70)
         logger.info("✓ Configuration Complete!")
@@ -106,49 +105,51 @@ def enable_and_monitor():
         logger.info("=" * 70)
         
         # ============ MONITOR ============
+        # Any event status bit (*ESE 255) raises ESB, which asserts SRQ
+        # (*SRE 32), so the bus stays idle until something actually happens.
+        sync_write(instr, "*ESE 255;*SRE 32")
         try:
-            monitor_count = 0
+            last_read = monotonic()
             while True:
-                sleep(5)
-                monitor_count += 1
+                try:
+                    # wait_for_srq() serial-polls the device itself, which
+                    # clears RQS, so returning at all means SRQ was asserted.
+                    instr.wait_for_srq(timeout=SRQ_WAIT_MS)
+                    reason = "SRQ"
+                except pyvisa.errors.VisaIOError:
+                    # Timed out without a service request.
+                    if monotonic() - last_read < HEARTBEAT_S:
+                        continue
+                    reason = "heartbeat"
                 
-                # Periodically check status
                 try:
-                    esr = instr.query("*ESR?")
-                    fm_stat = instr.query("FM?")
-                    rf = instr.query("RF?")
-                    level = instr.query("LEVEL?")
-                    
-                    if monitor_count % 6 == 0:  # Log every 30 seconds
-                        logger.info(f"Status check #{monitor_count // 6}min:")
-                        logger.info(f"  RF: {rf.strip()}")
-                        logger.info(f"  Level: {level.strip()}")
-                        logger.info(f"  FM: {fm_stat.strip()}")
-                        logger.info(f"  ESR: {esr.strip()}")
+                    status = read_status(instr)
+                    last_read = monotonic()
+                    logger.info(f"Status ({reason}):")
+                    logger.info(f"  RF: {status['RF?']}")
+                    logger.info(f"  Level: {status['LEVEL?']}")
+                    logger.info(f"  FM: {status['FM?']}")
+                    logger.info(f"  ESR: {status['*ESR?']}")
                 except Exception as e:
                     logger.debug(f"Status check error: {e}")
         
         except KeyboardInterrupt:
             logger.info("\nShutting down...")
-        
-        # ============ DISABLE OUTPUT ============
-        logger.info("Disabling RF output...")
-        instr.write("OUTP OFF")
-        sleep(0.2)
-        logger.info("Disabling FM modulation...")
-        instr.write("FM:OFF")
-        sleep(0.2)
-        logger.info("Disabling output level (LEVEL:OFF per manual)...")
-        instr.write("LEVEL:OFF")
-        sleep(0.2)
-        logger.info("RF output disabled")
+        finally:
+            # ============ DISABLE OUTPUT ============
+            # Also runs if the monitor loop fails, e.g. wait_for_srq() on a
+            # backend or interface without SRQ support.
+            instr.write("*SRE 0")
+            # LEVEL:OFF (the actual mute per manual) goes first so a rejected
+            # OUTP OFF cannot make the parser drop it.
+            logger.info("Disabling RF output, FM modulation and output level...")
+            sync_write(instr, ";".join(SHUTDOWN_CMDS))
+            logger.info("RF output disabled")
         
         return True
         
     except Exception as e:
-        logger.error(f"Error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception(f"Error: {e}")
         return False
     finally:
         instr.close()
@@ -6,9 +6,9 @@ Establishes communication, verifies device connection, and configures
 for 144 MHz FM tone generation.
 """
 
+import argparse
 import sys
 import os
-from time import sleep
 
 # Add src directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
@@ -16,24 +16,25 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 from smy02_controller import SMY02Controller
 
 
-def main():
-    """Main initialization routine."""
+def main(list_devices: bool = False):
+    """
+    Main initialization routine.
+
+    Args:
+        list_devices: List all VISA resources before connecting
+    """
     
     print("=" * 60)
     print("SMY02 Signal Generator - Initialization")
     print("=" * 60)
     
-    # List available devices
-    print("\nScanning for available GPIB/USB devices...")
-    devices = SMY02Controller.list_available_devices()
-    
-    if not devices:
-        print("ERROR: No devices found!")
-        return False
-    
-    print(f"Found {len(devices)} device(s):")
-    for i, device in enumerate(devices, 1):
-        print(f"  {i}. {device}")
+    # Enumerating the bus is slow; only do it when asked for.
+    if list_devices:
+        print("\nScanning for available GPIB/USB devices...")
+        devices = SMY02Controller.list_available_devices()
+        print(f"Found {len(devices)} device(s):")
+        for i, device in enumerate(devices, 1):
+            print(f"  {i}. {device}")
     
     # Connect to device at GPIB 28
     resource_name = "GPIB0::28::INSTR"
@@ -57,108 +58,38 @@ def main():
     except Exception as e:
         print(f"  Warning: Could not query settings: {e}")
     
-    # Configure for 144 MHz FM
+    # Configure for 144 MHz FM. Each step stops the run on failure; the
+    # error queue and ESR are read once, in one query, after all of them.
     print("\nConfiguring for 144 MHz FM tone generation...")
-    print("  Setting frequency to 144 MHz...")
-    if not controller.set_frequency(144e6):
-        print("ERROR: Failed to set frequency!")
-        controller.disconnect()
-        return False
-    # Check instrument error queue and ESR
-    err = controller.get_system_error()
-    esr = controller.get_esr()
-    print(f"  SYST:ERR? -> {err}")
-    print(f"  *ESR? -> {esr}")
-    if err and not err.startswith("0"):
-        print(f"DEVICE ERROR AFTER SET FREQUENCY: {err}")
-        print("Aborting to avoid unsafe state. Please check instrument.")
-        controller.disconnect()
-        return False
-    print("  ✓ Frequency set")
-    
-    # Set amplitude to -20 dBm for safety
-    print("  Setting amplitude to -20 dBm...")
-    if not controller.set_amplitude(-20):
-        print("ERROR: Failed to set amplitude!")
-        controller.disconnect()
-        return False
-    err = controller.get_system_error()
-    esr = controller.get_esr()
-    print(f"  SYST:ERR? -> {err}")
-    print(f"  *ESR? -> {esr}")
-    if err and not err.startswith("0"):
-        print(f"DEVICE ERROR AFTER SET AMPLITUDE: {err}")
-        print("Aborting to avoid unsafe state. Please check instrument.")
-        controller.disconnect()
-        return False
-    print("  ✓ Amplitude set")
-    
-    # Configure FM modulation
-    print("  Enabling FM modulation with 5 kHz deviation...")
-    if not controller.set_modulation_fm(deviation=5000):
-        print("ERROR: Failed to set FM modulation!")
-        controller.disconnect()
-        return False
-    err = controller.get_system_error()
-    esr = controller.get_esr()
-    print(f"  SYST:ERR? -> {err}")
+    steps = [
+        ("Setting frequency to 144 MHz", controller.set_frequency, (144e6,)),
+        ("Setting amplitude to -20 dBm", controller.set_amplitude, (-20,)),
+        ("Enabling FM modulation with 5 kHz deviation", controller.set_modulation_fm, (5000,)),
+        ("Setting LFO for 1 kHz tone", controller.set_lfo_frequency, (1000,)),
+        ("Enabling LFO", controller.enable_lfo, ()),
+    ]
+    for desc, func, args in steps:
+        print(f"  {desc}...")
+        if not func(*args):
+            print(f"ERROR: {desc} failed!")
+            controller.disconnect()
+            return False
+    err, esr = controller.get_err_and_esr()
+    print(f"  ERR? -> {err}")
     print(f"  *ESR? -> {esr}")
     if err and not err.startswith("0"):
-        print(f"DEVICE ERROR AFTER SET MODULATION: {err}")
+        print(f"DEVICE ERROR DURING CONFIGURATION: {err}")
         print("Aborting to avoid unsafe state. Please check instrument.")
         controller.disconnect()
         return False
-    print("  ✓ FM modulation enabled")
+    print("  ✓ Frequency, amplitude, FM and LFO configured")
     
-    # Set LFO for tone generation (1 kHz tone)
-    print("  Setting LFO for 1 kHz tone...")
-    if not controller.set_lfo_frequency(1000):
-        print("ERROR: Failed to set LFO frequency!")
-        controller.disconnect()
-        return False
-    err = controller.get_system_error()
-    esr = controller.get_esr()
-    print(f"  SYST:ERR? -> {err}")
-    print(f"  *ESR? -> {esr}")
-    if err and not err.startswith("0"):
-        print(f"DEVICE ERROR AFTER SET LFO FREQUENCY: {err}")
-        print("Aborting to avoid unsafe state. Please check instrument.")
-        controller.disconnect()
-        return False
-    print("  ✓ LFO frequency set")
-    
-    # Enable LFO
-    print("  Enabling LFO...")
-    if not controller.enable_lfo():
-        print("ERROR: Failed to enable LFO!")
-        controller.disconnect()
-        return False
-    err = controller.get_system_error()
-    esr = controller.get_esr()
-    print(f"  SYST:ERR? -> {err}")
-    print(f"  *ESR? -> {esr}")
-    if err and not err.startswith("0"):
-        print(f"DEVICE ERROR AFTER ENABLE LFO: {err}")
-        print("Aborting to avoid unsafe state. Please check instrument.")
-        controller.disconnect()
-        return False
-    print("  ✓ LFO enabled")
-    
-    # Enable output
+    # Only key the RF output once the configuration is known to be clean.
     print("  Enabling RF output...")
     if not controller.enable_output():
         print("ERROR: Failed to enable output!")
         controller.disconnect()
         return False
-    err = controller.get_system_error()
-    esr = controller.get_esr()
-    print(f"  SYST:ERR? -> {err}")
-    print(f"  *ESR? -> {esr}")
-    if err and not err.startswith("0"):
-        print(f"DEVICE ERROR AFTER ENABLE OUTPUT: {err}")
-        print("Aborting to avoid unsafe state. Please check instrument.")
-        controller.disconnect()
-        return False
     print("  ✓ RF output enabled")
     
     print("\n" + "=" * 60)
@@ -189,8 +120,13 @@ def main():
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--list", "--scan", dest="list_devices", action="store_true",
+                        help="list available GPIB/USB devices before connecting")
+    args = parser.parse_args()
+    
     try:
-        success = main()
+        success = main(list_devices=args.list_devices)
         sys.exit(0 if success else 1)
     except Exception as e:
         print(f"FATAL ERROR: {e}")
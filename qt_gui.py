@@ -12,14 +12,36 @@ Initial Qt6 variant of the existing tkinter GUI:
 
 from __future__ import annotations
 
+import hashlib
 import json
+import os
 import sys
+import tempfile
+import zipfile
 from pathlib import Path
 from typing import Any, Dict, List
 
-from PyQt6.QtCore import QTimer
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # optional: faster playlist save/load, stdlib json otherwise
+    orjson = None
+
+from PyQt6.QtCore import (
+    QAbstractListModel,
+    QEvent,
+    QModelIndex,
+    QObject,
+    Qt,
+    QThread,
+    QTimer,
+    pyqtSignal,
+    pyqtSlot,
+)
 from PyQt6.QtWidgets import (
     QApplication,
+    QButtonGroup,
     QCheckBox,
     QComboBox,
     QDoubleSpinBox,
@@ -28,8 +50,7 @@ from PyQt6.QtWidgets import (
     QGroupBox,
     QHBoxLayout,
     QLabel,
-    QListWidget,
-    QListWidgetItem,
+    QListView,
     QMainWindow,
     QMessageBox,
     QPushButton,
@@ -40,14 +61,127 @@ from PyQt6.QtWidgets import (
 
 from src.smy02_controller import SMY02Controller
 
+# Parsed playlists are kept here as .npz, keyed by file path, mtime and size,
+# so reloading a large saved sweep skips the JSON decode. Only the most
+# recently written PLAYLIST_CACHE_MAX entries are kept.
+PLAYLIST_CACHE_DIR = Path.home() / ".cache" / "smy02"
+PLAYLIST_CACHE_MAX = 32
+
+
+def _json_dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2).encode()
+
+
+def _json_loads(data: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class PlaylistModel(QAbstractListModel):
+    """List model over the GUI's playlist arrays; rows are formatted on demand."""
+
+    def __init__(self, gui: "SMY02QtGUI") -> None:
+        super().__init__(gui)
+        self._gui = gui
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self._gui._names)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if role != Qt.ItemDataRole.DisplayRole or not index.isValid():
+            return None
+        row = index.row()
+        return f"{self._gui._entry_name(row)} ({self._gui._freq_hz.item(row) / 1e6} MHz)"
+
+    def reload(self) -> None:
+        self.beginResetModel()
+        self.endResetModel()
+
+
+class ControllerWorker(QObject):
+    """Runs controller I/O on its own thread so GPIB never blocks the UI."""
+
+    stateReady = pyqtSignal(dict)
+    # (hop run, hop applied, RF output enabled by this hop)
+    hopDone = pyqtSignal(int, bool, bool)
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.controller: SMY02Controller | None = None
+        # Set by the GUI thread; hops queued for an earlier run are dropped.
+        self.hop_run = 0
+
+    @pyqtSlot(int, object, object, object, bool, bool, bool)
+    def apply_hop(self, run: int, hz: int, level: float, deviation: int | None,
+                  am: bool, force: bool, enable: bool) -> None:
+        # Modulation and output enable follow the hop on this thread, so RF
+        # is never switched on at the previous hop's settings. Unchanged
+        # values are skipped by the controller, whose cache only records
+        # writes that succeeded.
+        c = self.controller
+        if not c:
+            return
+        # The run is checked under the I/O lock: once Stop or Shutdown has
+        # moved hop_run on, its disable_output() is ordered after any hop
+        # already running here, and no later hop can re-enable RF.
+        with c._io_lock:
+            if run != self.hop_run:
+                return
+            if am:
+                ok = c.apply_hop(hz, level, None, force) and c.set_modulation_am()
+            else:
+                ok = c.apply_hop(hz, level, deviation, force)
+            self.hopDone.emit(run, ok, ok and enable and c.enable_output())
+
+    @pyqtSlot()
+    def read_state(self) -> None:
+        # Always answer, even with nothing, so the GUI's pending flag clears.
+        if not self.controller:
+            self.stateReady.emit({})
+            return
+        # Back-to-back requests (connect, then Refresh) share one read.
+        self.stateReady.emit(self.controller.get_device_state(max_age=1.0))
+
 
 class SMY02QtGUI(QMainWindow):
+    # Queued across to ControllerWorker's thread. Arguments are passed as
+    # object because Qt's int is 32-bit and the deviation may be None.
+    hopRequested = pyqtSignal(int, object, object, object, bool, bool, bool)
+    stateRequested = pyqtSignal()
+
     BANDWIDTHS = {
         "6.25 kHz": 3125,
         "12.5 kHz": 6250,
         "25 kHz": 12500,
     }
 
+    # Style sheets for the handful of visual states; applied through
+    # _set_style() so Qt only re-parses CSS on an actual transition.
+    _SS_OK = "color: #006400; font-weight: 700;"
+    _SS_BAD = "color: #b00000; font-weight: 700;"
+    _SS_STATE_PARTIAL = (
+        "background: #fff3bf; color: #5c3d00; font-weight: 800; "
+        "padding: 6px; border: 1px solid #d9b100; border-radius: 6px;"
+    )
+    _SS_STATE_OK = (
+        "background: #d9f7e6; color: #0b5d2a; font-weight: 800; "
+        "padding: 6px; border: 1px solid #57b77d; border-radius: 6px;"
+    )
+    _SS_STATE_DISCONNECTED = (
+        "background: #f3f3f3; color: #666; font-weight: 700; "
+        "padding: 6px; border: 1px solid #ccc; border-radius: 6px;"
+    )
+    _SS_HINT_IDLE = "color: #444; font-weight: 700;"
+    _SS_HINT_AM = "color: #8a4b00; font-weight: 800;"
+    _SS_HINT_FM = "color: #005a00; font-weight: 800;"
+    _SS_HOP_IDLE = "color: #b00000; font-size: 16px; font-weight: 800;"
+    _SS_HOP_ACTIVE = "color: #005a00; font-size: 16px; font-weight: 800;"
+
     def __init__(self) -> None:
         super().__init__()
         self.setWindowTitle("SMY02 Signal Generator Control (Qt6)")
@@ -57,18 +191,44 @@ class SMY02QtGUI(QMainWindow):
         self.connected = False
         self.transmitting = False
         self.playlist_running = False
-        self.playlist: List[Dict[str, Any]] = []
+        # Playlist stored as parallel arrays; _bw_idx indexes BANDWIDTHS.
+        self._bw_names: List[str] = list(self.BANDWIDTHS)
+        self._bw_values_hz = np.array(list(self.BANDWIDTHS.values()), dtype=np.int64)
+        self._freq_hz = np.empty(0, dtype=np.int64)
+        self._level = np.empty(0, dtype=np.float64)
+        self._bw_idx = np.empty(0, dtype=np.int8)
+        # None marks a generated sweep entry whose name is formatted on demand.
+        self._names: List[str | None] = []
         self.current_idx = 0
-        self._hop_last_bw: str | None = None
+        # Set when hopping starts so the first hop is sent in full, even
+        # if the controller's cache says the values are unchanged.
+        self._hop_force = False
+        # Current hop run; bumped by Stop and Shutdown to cancel queued hops.
+        self._hop_run = 0
+        self._last_state: tuple[str, str, str, str] | None = None
+        self._refresh_pending = False
 
         self._build_ui()
         self._load_presets()
 
+        self._io_thread = QThread(self)
+        self._worker = ControllerWorker()
+        self._worker.moveToThread(self._io_thread)
+        self.hopRequested.connect(self._worker.apply_hop)
+        self._worker.hopDone.connect(self._on_hop_done)
+        self.stateRequested.connect(self._worker.read_state)
+        self._worker.stateReady.connect(self._on_state_ready)
+        self._io_thread.start()
+
+        # Neither timer needs millisecond accuracy; coarse timers avoid
+        # forcing a high system timer resolution.
         self.state_timer = QTimer(self)
-        self.state_timer.setInterval(3000)
+        self.state_timer.setTimerType(Qt.TimerType.CoarseTimer)
+        self.state_timer.setInterval(5000)
         self.state_timer.timeout.connect(self._refresh_state)
 
         self.hop_timer = QTimer(self)
+        self.hop_timer.setTimerType(Qt.TimerType.CoarseTimer)
         self.hop_timer.timeout.connect(self._hop_once)
 
     def _build_ui(self) -> None:
@@ -85,7 +245,7 @@ class SMY02QtGUI(QMainWindow):
         self.btn_refresh = QPushButton("Refresh State")
         self.btn_refresh.clicked.connect(self._refresh_state)
         self.status_label = QLabel("Disconnected")
-        self.status_label.setStyleSheet("color: #b00000; font-weight: 700;")
+        self._set_style(self.status_label, self._SS_BAD)
         conn_l.addWidget(self.btn_connect)
         conn_l.addWidget(self.btn_disconnect)
         conn_l.addWidget(self.btn_refresh)
@@ -95,10 +255,7 @@ class SMY02QtGUI(QMainWindow):
         state = QGroupBox("Device State")
         state_l = QHBoxLayout(state)
         self.state_label = QLabel("RF: N/A | LEVEL: N/A | FM: N/A | AF: N/A")
-        self.state_label.setStyleSheet(
-            "background: #fff3bf; color: #5c3d00; font-weight: 800; "
-            "padding: 6px; border: 1px solid #d9b100; border-radius: 6px;"
-        )
+        self._set_style(self.state_label, self._SS_STATE_PARTIAL)
         state_l.addWidget(self.state_label)
         main.addWidget(state)
 
@@ -113,12 +270,13 @@ class SMY02QtGUI(QMainWindow):
         self.level_dbm.setDecimals(2)
         self.level_dbm.setValue(-20.0)
 
-        self.bw_checks: Dict[str, QCheckBox] = {}
+        # Exclusive group: Qt keeps exactly one bandwidth checked.
+        self.bw_group = QButtonGroup(self)
+        self.bw_group.setExclusive(True)
         bw_row = QHBoxLayout()
         for i, name in enumerate(self.BANDWIDTHS):
             cb = QCheckBox(name)
-            cb.toggled.connect(lambda checked, n=name: self._bw_checked(n, checked))
-            self.bw_checks[name] = cb
+            self.bw_group.addButton(cb, i)
             bw_row.addWidget(cb)
             if i == 1:
                 cb.setChecked(True)
@@ -140,15 +298,22 @@ class SMY02QtGUI(QMainWindow):
         self.am_to_mhz.setRange(0.001, 3000.0)
         self.am_to_mhz.setDecimals(3)
         self.am_to_mhz.setValue(137.0)
+        # Python-side copies of the auto-mod settings, read by the hop path.
+        self._auto_mod = False
+        self._am_from = 118.0
+        self._am_to = 137.0
+        self.chk_auto_mod.toggled.connect(lambda v: setattr(self, "_auto_mod", v))
+        self.am_from_mhz.valueChanged.connect(lambda v: setattr(self, "_am_from", v))
+        self.am_to_mhz.valueChanged.connect(lambda v: setattr(self, "_am_to", v))
         self.mod_hint = QLabel("Auto-mod OFF (manual FM)")
-        self.mod_hint.setStyleSheet("color: #444; font-weight: 700;")
+        self._set_style(self.mod_hint, self._SS_HINT_IDLE)
 
         self.btn_tx = QPushButton("Enable RF")
         self.btn_tx.clicked.connect(self._toggle_tx)
         self.btn_shutdown = QPushButton("Shutdown")
         self.btn_shutdown.clicked.connect(self._shutdown)
         self.tx_status = QLabel("RF: OFF")
-        self.tx_status.setStyleSheet("color: #b00000; font-weight: 700;")
+        self._set_style(self.tx_status, self._SS_BAD)
 
         ctl_g.addWidget(QLabel("Frequency (MHz):"), 0, 0)
         ctl_g.addWidget(self.freq_mhz, 0, 1)
@@ -203,6 +368,10 @@ class SMY02QtGUI(QMainWindow):
         self.btn_hop_stop.clicked.connect(self._stop_hopping)
         self.chk_follow = QCheckBox("Auto-scroll")
         self.chk_follow.setChecked(True)
+        self._dwell_s = 2.0
+        self._follow = True
+        self.dwell_s.valueChanged.connect(self._dwell_changed)
+        self.chk_follow.toggled.connect(lambda v: setattr(self, "_follow", v))
         row2.addWidget(QLabel("Dwell (s):"))
         row2.addWidget(self.dwell_s)
         row2.addWidget(self.btn_hop_start)
@@ -267,17 +436,21 @@ class SMY02QtGUI(QMainWindow):
         sweep_g.addWidget(self.btn_generate_sweep, 2, 5, 1, 2)
         pl_l.addWidget(sweep)
 
-        self.playlist_widget = QListWidget()
-        self.playlist_widget.setStyleSheet(
-            "QListWidget { font-size: 14px; }"
-            "QListWidget::item:selected { background: #ffd400; color: #000; font-weight: 700; }"
+        self.playlist_model = PlaylistModel(self)
+        self.playlist_view = QListView()
+        self.playlist_view.setModel(self.playlist_model)
+        # All rows are one line of text; lets the view skip per-row sizing.
+        self.playlist_view.setUniformItemSizes(True)
+        self.playlist_view.setStyleSheet(
+            "QListView { font-size: 14px; }"
+            "QListView::item:selected { background: #ffd400; color: #000; font-weight: 700; }"
         )
-        pl_l.addWidget(self.playlist_widget, 1)
+        pl_l.addWidget(self.playlist_view, 1)
 
         self.hop_status = QLabel("Hopping: OFF")
-        self.hop_status.setStyleSheet("color: #b00000; font-weight: 700;")
+        self._set_style(self.hop_status, self._SS_BAD)
         self.current_hop = QLabel("CURRENT HOP: -")
-        self.current_hop.setStyleSheet("color: #b00000; font-size: 16px; font-weight: 800;")
+        self._set_style(self.current_hop, self._SS_HOP_IDLE)
         pl_l.addWidget(self.hop_status)
         pl_l.addWidget(self.current_hop)
         main.addWidget(pl, 1)
@@ -298,20 +471,60 @@ class SMY02QtGUI(QMainWindow):
             except Exception:
                 pass
 
-    def _bw_checked(self, name: str, checked: bool) -> None:
-        if not checked:
-            return
-        for other, cb in self.bw_checks.items():
-            if other != name:
-                cb.blockSignals(True)
-                cb.setChecked(False)
-                cb.blockSignals(False)
-
     def _selected_bw(self) -> str:
-        for name, cb in self.bw_checks.items():
-            if cb.isChecked():
-                return name
-        return "12.5 kHz"
+        checked = self.bw_group.checkedButton()
+        return checked.text() if checked else "12.5 kHz"
+
+    def _bw_index(self, name: str) -> int:
+        try:
+            return self._bw_names.index(name)
+        except ValueError:
+            return self._bw_names.index("12.5 kHz")
+
+    def _set_playlist(self, freq_hz: np.ndarray, level: np.ndarray, bw_idx: np.ndarray, names: List[str | None]) -> None:
+        self._freq_hz = np.asarray(freq_hz, dtype=np.int64)
+        self._level = np.asarray(level, dtype=np.float64)
+        self._bw_idx = np.asarray(bw_idx, dtype=np.int8)
+        self._names = list(names)
+
+    def _append_playlist(self, freq_hz: np.ndarray, level: np.ndarray, bw_idx: np.ndarray, names: List[str | None]) -> None:
+        self._set_playlist(
+            np.concatenate((self._freq_hz, np.asarray(freq_hz, dtype=np.int64))),
+            np.concatenate((self._level, np.asarray(level, dtype=np.float64))),
+            np.concatenate((self._bw_idx, np.asarray(bw_idx, dtype=np.int8))),
+            self._names + list(names),
+        )
+
+    def _entry_name(self, i: int) -> str:
+        name = self._names[i]
+        if name is None:
+            name = f"Sweep {round(self._freq_hz.item(i) / 1e6, 6)} MHz @ {self._level.item(i):.2f} dBm"
+        return name
+
+    def _playlist_entries(self) -> List[Dict[str, Any]]:
+        """Playlist as the list-of-dicts layout used in saved JSON files."""
+        return [
+            {
+                "name": self._entry_name(i),
+                "frequency": hz / 1e6,
+                "level": lvl,
+                "bandwidth": self._bw_names[bw],
+            }
+            for i, (hz, lvl, bw) in enumerate(
+                zip(self._freq_hz.tolist(), self._level.tolist(), self._bw_idx.tolist())
+            )
+        ]
+
+    @staticmethod
+    def _set_style(widget: QWidget, style: str) -> None:
+        if widget.styleSheet() != style:
+            widget.setStyleSheet(style)
+
+    def _dwell_changed(self, value: float) -> None:
+        self._dwell_s = value
+        # Apply dwell edits to a running hop sequence right away.
+        if self.hop_timer.isActive():
+            self.hop_timer.setInterval(int(value * 1000))
 
     def _warn(self, title: str, message: str) -> None:
         QMessageBox.warning(self, title, message)
@@ -323,10 +536,12 @@ class SMY02QtGUI(QMainWindow):
         self.controller = SMY02Controller()
         if self.controller.connect():
             self.connected = True
+            self._worker.controller = self.controller
             vendor, model, fw = self._idn_parts(self.controller.idn)
             self.status_label.setText(f"Connected ({vendor} {model} FW {fw})")
-            self.status_label.setStyleSheet("color: #006400; font-weight: 700;")
-            self.state_timer.start()
+            self._set_style(self.status_label, self._SS_OK)
+            self._update_state_polling()
+            # Prefetch on the worker thread; the label fills in when it lands.
             self._refresh_state()
             return
         self.connected = False
@@ -339,38 +554,45 @@ class SMY02QtGUI(QMainWindow):
             if self.transmitting:
                 self._shutdown()
             self.controller.disconnect()
+        self._worker.controller = None
         self.connected = False
         self.status_label.setText("Disconnected")
-        self.status_label.setStyleSheet("color: #b00000; font-weight: 700;")
+        self._set_style(self.status_label, self._SS_BAD)
         self.state_timer.stop()
+        self._last_state = None
         self.state_label.setText("RF: N/A | LEVEL: N/A | FM: N/A | AF: N/A")
-        self.state_label.setStyleSheet(
-            "background: #f3f3f3; color: #666; font-weight: 700; "
-            "padding: 6px; border: 1px solid #ccc; border-radius: 6px;"
-        )
+        self._set_style(self.state_label, self._SS_STATE_DISCONNECTED)
 
     def _refresh_state(self) -> None:
         if not self.connected or not self.controller:
             return
-        st = self.controller.get_device_state()
+        # Coalesce timer ticks and Refresh clicks while a read is in flight.
+        if self._refresh_pending:
+            return
+        self._refresh_pending = True
+        self.stateRequested.emit()
+
+    def _on_state_ready(self, st: Dict[str, str]) -> None:
+        self._refresh_pending = False
+        # A read queued before disconnecting may still arrive afterwards.
+        if not self.connected or not st:
+            return
+        snapshot = (st["rf"], st["level"], st["fm"], st["af"])
+        if snapshot == self._last_state:
+            return
+        self._last_state = snapshot
         self.state_label.setText(f"RF: {st['rf']} | LEVEL: {st['level']} | FM: {st['fm']} | AF: {st['af']}")
         if "N/A" in (st["rf"], st["level"], st["fm"], st["af"]):
-            self.state_label.setStyleSheet(
-                "background: #fff3bf; color: #5c3d00; font-weight: 800; "
-                "padding: 6px; border: 1px solid #d9b100; border-radius: 6px;"
-            )
+            self._set_style(self.state_label, self._SS_STATE_PARTIAL)
         else:
-            self.state_label.setStyleSheet(
-                "background: #d9f7e6; color: #0b5d2a; font-weight: 800; "
-                "padding: 6px; border: 1px solid #57b77d; border-radius: 6px;"
-            )
+            self._set_style(self.state_label, self._SS_STATE_OK)
 
     def _set_frequency(self) -> None:
         if not self.connected or not self.controller:
             self._warn("Device", "Device not connected")
             return
         freq_mhz = self.freq_mhz.value()
-        hz = int(self.freq_mhz.value() * 1e6)
+        hz = round(freq_mhz * 1e6)
         if not self.controller.set_frequency(hz):
             self._err("Frequency", "Failed to set frequency")
             return
@@ -391,32 +613,42 @@ class SMY02QtGUI(QMainWindow):
             bw = "12.5 kHz"
         return self.controller.set_modulation_fm(self.BANDWIDTHS[bw])
 
+    def _auto_mod_is_am(self, freq_mhz: float) -> bool:
+        """Whether auto-mod selects AM at `freq_mhz`; updates the hint label."""
+        am_start = min(self._am_from, self._am_to)
+        am_stop = max(self._am_from, self._am_to)
+        if am_start <= freq_mhz <= am_stop:
+            self.mod_hint.setText(f"Auto-mod: AM ({am_start:.3f}-{am_stop:.3f} MHz)")
+            self._set_style(self.mod_hint, self._SS_HINT_AM)
+            return True
+        self.mod_hint.setText(f"Auto-mod: FM (outside {am_start:.3f}-{am_stop:.3f} MHz)")
+        self._set_style(self.mod_hint, self._SS_HINT_FM)
+        return False
+
     def _apply_modulation_for_frequency(self, freq_mhz: float) -> bool:
         if not self.connected or not self.controller:
             return False
-        if not self.chk_auto_mod.isChecked():
+        if not self._auto_mod:
             self.mod_hint.setText("Auto-mod OFF (manual FM)")
             return True
 
-        am_start = min(self.am_from_mhz.value(), self.am_to_mhz.value())
-        am_stop = max(self.am_from_mhz.value(), self.am_to_mhz.value())
-        in_am = am_start <= freq_mhz <= am_stop
-        if in_am:
+        if self._auto_mod_is_am(freq_mhz):
             ok = self.controller.set_modulation_am()
-            self.mod_hint.setText(f"Auto-mod: AM ({am_start:.3f}-{am_stop:.3f} MHz)")
-            self.mod_hint.setStyleSheet("color: #8a4b00; font-weight: 800;")
             if not ok:
                 self._err("Modulation", "Failed to switch AM mode")
             return ok
 
-        bw = self._selected_bw()
-        ok = self.controller.set_modulation_fm(self.BANDWIDTHS[bw])
-        self.mod_hint.setText(f"Auto-mod: FM (outside {am_start:.3f}-{am_stop:.3f} MHz)")
-        self.mod_hint.setStyleSheet("color: #005a00; font-weight: 800;")
+        ok = self.controller.set_modulation_fm(self.BANDWIDTHS[self._selected_bw()])
         if not ok:
             self._err("Modulation", "Failed to switch FM mode")
         return ok
 
+    def _set_tx_on(self) -> None:
+        self.transmitting = True
+        self.btn_tx.setText("Disable RF")
+        self.tx_status.setText("RF: ON")
+        self._set_style(self.tx_status, self._SS_OK)
+
     def _toggle_tx(self) -> None:
         if not self.connected or not self.controller:
             self._warn("Device", "Device not connected")
@@ -426,87 +658,161 @@ class SMY02QtGUI(QMainWindow):
                 self.transmitting = False
                 self.btn_tx.setText("Enable RF")
                 self.tx_status.setText("RF: OFF")
-                self.tx_status.setStyleSheet("color: #b00000; font-weight: 700;")
+                self._set_style(self.tx_status, self._SS_BAD)
             else:
                 self._err("RF", "Failed to disable RF")
             return
 
         self._set_frequency()
         self._set_level()
-        if not self.chk_auto_mod.isChecked():
+        if not self._auto_mod:
             self._set_bandwidth()
         if self.controller.enable_output():
-            self.transmitting = True
-            self.btn_tx.setText("Disable RF")
-            self.tx_status.setText("RF: ON")
-            self.tx_status.setStyleSheet("color: #006400; font-weight: 700;")
+            self._set_tx_on()
         else:
             self._err("RF", "Failed to enable RF")
 
+    def _end_hop_run(self) -> None:
+        """Invalidate hops still queued on the worker thread."""
+        self._hop_run += 1
+        self._worker.hop_run = self._hop_run
+
     def _shutdown(self) -> None:
+        # Shutdown also ends hopping; the next tick would enable RF again.
+        if self.playlist_running:
+            self._stop_hopping()
+        else:
+            self._end_hop_run()
         if self.controller:
             self.controller.disable_output()
         self.transmitting = False
         self.btn_tx.setText("Enable RF")
         self.tx_status.setText("RF: OFF")
-        self.tx_status.setStyleSheet("color: #b00000; font-weight: 700;")
+        self._set_style(self.tx_status, self._SS_BAD)
 
     def _add_current(self) -> None:
-        entry = {
-            "name": f"{self.freq_mhz.value():.6f} MHz @ {self.level_dbm.value():.2f} dBm",
-            "frequency": float(self.freq_mhz.value()),
-            "level": float(self.level_dbm.value()),
-            "bandwidth": self._selected_bw(),
-        }
-        self.playlist.append(entry)
-        self._refresh_playlist()
+        self._append_rows(
+            [round(self.freq_mhz.value() * 1e6)],
+            [self.level_dbm.value()],
+            [self._bw_index(self._selected_bw())],
+            [f"{self.freq_mhz.value():.6f} MHz @ {self.level_dbm.value():.2f} dBm"],
+        )
 
     def _remove_selected(self) -> None:
-        row = self.playlist_widget.currentRow()
+        row = self.playlist_view.currentIndex().row()
         if row < 0:
             return
-        if 0 <= row < len(self.playlist):
-            self.playlist.pop(row)
-            self._refresh_playlist()
+        if 0 <= row < len(self._names):
+            self._remove_row(row)
 
     def _clear_playlist(self) -> None:
-        self.playlist.clear()
+        self._set_playlist([], [], [], [])
         self._refresh_playlist()
 
+    def _playlist_cache_path(self, path: str) -> Path:
+        p = Path(path).resolve()
+        st = p.stat()
+        key = f"{p}|{st.st_mtime_ns}|{st.st_size}|{'|'.join(self._bw_names)}"
+        return PLAYLIST_CACHE_DIR / f"{hashlib.sha1(key.encode()).hexdigest()}.npz"
+
+    def _write_playlist_cache(self, path: str) -> None:
+        tmp = None
+        try:
+            PLAYLIST_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            # Written beside the final path and renamed into place, so a
+            # crash mid-write never leaves a truncated entry under the key.
+            fd, tmp = tempfile.mkstemp(dir=PLAYLIST_CACHE_DIR, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                np.savez(
+                    f,
+                    freq_hz=self._freq_hz,
+                    level=self._level,
+                    bw_idx=self._bw_idx,
+                    names=np.array([name or "" for name in self._names], dtype=str),
+                    # Marks lazily named (None) entries, so a real "" name survives.
+                    unnamed=np.array([name is None for name in self._names], dtype=bool),
+                )
+            os.replace(tmp, self._playlist_cache_path(path))
+            tmp = None
+            self._prune_playlist_cache()
+        except OSError:
+            pass
+        finally:
+            if tmp is not None:
+                Path(tmp).unlink(missing_ok=True)
+
+    @staticmethod
+    def _prune_playlist_cache() -> None:
+        entries = sorted(PLAYLIST_CACHE_DIR.glob("*.npz"), key=lambda p: p.stat().st_mtime, reverse=True)
+        for stale in entries[PLAYLIST_CACHE_MAX:]:
+            stale.unlink(missing_ok=True)
+
+    def _read_playlist_cache(self, path: str) -> bool:
+        try:
+            with np.load(self._playlist_cache_path(path)) as cached:
+                self._set_playlist(
+                    cached["freq_hz"],
+                    cached["level"],
+                    cached["bw_idx"],
+                    [
+                        None if unnamed else name
+                        for name, unnamed in zip(cached["names"].tolist(), cached["unnamed"].tolist())
+                    ],
+                )
+            return True
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+            return False
+
     def _save_playlist(self) -> None:
         path, _ = QFileDialog.getSaveFileName(self, "Save Playlist", "playlist.json", "JSON files (*.json)")
         if not path:
             return
-        Path(path).write_text(json.dumps(self.playlist, indent=2))
+        Path(path).write_bytes(_json_dumps(self._playlist_entries()))
+        self._write_playlist_cache(path)
 
     def _load_playlist(self) -> None:
         path, _ = QFileDialog.getOpenFileName(self, "Load Playlist", "", "JSON files (*.json)")
         if not path:
             return
+        if self._read_playlist_cache(path):
+            self._refresh_playlist()
+            return
         try:
-            raw = json.loads(Path(path).read_text())
+            raw = _json_loads(Path(path).read_bytes())
             if isinstance(raw, list):
-                self.playlist = []
-                for it in raw:
-                    if not isinstance(it, dict):
-                        continue
-                    self.playlist.append(
-                        {
-                            "name": str(it.get("name", "Entry")),
-                            "frequency": float(it.get("frequency", 144.0)),
-                            "level": float(it.get("level", -20.0)),
-                            "bandwidth": str(it.get("bandwidth", "12.5 kHz")),
-                        }
-                    )
+                items = [it for it in raw if isinstance(it, dict)]
+                self._set_playlist(
+                    [round(float(it.get("frequency", 144.0)) * 1e6) for it in items],
+                    [float(it.get("level", -20.0)) for it in items],
+                    [self._bw_index(str(it.get("bandwidth", "12.5 kHz"))) for it in items],
+                    [str(it.get("name", "Entry")) for it in items],
+                )
                 self._refresh_playlist()
+                self._write_playlist_cache(path)
         except Exception as e:
             self._err("Playlist", f"Load failed: {e}")
 
     def _refresh_playlist(self) -> None:
-        self.playlist_widget.clear()
-        for e in self.playlist:
-            item = QListWidgetItem(f"{e['name']} ({e['frequency']} MHz)")
-            self.playlist_widget.addItem(item)
+        """Full model reset; for wholesale replacement (load, clear, new sweep)."""
+        self.playlist_model.reload()
+
+    def _append_rows(self, freq_hz: Any, level: Any, bw_idx: Any, names: List[str | None]) -> None:
+        first = len(self._names)
+        self.playlist_model.beginInsertRows(QModelIndex(), first, first + len(names) - 1)
+        self._append_playlist(freq_hz, level, bw_idx, names)
+        self.playlist_model.endInsertRows()
+
+    def _remove_row(self, row: int) -> None:
+        self.playlist_model.beginRemoveRows(QModelIndex(), row, row)
+        names = list(self._names)
+        del names[row]
+        self._set_playlist(
+            np.delete(self._freq_hz, row),
+            np.delete(self._level, row),
+            np.delete(self._bw_idx, row),
+            names,
+        )
+        self.playlist_model.endRemoveRows()
 
     def _generate_sweep_playlist(self) -> None:
         start = float(self.sweep_start_mhz.value())
@@ -524,104 +830,127 @@ class SMY02QtGUI(QMainWindow):
             return
 
         bw = self._selected_bw()
-        ascending = stop >= start
-        forward: List[Dict[str, Any]] = []
-        idx = 0
-        current = start
-        eps = step / 10.0
-        while (current <= stop + eps) if ascending else (current >= stop - eps):
-            if alt_enabled:
-                block = (idx // toggle_every) % 2
-                level = alt_level if block == 1 else base_level
+        # Build the grid from an integer index instead of accumulating the
+        # step, so there is no float drift over long sweeps.
+        direction = 1.0 if stop >= start else -1.0
+        n = int(np.floor(abs(stop - start) / step + 0.1)) + 1
+        idx = np.arange(n)
+        freqs = np.round(start + idx * step * direction, 6)
+        if alt_enabled:
+            # Odd blocks of toggle_every entries use the alternate level; a
+            # shift replaces the division when toggle_every is a power of 2.
+            if toggle_every & (toggle_every - 1) == 0:
+                blocks = (idx >> (toggle_every.bit_length() - 1)) & 1
             else:
-                level = base_level
-            freq = round(current, 6)
-            forward.append(
-                {
-                    "name": f"Sweep {freq} MHz @ {level:.2f} dBm",
-                    "frequency": freq,
-                    "level": level,
-                    "bandwidth": bw,
-                }
-            )
-            idx += 1
-            current = current + step if ascending else current - step
-
-        if not forward:
-            self._warn("Sweep", "No entries generated")
-            return
+                blocks = (idx // toggle_every) & 1
+            levels = np.where(blocks.astype(bool), alt_level, base_level)
+        else:
+            levels = np.full(n, base_level)
+        names: List[str | None] = [None] * n
+        freq_hz = np.round(freqs * 1e6).astype(np.int64)
+        bw_idx = np.full(n, self._bw_index(bw), dtype=np.int8)
 
-        entries = list(forward)
         # Ping-pong style: forward then backward without repeating end points.
-        if self.sweep_reverse.isChecked() and len(forward) > 2:
-            tail = list(reversed(forward[1:-1]))
-            entries.extend(tail)
+        if self.sweep_reverse.isChecked() and n > 2:
+            back = slice(n - 2, 0, -1)
+            freq_hz = np.concatenate((freq_hz, freq_hz[back]))
+            levels = np.concatenate((levels, levels[back]))
+            bw_idx = np.concatenate((bw_idx, bw_idx[back]))
+            names = names + names[back]
 
         if self.sweep_replace.isChecked():
-            self.playlist = entries
+            self._set_playlist(freq_hz, levels, bw_idx, names)
+            self._refresh_playlist()
         else:
-            self.playlist.extend(entries)
-        self._refresh_playlist()
+            self._append_rows(freq_hz, levels, bw_idx, names)
 
     def _start_hopping(self) -> None:
         if not self.connected or not self.controller:
             self._warn("Device", "Device not connected")
             return
-        if not self.playlist:
+        if not self._names:
             self._warn("Playlist", "Playlist is empty")
             return
         if self.playlist_running:
             return
         self.playlist_running = True
         self.current_idx = 0
-        self._hop_last_bw = None
+        self._hop_force = True
         self.hop_status.setText("Hopping: ON")
-        self.hop_status.setStyleSheet("color: #006400; font-weight: 700;")
-        self.hop_timer.start(int(self.dwell_s.value() * 1000))
+        self._set_style(self.hop_status, self._SS_OK)
+        self.hop_timer.start(int(self._dwell_s * 1000))
         self._hop_once()
 
     def _stop_hopping(self) -> None:
+        self._end_hop_run()
         self.playlist_running = False
         self.hop_timer.stop()
-        self._hop_last_bw = None
         self.hop_status.setText("Hopping: OFF")
-        self.hop_status.setStyleSheet("color: #b00000; font-weight: 700;")
+        self._set_style(self.hop_status, self._SS_BAD)
         self.current_hop.setText("CURRENT HOP: -")
-        self.current_hop.setStyleSheet("color: #b00000; font-size: 16px; font-weight: 800;")
+        self._set_style(self.current_hop, self._SS_HOP_IDLE)
 
     def _hop_once(self) -> None:
-        if not self.playlist_running or not self.controller or not self.playlist:
+        if not self.playlist_running or not self.controller or not self._names:
             return
-        e = self.playlist[self.current_idx]
-        hz = int(float(e["frequency"]) * 1e6)
-        lvl = float(e["level"])
-        bw = str(e.get("bandwidth", "12.5 kHz"))
-        if bw not in self.BANDWIDTHS:
-            bw = "12.5 kHz"
-
-        self.controller.set_frequency(hz)
-        self.controller.set_amplitude(lvl)
-        if self.chk_auto_mod.isChecked():
-            self._apply_modulation_for_frequency(float(e["frequency"]))
-            self._hop_last_bw = None
+        i = self.current_idx
+        # Array dtypes are fixed by _set_playlist; item() yields the plain
+        # Python int/float directly.
+        hz = self._freq_hz.item(i)
+        lvl = self._level.item(i)
+        bw = self._bw_idx.item(i)
+
+        # The whole hop (RF, level, modulation and, if RF is off, output
+        # enable) runs on the worker thread; whatever changed of RF, level
+        # and FM deviation goes out as one write.
+        am = False
+        if self._auto_mod:
+            am = self._auto_mod_is_am(hz / 1e6)
+            deviation = None if am else self.BANDWIDTHS[self._selected_bw()]
         else:
-            if bw != self._hop_last_bw:
-                self.controller.set_modulation_fm(self.BANDWIDTHS[bw])
-                self._hop_last_bw = bw
-        if not self.transmitting:
-            if self.controller.enable_output():
-                self.transmitting = True
-                self.btn_tx.setText("Disable RF")
-                self.tx_status.setText("RF: ON")
-                self.tx_status.setStyleSheet("color: #006400; font-weight: 700;")
-
-        self.current_hop.setText(f"CURRENT HOP: {e['name']} ({float(e['frequency']):.6f} MHz)")
-        self.current_hop.setStyleSheet("color: #005a00; font-size: 16px; font-weight: 800;")
-        if self.chk_follow.isChecked():
-            self.playlist_widget.setCurrentRow(self.current_idx)
-            self.playlist_widget.scrollToItem(self.playlist_widget.item(self.current_idx))
-
-        self.current_idx = (self.current_idx + 1) % len(self.playlist)
+            deviation = self._bw_values_hz.item(bw)
+        self.hopRequested.emit(self._hop_run, hz, lvl, deviation, am, self._hop_force, not self.transmitting)
+        self._hop_force = False
+
+        self.current_hop.setText(f"CURRENT HOP: {self._entry_name(i)} ({hz / 1e6:.6f} MHz)")
+        self._set_style(self.current_hop, self._SS_HOP_ACTIVE)
+        if self._follow:
+            index = self.playlist_model.index(i)
+            self.playlist_view.setCurrentIndex(index)
+            self.playlist_view.scrollTo(index)
+
+        self.current_idx = (i + 1) % len(self._names)
+
+    def _on_hop_done(self, run: int, ok: bool, enabled: bool) -> None:
+        # A result from a run that Stop or Shutdown has since ended.
+        if run != self._hop_run or not self.playlist_running:
+            return
+        if enabled and not self.transmitting:
+            self._set_tx_on()
+        self.hop_status.setText("Hopping: ON" if ok else "Hopping: ON (last hop failed)")
+        self._set_style(self.hop_status, self._SS_OK if ok else self._SS_BAD)
+
+    def _update_state_polling(self) -> None:
+        # Only poll the device while the window can actually be seen.
+        active = self.connected and self.isVisible() and not self.isMinimized()
+        if active and not self.state_timer.isActive():
+            self.state_timer.start()
+            self._refresh_state()
+        elif not active:
+            self.state_timer.stop()
+
+    def changeEvent(self, event) -> None:  # type: ignore[override]
+        if event.type() == QEvent.Type.WindowStateChange:
+            self._update_state_polling()
+        super().changeEvent(event)
+
+    def showEvent(self, event) -> None:  # type: ignore[override]
+        super().showEvent(event)
+        self._update_state_polling()
+
+    def hideEvent(self, event) -> None:  # type: ignore[override]
+        super().hideEvent(event)
+        self._update_state_polling()
 
     def closeEvent(self, event) -> None:  # type: ignore[override]
         try:
@@ -629,6 +958,8 @@ class SMY02QtGUI(QMainWindow):
             self._shutdown()
             self._disconnect()
         finally:
+            self._io_thread.quit()
+            self._io_thread.wait()
             event.accept()
 
 
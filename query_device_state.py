@@ -9,24 +9,77 @@ import pyvisa
 from time import sleep
 import logging
 
+from src.visa_cache import get_rm
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
 
+
+# Settings read back in one compound query, grouped as they are displayed.
+# ERR? is queried on its own afterwards (see query_device_state).
+SECTIONS = (
+    ("FREQUENCY & AMPLITUDE", (
+        ("RF?", "RF frequency"),
+        ("LEVEL?", "Output level"),
+    )),
+    ("MODULATION & TONE", (
+        ("FM?", "FM status"),
+        ("AF?", "Audio frequency"),
+    )),
+    ("OUTPUT STATUS", (
+        ("OUTP?", "RF output"),
+    )),
+    ("ERROR STATUS", (
+        ("*ESR?", "Event Status Reg"),
+    )),
+)
+SETTING_QUERIES = tuple(q for _, fields in SECTIONS for q, _ in fields)
+
+
+def read_settings(instr):
+    """
+    Read every query in SETTING_QUERIES.
+
+    One compound query is tried first; if the device rejects it or the
+    reply does not split into one value per query, each query is sent on
+    its own instead.
+
+    Returns:
+        Dict mapping query to its stripped response, or to the exception
+        raised by that query
+    """
+    try:
+        parts = instr.query(";".join(SETTING_QUERIES)).split(";")
+        if len(parts) == len(SETTING_QUERIES):
+            return dict(zip(SETTING_QUERIES, (p.strip() for p in parts)))
+        logger.debug(f"Compound query returned {len(parts)} values; querying separately")
+    except Exception as e:
+        logger.debug(f"Compound query failed ({e}); querying separately")
+    
+    values = {}
+    for query in SETTING_QUERIES:
+        try:
+            values[query] = instr.query(query).strip()
+        except Exception as e:
+            values[query] = e
+    return values
+
+
 def query_device_state():
     """Query and display SMY02 configuration state."""
     
-    rm = pyvisa.ResourceManager()
-    devices = rm.list_resources()
+    rm = get_rm()
     
-    if "GPIB0::28::INSTR" not in devices:
-        logger.error("Device GPIB0::28::INSTR not found")
+    # Open the known address directly instead of enumerating the bus first.
+    try:
+        instr = rm.open_resource("GPIB0::28::INSTR")
+    except pyvisa.errors.VisaIOError as e:
+        logger.error(f"Device GPIB0::28::INSTR not found: {e}")
         return False
     
-    # Open device
-    instr = rm.open_resource("GPIB0::28::INSTR")
     instr.timeout = 5000
     instr.read_termination = '\r\n'
     instr.write_termination = '\r\n'
@@ -45,58 +98,20 @@ def query_device_state():
         sleep(0.1)
         
         # ============ QUERY ALL SETTINGS ============
-        logger.info("")
-        logger.info("FREQUENCY & AMPLITUDE:")
-        logger.info("-" * 60)
-        
-        try:
-            rf = instr.query("RF?")
-            logger.info(f"  RF frequency:     {rf.strip()}")
-        except Exception as e:
-            logger.warning(f"  RF? failed: {e}")
-        
-        try:
-            level = instr.query("LEVEL?")
-            logger.info(f"  Output level:     {level.strip()}")
-        except Exception as e:
-            logger.warning(f"  LEVEL? failed: {e}")
-        
-        logger.info("")
-        logger.info("MODULATION & TONE:")
-        logger.info("-" * 60)
-        
-        try:
-            fm_status = instr.query("FM?")
-            logger.info(f"  FM status:        {fm_status.strip()}")
-        except Exception as e:
-            logger.warning(f"  FM? failed: {e}")
-        
-        try:
-            af = instr.query("AF?")
-            logger.info(f"  Audio frequency:  {af.strip()}")
-        except Exception as e:
-            logger.warning(f"  AF? failed: {e}")
-        
-        logger.info("")
-        logger.info("OUTPUT STATUS:")
-        logger.info("-" * 60)
-        
-        try:
-            outp = instr.query("OUTP?")
-            logger.info(f"  RF output:        {outp.strip()}")
-        except Exception as e:
-            logger.warning(f"  OUTP? failed: {e}")
-        
-        logger.info("")
-        logger.info("ERROR STATUS:")
-        logger.info("-" * 60)
-        
-        try:
-            esr = instr.query("*ESR?")
-            logger.info(f"  Event Status Reg: {esr.strip()}")
-        except Exception as e:
-            logger.warning(f"  *ESR? failed: {e}")
-        
+        values = read_settings(instr)
+        
+        for section, fields in SECTIONS:
+            logger.info("")
+            logger.info(f"{section}:")
+            logger.info("-" * 60)
+            for query, label in fields:
+                value = values[query]
+                if isinstance(value, Exception):
+                    logger.warning(f"  {query} failed: {value}")
+                else:
+                    logger.info(f"  {label + ':':18s}{value}")
+        
+        # Kept out of the compound read: ERR? pops the error queue.
         try:
             err = instr.query("ERR?")
             logger.info(f"  Error query:      {err.strip()}")
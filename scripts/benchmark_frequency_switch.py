@@ -6,31 +6,47 @@ Modes:
 - write_only: send `RF <Hz>` only
 - write_esr : send `RF <Hz>` then query `*ESR?`
 
+Both are measured in the same sweep (write_only is the write portion of
+each write_esr step); --modes selects what is run and reported.
+
+With --batch N, N setpoints are joined with ';' into one write (and
+write_esr queries `*ESR?` once per batch); reported times are per step,
+i.e. each batch's time divided by N.
+
+The timed loops write pre-encoded payloads straight through the VISA
+library so pyvisa's per-call encoding and termination handling stay out
+of the measurement.
+
 This measures command/ack timing, not analyzer tracking.
 """
 
 from __future__ import annotations
 
 import argparse
-import statistics
+import pathlib
+import sys
 import time
 from typing import List
 
+import numpy as np
 import pyvisa
 
+# Allow running this script directly from project root without manual PYTHONPATH.
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from src.visa_cache import get_rm
+
 
 RESOURCE = "GPIB0::28::INSTR"
 
 
 def summarize_ms(samples_s: List[float]) -> str:
-    ms = [x * 1000.0 for x in samples_s]
-    ms_sorted = sorted(ms)
-    n = len(ms_sorted)
-    p50 = ms_sorted[int(0.50 * (n - 1))]
-    p95 = ms_sorted[int(0.95 * (n - 1))]
+    ms = np.asarray(samples_s, dtype=np.float64) * 1000.0
+    # "lower" keeps the previous sorted[int(q * (n - 1))] nearest-rank picks.
+    p50, p95 = np.percentile(ms, [50, 95], method="lower")
     return (
-        f"n={n} min={ms_sorted[0]:.2f} ms avg={statistics.mean(ms_sorted):.2f} ms "
-        f"p50={p50:.2f} ms p95={p95:.2f} ms max={ms_sorted[-1]:.2f} ms"
+        f"n={ms.size} min={ms.min():.2f} ms avg={ms.mean():.2f} ms "
+        f"p50={p50:.2f} ms p95={p95:.2f} ms max={ms.max():.2f} ms"
     )
 
 
@@ -43,22 +59,40 @@ def build_freqs(start_mhz: int, stop_mhz: int, step_mhz: int, cycles: int) -> Li
     return seq
 
 
+def batches(freqs: List[int], n: int) -> List[str]:
+    """Join consecutive setpoints into `RF a;RF b;...` commands of up to n steps."""
+    return [
+        ";".join(f"RF {hz}" for hz in freqs[i:i + n])
+        for i in range(0, len(freqs), n)
+    ]
+
+
 def main() -> int:
     ap = argparse.ArgumentParser()
     ap.add_argument("--start-mhz", type=int, default=108)
     ap.add_argument("--stop-mhz", type=int, default=155)
     ap.add_argument("--step-mhz", type=int, default=1)
     ap.add_argument("--cycles", type=int, default=3)
-    ap.add_argument("--inter-cmd-ms", type=float, default=0.0, help="Extra sleep between steps")
+    ap.add_argument("--inter-cmd-ms", type=float, default=0.0, help="Extra sleep between writes")
+    ap.add_argument("--batch", type=int, default=1, help="Setpoints per write (joined with ';')")
+    ap.add_argument(
+        "--modes", default="write_only,write_esr",
+        help="Comma-separated modes to report: write_only, write_esr",
+    )
     args = ap.parse_args()
-
-    rm = pyvisa.ResourceManager()
-    devices = rm.list_resources()
-    if RESOURCE not in devices:
-        print(f"ERROR: {RESOURCE} not found. Devices: {devices}")
+    if args.batch < 1:
+        ap.error("--batch must be >= 1")
+    modes = {m.strip() for m in args.modes.split(",") if m.strip()}
+    unknown = modes - {"write_only", "write_esr"}
+    if unknown or not modes:
+        ap.error(f"--modes: unknown or empty mode list {args.modes!r}")
+
+    rm = get_rm()
+    try:
+        instr = rm.open_resource(RESOURCE)
+    except pyvisa.errors.VisaIOError as e:
+        print(f"ERROR: {RESOURCE} not found: {e}")
         return 1
-
-    instr = rm.open_resource(RESOURCE)
     instr.timeout = 3000
     instr.read_termination = "\r\n"
     instr.write_termination = "\r\n"
@@ -70,9 +104,11 @@ def main() -> int:
         time.sleep(0.05)
 
         freqs = build_freqs(args.start_mhz, args.stop_mhz, args.step_mhz, args.cycles)
+        cmds = batches(freqs, args.batch)
         print(
             f"Benchmark points: {len(freqs)} "
-            f"({args.start_mhz}..{args.stop_mhz} MHz step {args.step_mhz}, cycles={args.cycles})"
+            f"({args.start_mhz}..{args.stop_mhz} MHz step {args.step_mhz}, cycles={args.cycles}, "
+            f"batch={args.batch})"
         )
 
         # Warmup
@@ -81,36 +117,40 @@ def main() -> int:
             time.sleep(0.02)
         instr.write("*CLS")
 
-        # Mode 1: write only
-        t_write: List[float] = []
-        for hz in freqs:
-            t0 = time.perf_counter()
-            instr.write(f"RF {hz}")
-            t1 = time.perf_counter()
-            t_write.append(t1 - t0)
-            if args.inter_cmd_ms > 0:
-                time.sleep(args.inter_cmd_ms / 1000.0)
-        print("write_only :", summarize_ms(t_write))
+        # Encode outside the timed loops and bypass the resource wrappers.
+        vlib, sess = instr.visalib, instr.session
+        term = instr.write_termination
+        payloads = [((cmd + term).encode("ascii"), cmd.count(";") + 1) for cmd in cmds]
+        esr_query = f"*ESR?{term}".encode("ascii")
 
-        # Mode 2: write + ESR check
-        instr.write("*CLS")
+        t_write: List[float] = []
         t_esr: List[float] = []
         esr_errors = 0
-        for hz in freqs:
+        check_esr = "write_esr" in modes
+        # One sweep serves both modes: write_only is the write alone,
+        # write_esr the write plus the *ESR? round trip that follows it.
+        for payload, steps in payloads:
             t0 = time.perf_counter()
-            instr.write(f"RF {hz}")
-            esr_resp = instr.query("*ESR?").strip()
+            vlib.write(sess, payload)
             t1 = time.perf_counter()
-            t_esr.append(t1 - t0)
-            try:
-                esr_val = int(esr_resp.split()[-1])
-            except Exception:
-                esr_val = -1
-            if esr_val not in (0,):
-                esr_errors += 1
+            t_write.append((t1 - t0) / steps)
+            if check_esr:
+                vlib.write(sess, esr_query)
+                esr_raw, _ = vlib.read(sess, 64)
+                t2 = time.perf_counter()
+                t_esr.append((t2 - t0) / steps)
+                try:
+                    esr_val = int(esr_raw.decode("ascii", "replace").split()[-1])
+                except Exception:
+                    esr_val = -1
+                if esr_val not in (0,):
+                    esr_errors += 1
             if args.inter_cmd_ms > 0:
                 time.sleep(args.inter_cmd_ms / 1000.0)
-        print("write_esr  :", summarize_ms(t_esr), f"errors={esr_errors}")
+        if "write_only" in modes:
+            print("write_only :", summarize_ms(t_write))
+        if check_esr:
+            print("write_esr  :", summarize_ms(t_esr), f"errors={esr_errors}")
         return 0
     finally:
         try:
@@ -5,27 +5,36 @@ Usage: python scripts/extract_colon_commands.py /path/to/manual.pdf
 """
 import sys
 from pathlib import Path
-from PyPDF2 import PdfReader
+
+from pdf_pages import page_texts
 import re
 
-def extract(path: Path):
-    reader = PdfReader(str(path))
-    commands = {}
-    for i, page in enumerate(reader.pages, start=1):
-        try:
-            text = page.extract_text() or ""
-        except Exception:
-            text = ""
+# Tokens made of letters/numbers/:?*=.- (upper-cased text only).
+TOKEN_RE = re.compile(r"[A-Z0-9\-_*\.:\?=]{2,}")
+
+def extract(path: Path, out) -> int:
+    """Write colon tokens to `out` page by page; return the unique token count.
+
+    Only the current page's tokens are held in memory. A token found on
+    several pages gets a COMMAND block for each page, in page order.
+    """
+    seen = set()
+    for i, text in page_texts(path):
         up = text.replace('\r','\n')
-        # find tokens containing colon and letters/numbers/:?*=.-
-        tokens = re.findall(r"[A-Z0-9\-_*\.:\?=]{2,}", up.upper())
-        for tok in tokens:
-            if ':' in tok:
-                # store a snippet: full line(s) containing token
-                for line in up.splitlines():
-                    if tok in line.upper():
-                        commands.setdefault(tok, set()).add((i, line.strip()))
-    return commands
+        page_cmds = {}
+        # single pass over lines: each colon token is stored with the line it is on
+        for line in up.splitlines():
+            for tok in TOKEN_RE.findall(line.upper()):
+                if ':' in tok:
+                    page_cmds.setdefault(tok, set()).add(line.strip())
+        for tok in sorted(page_cmds):
+            out.write(f'COMMAND: {tok}\n')
+            for line in sorted(page_cmds[tok]):
+                out.write(f'  Page {i}: {line}\n')
+            out.write('\n')
+        out.flush()
+        seen.update(page_cmds)
+    return len(seen)
 
 
 def main():
@@ -36,16 +45,11 @@ def main():
     if not pdf.exists():
         print('File not found:', pdf)
         sys.exit(1)
-    cmds = extract(pdf)
     out = Path('docs') / 'manual_colon_commands.txt'
     out.parent.mkdir(parents=True, exist_ok=True)
     with out.open('w', encoding='utf-8') as f:
-        for tok in sorted(cmds.keys()):
-            f.write(f'COMMAND: {tok}\n')
-            for page, line in sorted(cmds[tok]):
-                f.write(f'  Page {page}: {line}\n')
-            f.write('\n')
-    print(f'Found {len(cmds)} unique colon-commands; written to {out}')
+        count = extract(pdf, f)
+    print(f'Found {count} unique colon-commands; written to {out}')
 
 if __name__ == '__main__':
     main()
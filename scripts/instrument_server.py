@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Keep one SMY02 + tinySA session open and serve it over a Unix socket.
+
+Opening the GPIB session and the tinySA serial port costs seconds per
+script run. Start this server once, then run the measurement scripts with
+--server so they drive the already-open instruments:
+
+    python scripts/instrument_server.py &
+    python scripts/test_freq_range_with_tinysa.py --server /tmp/smy02.sock
+    python scripts/verify_bandwidth_with_tinysa.py --server /tmp/smy02.sock
+
+Protocol: one JSON object per line each way.
+    request:  {"target": "smy02" | "tinysa", "method": "<name>", "args": [...]}
+    reply:    {"ok": true, "result": ...} or {"ok": false, "error": "..."}
+
+Clients are served one at a time, so scripts never interleave commands.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import pathlib
+import socket
+import socketserver
+import sys
+import threading
+from typing import Any
+
+# Allow running this script directly from project root without manual PYTHONPATH.
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from src.smy02_controller import SMY02Controller
+
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+
+SOCKET_PATH = "/tmp/smy02.sock"
+
+# Methods a client may call. connect/disconnect stay with the server, which
+# owns the session.
+ALLOWED = {
+    "smy02": frozenset((
+        "set_frequency", "set_amplitude", "enable_output", "disable_output",
+        "set_modulation_fm", "set_modulation_am", "apply_hop",
+        "set_lfo_frequency", "enable_lfo", "disable_lfo",
+        "upload_list", "trigger_step", "sweep",
+        "get_frequency", "get_amplitude", "get_device_state",
+        "get_esr", "get_system_error", "get_err_and_esr", "flush_and_verify",
+        "clear_status", "reset",
+    )),
+    "tinysa": frozenset(("cmd", "scanraw")),
+}
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        for line in self.rfile:
+            try:
+                req = json.loads(line)
+                target, method = req["target"], req["method"]
+                if method not in ALLOWED.get(target, ()):
+                    raise ValueError(f"{target}.{method} not allowed")
+                obj = self.server.targets[target]
+                reply = {"ok": True, "result": getattr(obj, method)(*req.get("args", ()))}
+            except Exception as e:
+                reply = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+            self.wfile.write(json.dumps(reply).encode() + b"\n")
+
+
+class InstrumentServer(socketserver.UnixStreamServer):
+    def __init__(self, path: str, targets: dict):
+        self.targets = targets
+        super().__init__(path, _Handler)
+
+
+class _Connection:
+    """One line-protocol connection to a running InstrumentServer."""
+
+    def __init__(self, path: str):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(path)
+        self.file = self.sock.makefile("rwb")
+        # Callers may share the connection across threads; keep each
+        # request/reply pair together.
+        self._lock = threading.Lock()
+
+    def call(self, target: str, method: str, *args) -> Any:
+        req = {"target": target, "method": method, "args": list(args)}
+        with self._lock:
+            self.file.write(json.dumps(req).encode() + b"\n")
+            self.file.flush()
+            line = self.file.readline()
+        if not line:
+            raise ConnectionError("instrument server closed the connection")
+        reply = json.loads(line)
+        if not reply["ok"]:
+            raise RuntimeError(reply["error"])
+        return reply["result"]
+
+    def close(self) -> None:
+        try:
+            self.file.close()
+            self.sock.close()
+        except Exception:
+            pass
+
+
+class RemoteSMY02:
+    """Stand-in for SMY02Controller that forwards calls to the server."""
+
+    def __init__(self, conn: _Connection):
+        self._conn = conn
+
+    def connect(self) -> bool:
+        # The server connected at startup.
+        return True
+
+    def disconnect(self) -> None:
+        # Only the socket closes; the server keeps the GPIB session.
+        self._conn.close()
+
+    def __getattr__(self, name: str):
+        if name not in ALLOWED["smy02"]:
+            raise AttributeError(name)
+        return lambda *args: self._conn.call("smy02", name, *args)
+
+
+class RemoteTinySA:
+    """Stand-in for the scripts' tinySA clients, forwarding to the server."""
+
+    def __init__(self, conn: _Connection):
+        self._conn = conn
+
+    def cmd(self, command: str) -> str:
+        return self._conn.call("tinysa", "cmd", command)
+
+    cmd_text = cmd
+
+    def scanraw(self, start_hz: int, stop_hz: int, points: int) -> list:
+        return self._conn.call("tinysa", "scanraw", start_hz, stop_hz, points)
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def open_remote(path: str = SOCKET_PATH) -> tuple:
+    """
+    Connect to a running server.
+
+    Returns:
+        (RemoteSMY02, RemoteTinySA) sharing one connection; the server
+        serves one client at a time, so a second connection would wait
+    """
+    conn = _Connection(path)
+    return RemoteSMY02(conn), RemoteTinySA(conn)
+
+
+def main() -> int:
+    from test_freq_range_with_tinysa import SCAN_TIMEOUT_S, TINYSA_PORT, TinySA
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--socket", default=SOCKET_PATH)
+    ap.add_argument("--tinysa-port", default=TINYSA_PORT)
+    ap.add_argument("--scan-timeout-s", type=float, default=SCAN_TIMEOUT_S)
+    args = ap.parse_args()
+
+    ctrl = SMY02Controller()
+    if not ctrl.connect():
+        logger.error("SMY02 connect failed")
+        return 1
+    sa = TinySA(args.tinysa_port, scan_timeout_s=args.scan_timeout_s)
+
+    if os.path.exists(args.socket):
+        os.unlink(args.socket)
+    server = InstrumentServer(args.socket, {"smy02": ctrl, "tinysa": sa})
+    logger.info(f"Serving SMY02 ({ctrl.idn}) and tinySA on {args.socket}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Shutting down...")
+    finally:
+        server.server_close()
+        os.unlink(args.socket)
+        try:
+            ctrl.disable_output()
+            ctrl.disconnect()
+        except Exception:
+            pass
+        sa.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -8,7 +8,8 @@ Prints lines/pages that mention the keywords and writes a summary to
 """
 import sys
 from pathlib import Path
-from PyPDF2 import PdfReader
+
+from pdf_pages import page_texts
 
 KEYWORDS = [
     "FREQ", "SOUR:FREQ", "POW", "SOUR:POW", "OUTP", "MOD", "FM",
@@ -17,13 +18,8 @@ KEYWORDS = [
 ]
 
 def search_pdf(path: Path):
-    reader = PdfReader(str(path))
     matches = []
-    for i, page in enumerate(reader.pages, start=1):
-        try:
-            text = page.extract_text() or ""
-        except Exception:
-            text = ""
+    for i, text in page_texts(path):
         up = text.upper()
         for kw in KEYWORDS:
             if kw in up:
@@ -0,0 +1,48 @@
+"""Parallel page-text extraction shared by the manual-search scripts.
+
+Text extraction is CPU-bound and pages are independent, so pages are
+spread over a process pool. Each worker opens the PDF once and results
+come back in page order.
+
+PyMuPDF (fitz) is used when installed; it extracts text in C and is
+several times faster than PyPDF2, which remains the fallback.
+"""
+from multiprocessing import Pool
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+try:
+    import fitz
+except ImportError:
+    fitz = None
+    from PyPDF2 import PdfReader
+
+_doc = None
+
+
+def _load(path: str):
+    """Open the document: a fitz Document, or the PyPDF2 page list."""
+    if fitz is not None:
+        return fitz.open(path)
+    return PdfReader(path).pages
+
+
+def _open(path: str):
+    global _doc
+    _doc = _load(path)
+
+
+def _extract_page(index: int) -> str:
+    try:
+        if fitz is not None:
+            return _doc[index].get_text("text")
+        return _doc[index].extract_text() or ""
+    except Exception:
+        return ""
+
+
+def page_texts(path: Path, processes: Optional[int] = None) -> Iterator[Tuple[int, str]]:
+    """Yield (page_number, text) for every page, numbered from 1."""
+    count = len(_load(str(path)))
+    with Pool(processes, initializer=_open, initargs=(str(path),)) as pool:
+        yield from enumerate(pool.imap(_extract_page, range(count), chunksize=8), start=1)
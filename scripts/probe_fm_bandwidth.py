@@ -12,11 +12,17 @@ Use this to identify which command syntax your specific SMY02 firmware accepts.
 """
 
 import logging
-from time import sleep
+import pathlib
+import sys
 from typing import Optional
 
 import pyvisa
 
+# Allow running this script directly from project root without manual PYTHONPATH.
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from src.visa_cache import get_rm
+
 
 logging.basicConfig(
     level=logging.INFO,
@@ -26,6 +32,7 @@ logger = logging.getLogger(__name__)
 
 
 RESOURCE = "GPIB0::28::INSTR"
+BASELINE_CMDS = ("*CLS", "RF 144000000", "LEVEL -20", "FM:INT 1.000E+3", "AF 1000", "FM:ON")
 DEVIATIONS = [3125, 6250, 12500]
 COMMAND_TEMPLATES = [
     "FM:DEV {dev}",
@@ -48,14 +55,12 @@ def safe_query(instr, query: str, timeout_ms: int = 1200) -> Optional[str]:
 
 
 def main() -> int:
-    rm = pyvisa.ResourceManager()
-    devices = rm.list_resources()
-    logger.info("Available devices: %s", devices)
-    if RESOURCE not in devices:
-        logger.error("Device %s not found", RESOURCE)
+    rm = get_rm()
+    try:
+        instr = rm.open_resource(RESOURCE)
+    except pyvisa.errors.VisaIOError as e:
+        logger.error("Device %s not found: %s", RESOURCE, e)
         return 1
-
-    instr = rm.open_resource(RESOURCE)
     instr.timeout = 5000
     instr.read_termination = "\r\n"
     instr.write_termination = "\r\n"
@@ -64,10 +69,10 @@ def main() -> int:
         idn = safe_query(instr, "*IDN?") or "UNKNOWN"
         logger.info("Connected: %s", idn)
 
-        # Baseline config for repeatable FM tests.
-        for cmd in ("*CLS", "RF 144000000", "LEVEL -20", "FM:INT 1.000E+3", "AF 1000", "FM:ON"):
-            instr.write(cmd)
-            sleep(0.15)
+        # Baseline config for repeatable FM tests, in one write; *OPC? waits
+        # for it to be applied instead of sleeping after each command.
+        instr.write(";".join(BASELINE_CMDS))
+        safe_query(instr, "*OPC?")
 
         logger.info("Baseline FM?: %s", safe_query(instr, "FM?"))
         logger.info("Baseline AF?: %s", safe_query(instr, "AF?"))
@@ -79,11 +84,10 @@ def main() -> int:
 
             for tpl in COMMAND_TEMPLATES:
                 cmd = tpl.format(dev=dev, dev_e=dev_e)
-                instr.write("*CLS")
-                sleep(0.05)
                 instr.write(cmd)
-                sleep(0.18)
+                safe_query(instr, "*OPC?")
 
+                # Reading *ESR? also clears it for the next command.
                 esr = safe_query(instr, "*ESR?")
                 fm = safe_query(instr, "FM?")
                 af = safe_query(instr, "AF?")
@@ -5,25 +5,22 @@ Usage: python scripts/search_manual_keywords.py /path/to/manual.pdf
 """
 import sys
 from pathlib import Path
-from PyPDF2 import PdfReader
+
+from pdf_pages import page_texts
 import re
 
 KEYWORDS = [r"\bRF\b", r"\bLEVEL\b", r"\bFREQ\b", r"\bPOW\b", r"\bFM\b", r"FM:INT", r"\bAF\b", r"SYST:ERR\?", r"\*ESR\?", r"ERRORS?", r"ERR\b"]
+KW_RES = [(kw, re.compile(kw)) for kw in KEYWORDS]
 
 
 def search_pdf(path: Path):
-    reader = PdfReader(str(path))
     matches = []
-    for i, page in enumerate(reader.pages, start=1):
-        try:
-            text = page.extract_text() or ""
-        except Exception:
-            text = ""
+    for i, text in page_texts(path):
         lines = text.splitlines()
         for ln_idx, line in enumerate(lines):
             upper = line.upper()
-            for kw in KEYWORDS:
-                if re.search(kw, upper):
+            for kw, kw_re in KW_RES:
+                if kw_re.search(upper):
                     # capture a small context of +/-1 lines
                     context_lines = []
                     for j in range(max(0, ln_idx-1), min(len(lines), ln_idx+2)):
@@ -16,12 +16,13 @@ from __future__ import annotations
 
 import argparse
 import pathlib
-import statistics
+import select
 import sys
 import time
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
 from typing import List
 
+import numpy as np
 import serial
 
 sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
@@ -46,17 +47,10 @@ SETTLE_S = 0.05
 SCAN_TIMEOUT_S = 1.2
 
 
-@dataclass
-class Measurement:
-    target_hz: int
-    detected_hz: int
-    error_hz: int
-    ok: bool
-
-
 class TinySA:
     def __init__(self, port: str = TINYSA_PORT, baud: int = TINYSA_BAUD, scan_timeout_s: float = SCAN_TIMEOUT_S):
-        self.ser = serial.Serial(port, baud, timeout=0.2)
+        # Short timeout: reads return as soon as data stops, prompt ends replies.
+        self.ser = serial.Serial(port, baud, timeout=0.05)
         self.scan_timeout_s = scan_timeout_s
 
     def close(self) -> None:
@@ -65,34 +59,32 @@ class TinySA:
         except Exception:
             pass
 
-    def cmd(self, command: str, wait: float = 0.35) -> str:
+    def _read_until(self, marker: bytes, timeout: float) -> bytes:
+        """Read until `marker` arrives or `timeout` seconds pass, waking on data."""
+        fd = self.ser.fileno()
+        data = b""
+        end = time.time() + timeout
+        while marker not in data:
+            remaining = end - time.time()
+            if remaining <= 0:
+                break
+            ready, _, _ = select.select([fd], [], [], remaining)
+            if ready:
+                data += self.ser.read(self.ser.in_waiting or 1)
+        return data
+
+    def cmd(self, command: str, timeout: float = 1.0) -> str:
         self.ser.reset_input_buffer()
         self.ser.write((command + "\r").encode())
-        time.sleep(wait)
-        data = b""
-        end = time.time() + 1.0
-        while time.time() < end:
-            chunk = self.ser.read(4096)
-            if chunk:
-                data += chunk
-            else:
-                time.sleep(0.02)
+        # The shell prompt marks the end of the reply.
+        data = self._read_until(b"ch> ", timeout)
         return data.decode(errors="ignore").strip()
 
     def scanraw(self, start_hz: int, stop_hz: int, points: int) -> List[int]:
         self.ser.reset_input_buffer()
         self.ser.write((f"scanraw {start_hz} {stop_hz} {points}\r").encode())
-        data = b""
-        end = time.time() + self.scan_timeout_s
-        while time.time() < end:
-            chunk = self.ser.read(8192)
-            if chunk:
-                data += chunk
-                # Prompt seen -> frame complete.
-                if b"}ch> " in data:
-                    break
-            else:
-                time.sleep(0.02)
+        # Prompt seen -> frame complete.
+        data = self._read_until(b"}ch> ", self.scan_timeout_s)
         return self._parse_scanraw(data)
 
     @staticmethod
@@ -101,7 +93,15 @@ class TinySA:
         end = frame.rfind(b"}")
         if start < 0 or end < 0 or end <= start:
             raise RuntimeError("scanraw frame delimiters not found")
-        payload = frame[start + 1 : end]
+        # A view, not a copy; numpy and the fallback loop both index it directly.
+        payload = memoryview(frame)[start + 1 : end]
+        arr = np.frombuffer(payload, dtype=np.uint8)
+        # Clean frame: strict repeat of b'x' <lo> <hi>, decoded in one pass.
+        if arr.size and arr.size % 3 == 0 and (arr[0::3] == ord("x")).all():
+            lo = arr[1::3].astype(np.uint16)
+            hi = arr[2::3].astype(np.uint16)
+            return (lo | (hi << 8)).tolist()
+        # Otherwise resynchronise on each b'x' marker.
         out: List[int] = []
         i = 0
         while i + 2 < len(payload):
@@ -116,7 +116,7 @@ class TinySA:
 
 
 def detect_peak_frequency(start_hz: int, stop_hz: int, samples: List[int]) -> int:
-    peak_idx = max(range(len(samples)), key=lambda i: samples[i])
+    peak_idx = int(np.argmax(samples))
     bin_hz = (stop_hz - start_hz) / max(1, len(samples) - 1)
     return int(start_hz + peak_idx * bin_hz)
 
@@ -134,11 +134,21 @@ def main() -> int:
     ap.add_argument("--settle-s", type=float, default=SETTLE_S)
     ap.add_argument("--scan-timeout-s", type=float, default=SCAN_TIMEOUT_S)
     ap.add_argument("--rbw", type=str, default="3")
+    ap.add_argument("--server", help="Use a running instrument_server.py at this socket path")
     args = ap.parse_args()
 
-    ctrl = SMY02Controller()
-    sa = TinySA(scan_timeout_s=args.scan_timeout_s)
-    measurements: List[Measurement] = []
+    if args.server:
+        # Scan timeout is then the server's --scan-timeout-s.
+        from instrument_server import open_remote
+        ctrl, sa = open_remote(args.server)
+    else:
+        ctrl = SMY02Controller()
+        sa = TinySA(scan_timeout_s=args.scan_timeout_s)
+
+    # Per-step results as parallel arrays; detected 0 marks a failed set_frequency.
+    target = np.arange(args.start_mhz, args.stop_mhz + 1, args.step_mhz, dtype=np.int64) * 1_000_000
+    detected = np.zeros(target.size, dtype=np.int64)
+    ok = np.zeros(target.size, dtype=np.bool_)
     t_start = time.time()
 
     try:
@@ -157,36 +167,45 @@ def main() -> int:
         if not ctrl.enable_output():
             print("WARNING: RF enable reported failure; continuing")
 
-        for mhz in range(args.start_mhz, args.stop_mhz + 1, args.step_mhz):
-            target_hz = mhz * 1_000_000
-            ok = ctrl.set_frequency(target_hz)
-            if not ok:
-                print(f"FAIL set_frequency {mhz} MHz")
-                measurements.append(Measurement(target_hz, 0, 0, False))
-                continue
-
-            time.sleep(args.settle_s)
-            start_hz = target_hz - args.span_hz // 2
-            stop_hz = target_hz + args.span_hz // 2
-            samples = sa.scanraw(start_hz, stop_hz, args.points)
-            detected_hz = detect_peak_frequency(start_hz, stop_hz, samples)
-            error_hz = detected_hz - target_hz
-            pass_ok = abs(error_hz) <= args.tolerance_hz
-            measurements.append(Measurement(target_hz, detected_hz, error_hz, pass_ok))
-
-            status = "OK" if pass_ok else "FAIL"
-            print(
-                f"{status} target={mhz:3d}.000 MHz "
-                f"detected={detected_hz/1e6:9.6f} MHz "
-                f"error={error_hz:+7d} Hz"
-            )
-
-        total = len(measurements)
-        passed = sum(1 for m in measurements if m.ok)
+        targets = target.tolist()
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            next_set = pool.submit(ctrl.set_frequency, targets[0]) if targets else None
+            for i, target_hz in enumerate(targets):
+                mhz = target_hz // 1_000_000
+                set_ok = next_set.result()
+                if set_ok:
+                    time.sleep(args.settle_s)
+                    start_hz = target_hz - args.span_hz // 2
+                    stop_hz = target_hz + args.span_hz // 2
+                    samples = sa.scanraw(start_hz, stop_hz, args.points)
+                # The scan is in, so the carrier may move: retune for the next
+                # step while this one is evaluated and printed.
+                if i + 1 < len(targets):
+                    next_set = pool.submit(ctrl.set_frequency, targets[i + 1])
+                if not set_ok:
+                    print(f"FAIL set_frequency {mhz} MHz")
+                    continue
+
+                detected_hz = detect_peak_frequency(start_hz, stop_hz, samples)
+                error_hz = detected_hz - target_hz
+                pass_ok = abs(error_hz) <= args.tolerance_hz
+                detected[i] = detected_hz
+                ok[i] = pass_ok
+
+                status = "OK" if pass_ok else "FAIL"
+                print(
+                    f"{status} target={mhz:3d}.000 MHz "
+                    f"detected={detected_hz/1e6:9.6f} MHz "
+                    f"error={error_hz:+7d} Hz"
+                )
+
+        total = int(target.size)
+        passed = int(ok.sum())
         failed = total - passed
-        errors = [abs(m.error_hz) for m in measurements if m.detected_hz != 0]
-        avg_err = int(statistics.mean(errors)) if errors else 0
-        max_err = max(errors) if errors else 0
+        hit = detected != 0
+        errors = np.abs(detected[hit] - target[hit])
+        avg_err = int(errors.mean()) if errors.size else 0
+        max_err = int(errors.max()) if errors.size else 0
         elapsed = time.time() - t_start
         step_intervals = max(1, total - 1)
         sec_per_step = elapsed / step_intervals
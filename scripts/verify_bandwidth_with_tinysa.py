@@ -11,14 +11,16 @@ Workflow:
 
 from __future__ import annotations
 
+import argparse
 import logging
 import pathlib
-import statistics
+import select
 import sys
 import time
 from dataclasses import dataclass
 from typing import List, Tuple
 
+import numpy as np
 import serial
 
 # Allow running this script directly from project root without manual PYTHONPATH.
@@ -61,7 +63,8 @@ class SweepResult:
 
 class TinySAClient:
     def __init__(self, port: str = TINYSA_PORT, baud: int = TINYSA_BAUD):
-        self.ser = serial.Serial(port, baud, timeout=0.2)
+        # Short timeout: reads return as soon as data stops, prompt ends replies.
+        self.ser = serial.Serial(port, baud, timeout=0.05)
 
     def close(self) -> None:
         try:
@@ -69,18 +72,25 @@ class TinySAClient:
         except Exception:
             pass
 
-    def cmd_text(self, cmd: str, wait: float = 0.3) -> str:
+    def _read_until(self, marker: bytes, timeout: float) -> bytes:
+        """Read until `marker` arrives or `timeout` seconds pass, waking on data."""
+        fd = self.ser.fileno()
+        data = b""
+        end = time.time() + timeout
+        while marker not in data:
+            remaining = end - time.time()
+            if remaining <= 0:
+                break
+            ready, _, _ = select.select([fd], [], [], remaining)
+            if ready:
+                data += self.ser.read(self.ser.in_waiting or 1)
+        return data
+
+    def cmd_text(self, cmd: str, timeout: float = 1.0) -> str:
         self.ser.reset_input_buffer()
         self.ser.write((cmd + "\r").encode())
-        time.sleep(wait)
-        out = b""
-        end = time.time() + 1.0
-        while time.time() < end:
-            chunk = self.ser.read(4096)
-            if chunk:
-                out += chunk
-            else:
-                time.sleep(0.02)
+        # The shell prompt marks the end of the reply.
+        out = self._read_until(b"ch> ", timeout)
         return out.decode(errors="ignore")
 
     def scanraw(self, start_hz: int, stop_hz: int, points: int) -> List[int]:
@@ -88,14 +98,8 @@ class TinySAClient:
         self.ser.reset_input_buffer()
         self.ser.write((cmd + "\r").encode())
 
-        data = b""
-        end = time.time() + 2.5
-        while time.time() < end:
-            chunk = self.ser.read(8192)
-            if chunk:
-                data += chunk
-            else:
-                time.sleep(0.02)
+        # Prompt after the closing brace -> frame complete.
+        data = self._read_until(b"}ch> ", 2.5)
 
         return self._parse_scanraw_frame(data)
 
@@ -110,7 +114,16 @@ class TinySAClient:
         if start < 0 or end < 0 or end <= start:
             raise RuntimeError("Could not find scanraw frame delimiters")
 
-        payload = data[start + 1 : end]
+        # A view, not a copy; numpy and the fallback loop both index it directly.
+        payload = memoryview(data)[start + 1 : end]
+        arr = np.frombuffer(payload, dtype=np.uint8)
+        # Clean frame: strict repeat of b'x' <lo> <hi>, decoded in one pass.
+        if arr.size and arr.size % 3 == 0 and (arr[0::3] == ord("x")).all():
+            lo = arr[1::3].astype(np.uint16)
+            hi = arr[2::3].astype(np.uint16)
+            return (lo | (hi << 8)).tolist()
+
+        # Otherwise resynchronise on each b'x' marker.
         samples: List[int] = []
         i = 0
         while i + 2 < len(payload):
@@ -128,29 +141,35 @@ class TinySAClient:
 
 
 def width_metric(samples: List[int], bin_hz: float) -> Tuple[int, float, int, int]:
-    peak_val = max(samples)
-    peak_idx = samples.index(peak_val)
-    noise_floor = statistics.median(samples)
+    arr = np.asarray(samples)
+    peak_idx = int(np.argmax(arr))
+    peak_val = int(arr[peak_idx])
+    noise_floor = np.median(arr)
 
     # Relative threshold robust against absolute scaling differences.
     threshold = int(noise_floor + 0.35 * (peak_val - noise_floor))
 
-    left = peak_idx
-    while left > 0 and samples[left] >= threshold:
-        left -= 1
-
-    right = peak_idx
-    last = len(samples) - 1
-    while right < last and samples[right] >= threshold:
-        right += 1
+    # Nearest sub-threshold bins either side of the peak (or the sweep edges).
+    below = np.flatnonzero(arr < threshold)
+    k = int(np.searchsorted(below, peak_idx))
+    left = int(below[k - 1]) if k > 0 else 0
+    right = int(below[k]) if k < below.size else len(arr) - 1
 
     width_bins = max(0, right - left - 1)
     return width_bins, width_bins * bin_hz, peak_idx, peak_val
 
 
 def main() -> int:
-    ctrl = SMY02Controller()
-    tiny = TinySAClient()
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--server", help="Use a running instrument_server.py at this socket path")
+    args = ap.parse_args()
+
+    if args.server:
+        from instrument_server import open_remote
+        ctrl, tiny = open_remote(args.server)
+    else:
+        ctrl = SMY02Controller()
+        tiny = TinySAClient()
 
     try:
         if not ctrl.connect():
@@ -4,11 +4,18 @@ Safe shutdown script for SMY02.
 
 Explicitly disables RF output, FM modulation, and verifies shutdown state.
 Run this to turn off the signal generator completely.
+Set SMY02_VERBOSE=1 for the step-by-step report; by default a run logs a
+one-line summary.
 """
 
+import atexit
 import pyvisa
-from time import sleep
 import logging
+import os
+import threading
+
+from src.visa_cache import get_rm
+from src.visa_sync import sync_write
 
 logging.basicConfig(
     level=logging.INFO,
@@ -16,127 +23,216 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def shutdown_smy02():
-    """Safely shut down SMY02 signal generator."""
-    
-    rm = pyvisa.ResourceManager()
-    devices = rm.list_resources()
-    
-    if "GPIB0::28::INSTR" not in devices:
-        logger.error("Device GPIB0::28::INSTR not found")
+
+RESOURCE = "GPIB0::28::INSTR"
+TERMINATION = '\r\n'
+
+SEP = "=" * 70
+DASH = "-" * 70
+
+# Banners and per-step progress only with SMY02_VERBOSE=1; otherwise a
+# shutdown logs one summary line (plus any warnings and errors).
+_VERBOSE = os.environ.get("SMY02_VERBOSE") == "1"
+
+# Timeout for the post-reset verification reads.
+VERIFY_TIMEOUT_MS = 500
+
+DISABLE_CMDS = ("LEVEL:OFF", "FM:OFF", "OUTP OFF")
+# *RST restores an unmuted default level, so the reset is followed by the
+# mute again; a later run's safe_state() check then sees the device muted.
+RESET_CMD = "*CLS;*RST;LEVEL:OFF"
+
+# Exact LEVEL?/FM? replies while muted and with FM off.
+LEVEL_OFF_REPLY = "LEVEL:OFF"
+FM_OFF_REPLY = "FM:OFF"
+
+VERIFY_QUERIES = (
+    ("RF?", "RF Frequency"),
+    ("LEVEL?", "Output Level"),
+    ("FM?", "FM Status"),
+    ("*ESR?", "Event Status"),
+    ("ERR?", "Error Queue"),
+)
+
+
+# Sessions kept open across shutdown_smy02() calls, keyed by address; see
+# close_smy02(). Each address has its own lock, so shutdowns of different
+# instruments can run in parallel threads:
+#     ThreadPoolExecutor(len(addrs)).map(shutdown_smy02, addrs)
+_instrs = {}
+_locks = {}
+_registry_lock = threading.Lock()
+
+
+def _lock_for(address):
+    """Return the lock serializing all use of the session at `address`."""
+    with _registry_lock:
+        return _locks.setdefault(address, threading.RLock())
+
+
+def _get_instr(address):
+    """Return the cached session for `address`, opening it on first use."""
+    instr = _instrs.get(address)
+    if instr is None:
+        # Open the known address directly instead of enumerating the bus first.
+        instr = get_rm().open_resource(address)
+        instr.timeout = 5000
+        instr.read_termination = TERMINATION
+        instr.write_termination = TERMINATION
+        with _registry_lock:
+            _instrs[address] = instr
+    return instr
+
+
+def close_smy02(address=None):
+    """
+    Close the cached session for `address`, or every session if None.
+
+    Registered to run at interpreter exit.
+    """
+    with _registry_lock:
+        addresses = [address] if address is not None else list(_instrs)
+    for addr in addresses:
+        with _lock_for(addr):
+            instr = _instrs.pop(addr, None)
+            if instr is not None:
+                instr.close()
+                logger.info(f"Device {addr} disconnected")
+
+
+atexit.register(close_smy02)
+
+
+def safe_state(instr):
+    """
+    Check in one round trip whether RF is muted and FM is off.
+
+    Returns:
+        The LEVEL?;FM? response if both report OFF, otherwise None
+    """
+    try:
+        resp = instr.query("LEVEL?;FM?").strip()
+        level, fm = resp.split(";")
+    except Exception as e:
+        logger.debug(f"Safe-state probe failed: {e}")
+        return None
+    if level.strip().upper() == LEVEL_OFF_REPLY and fm.strip().upper() == FM_OFF_REPLY:
+        return resp
+    return None
+
+
+def shutdown_smy02(address=RESOURCE):
+    """Safely shut down the SMY02 signal generator at `address`."""
+    with _lock_for(address):
+        return _shutdown(address)
+
+
+def _shutdown(address):
+    try:
+        instr = _get_instr(address)
+    except pyvisa.errors.VisaIOError as e:
+        logger.error(f"Device {address} not found: {e}")
         return False
     
-    # Open device
-    instr = rm.open_resource("GPIB0::28::INSTR")
-    instr.timeout = 5000
-    instr.read_termination = '\r\n'
-    instr.write_termination = '\r\n'
-    
     try:
-        logger.info("=" * 70)
-        logger.info("SMY02 Shutdown Sequence")
-        logger.info("=" * 70)
-        
         # Device identity
         idn = instr.query("*IDN?")
-        logger.info(f"Device: {idn}\n")
-        
-        # ============ SHUTDOWN SEQUENCE ============
-        logger.info("SHUTDOWN STEPS:")
-        logger.info("-" * 70)
-        
-        # 1. Disable RF output first
-        logger.info("1. Disabling RF output (OUTP OFF)...")
-        instr.write("OUTP OFF")
-        sleep(0.3)
-        logger.info("   ✓ OUTP OFF sent\n")
-        
-        # 2. Disable FM modulation
-        logger.info("2. Disabling FM modulation (FM:OFF or FM OFF)...")
-        instr.write("FM:OFF")
-        sleep(0.2)
-        logger.info("   ✓ FM:OFF sent\n")
-        
-        # 3. Try alternate FM off command
-        logger.info("3. Trying alternate FM disable (FM OFF)...")
-        instr.write("FM OFF")
-        sleep(0.2)
-        logger.info("   ✓ FM OFF sent\n")
-        
-        # 4. Disable output level (CRITICAL - this actually disables RF output per manual)
-        logger.info("4. Disabling output level (LEVEL:OFF)...")
-        instr.write("LEVEL:OFF")
-        sleep(0.2)
-        logger.info("   ✓ LEVEL:OFF sent\n")
-        
-        # 5. Reset device to defaults
-        logger.info("5. Resetting device to factory defaults (*RST)...")
-        instr.write("*RST")
-        sleep(0.5)
-        logger.info("   ✓ *RST sent\n")
-        
-        # 6. Clear status
-        logger.info("6. Clearing status (*CLS)...")
-        instr.write("*CLS")
-        sleep(0.1)
-        logger.info("   ✓ *CLS sent\n")
-        
-        # ============ VERIFY SHUTDOWN ============
-        logger.info("=" * 70)
-        logger.info("VERIFYING SHUTDOWN STATE:")
-        logger.info("-" * 70)
-        
-        sleep(0.5)
-        
-        try:
-            rf = instr.query("RF?")
-            logger.info(f"RF Frequency:    {rf.strip()}")
-        except Exception as e:
-            logger.warning(f"RF? query failed: {e}")
-        
-        try:
-            level = instr.query("LEVEL?")
-            logger.info(f"Output Level:    {level.strip()}")
-        except Exception as e:
-            logger.warning(f"LEVEL? query failed: {e}")
+        if _VERBOSE:
+            logger.info("\n".join((SEP, "SMY02 Shutdown Sequence", SEP, f"Device: {idn}\n")))
         
-        try:
-            fm = instr.query("FM?")
-            logger.info(f"FM Status:       {fm.strip()}")
-        except Exception as e:
-            logger.warning(f"FM? query failed: {e}")
+        # A previous shutdown already left RF muted and FM off: nothing to do.
+        state = safe_state(instr)
+        if state:
+            logger.info(f"Already shut down ({state}); skipping shutdown sequence")
+            return True
         
+        # ============ SHUTDOWN SEQUENCE ============
+        # Each step waits on *OPC? rather than a fixed sleep; in verbose mode
+        # each step's outcome is logged as one record.
+        if _VERBOSE:
+            logger.info("\n".join(("SHUTDOWN STEPS:", DASH)))
+        
+        # 1. Mute, FM off and output off in one write. LEVEL:OFF (CRITICAL -
+        # this actually disables RF output per manual) and FM:OFF go first so
+        # a rejected OUTP OFF at the end cannot stop them.
+        cmd = ";".join(DISABLE_CMDS)
+        sync_write(instr, cmd)
+        if _VERBOSE:
+            logger.info(f"1. Disabling output level, FM modulation and RF output ({cmd})...\n"
+                        f"   ✓ {cmd} sent\n")
+        
+        # 2. Alternate FM off command, only if FM:OFF did not take effect
         try:
-            esr = instr.query("*ESR?")
-            logger.info(f"Event Status:    {esr.strip()}")
+            fm_off = "OFF" in instr.query("FM?").upper()
         except Exception as e:
-            logger.warning(f"*ESR? query failed: {e}")
+            logger.debug(f"FM? readback failed: {e}")
+            fm_off = False
+        if not fm_off:
+            sync_write(instr, "FM OFF")
+        if _VERBOSE:
+            logger.info("2. FM? reports off; alternate FM disable not needed\n" if fm_off else
+                        "2. Trying alternate FM disable (FM OFF)...\n   ✓ FM OFF sent\n")
+        
+        # 3. Clear status, reset to defaults and mute again in one write
+        sync_write(instr, RESET_CMD)
+        if _VERBOSE:
+            logger.info(f"3. Clearing status, resetting to factory defaults and muting ({RESET_CMD})...\n"
+                        f"   ✓ {RESET_CMD} complete\n")
         
+        # ============ VERIFY SHUTDOWN ============
+        # Short timeout: a query the device dropped after *RST should not
+        # stall for the full 5 s session timeout.
+        saved_timeout = instr.timeout
+        instr.timeout = VERIFY_TIMEOUT_MS
         try:
-            err = instr.query("ERR?")
-            logger.info(f"Error Queue:     {err.strip()}")
-        except Exception as e:
-            logger.warning(f"ERR? query failed: {e}")
-        
-        logger.info("")
-        logger.info("=" * 70)
-        logger.info("✓ Shutdown Complete")
-        logger.info("=" * 70)
-        logger.info("RF output should now be OFF and device reset to defaults.")
-        logger.info("If signal is still detected on TinySA, check physical connectors")
-        logger.info("and verify the signal generator is not powered from a different source.")
-        logger.info("=" * 70)
+            # One compound query; per-query reads only if it is rejected.
+            try:
+                parts = instr.query(";".join(q for q, _ in VERIFY_QUERIES)).split(";")
+                if len(parts) != len(VERIFY_QUERIES):
+                    raise ValueError(f"expected {len(VERIFY_QUERIES)} values, got {len(parts)}")
+            except Exception as e:
+                logger.debug(f"Compound verify query failed ({e}); querying separately")
+                parts = None
+            
+            lines = [SEP, "VERIFYING SHUTDOWN STATE:", DASH]
+            summary = []
+            failed = False
+            for i, (query, label) in enumerate(VERIFY_QUERIES):
+                try:
+                    value = (parts[i] if parts else instr.query(query)).strip()
+                    lines.append(f"{label + ':':17s}{value}")
+                    summary.append(value)
+                except Exception as e:
+                    lines.append(f"{query} query failed: {e}")
+                    summary.append(f"{query} failed")
+                    failed = True
+        finally:
+            instr.timeout = saved_timeout
+        # The full readout always accompanies a failure.
+        if failed or _VERBOSE:
+            logger.log(logging.WARNING if failed else logging.INFO, "\n".join(lines))
+        
+        if _VERBOSE:
+            logger.info("\n".join((
+                "",
+                SEP,
+                "✓ Shutdown Complete",
+                SEP,
+                "RF output should now be OFF and device reset to defaults.",
+                "If signal is still detected on TinySA, check physical connectors",
+                "and verify the signal generator is not powered from a different source.",
+                SEP,
+            )))
+        else:
+            logger.info(f"SMY02 shutdown complete ({address}): {'; '.join(summary)}")
         
         return True
         
     except Exception as e:
-        logger.error(f"Error during shutdown: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception(f"Error during shutdown: {e}")
+        # The session may be unusable; reopen on the next call.
+        close_smy02(address)
         return False
-    finally:
-        instr.close()
-        logger.info("Device disconnected")
 
 if __name__ == "__main__":
     success = shutdown_smy02()
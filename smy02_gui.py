@@ -11,17 +11,24 @@ Features:
 """
 
 import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
+from tkinter import ttk, messagebox
+import itertools
 import threading
-from time import sleep
+from concurrent.futures import ThreadPoolExecutor
 import json
-import csv
 import os
 import sys
-import copy
+import tempfile
 from pathlib import Path
 import logging
 
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # optional: faster playlist save/load, stdlib json otherwise
+    orjson = None
+
 from src.smy02_controller import SMY02Controller
 
 logging.basicConfig(
@@ -31,6 +38,54 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def _json_dumps(obj, compact=False):
+    if orjson is not None:
+        return orjson.dumps(obj) if compact else orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    if compact:
+        return json.dumps(obj, separators=(",", ":")).encode()
+    return json.dumps(obj, indent=2).encode()
+
+
+def _json_loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _write_atomic(path, data):
+    """
+    Replace the file at `path` with the bytes `data`.
+
+    The bytes go to a temp file in the same directory with raw os.write()
+    calls (no TextIOWrapper or buffer copy), are fsynced, and the temp file
+    is renamed over `path`, so a crash mid-save never leaves a truncated file.
+    The temp file gets the existing file's mode, or the umask default for a
+    new file, instead of mkstemp()'s owner-only 0600.
+    """
+    path = Path(path)
+    try:
+        mode = path.stat().st_mode & 0o7777
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        mode = 0o666 & ~umask
+    fd, tmp = tempfile.mkstemp(dir=path.resolve().parent, suffix=".tmp")
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+        os.fsync(fd)
+        os.close(fd)
+        fd = None
+        os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    except BaseException:
+        if fd is not None:
+            os.close(fd)
+        os.unlink(tmp)
+        raise
+
+
 class SMY02GUI:
     """GUI for SMY02 Signal Generator Control."""
     
@@ -40,6 +95,10 @@ class SMY02GUI:
         '12.5 kHz': 6250,      # ±6.25 kHz deviation for 12.5 kHz BW
         '25 kHz': 12500,       # ±12.5 kHz deviation for 25 kHz BW
     }
+    # Bandwidth index by normalized name, so "12.5kHz" and "12.5 KHZ" in
+    # imported files map to "12.5 kHz"; see _bw_index().
+    _BW_INDEX = {name.lower().replace(' ', ''): i for i, name in enumerate(BANDWIDTHS)}
+    _BW_DEFAULT = _BW_INDEX['12.5khz']
     
     def __init__(self, root):
         """Initialize the GUI."""
@@ -52,23 +111,64 @@ class SMY02GUI:
         self.transmitting = False
         self.playlist_running = False
         self.playlist_thread = None
+        # Set to stop the running hop sequence; a new Event per run, so a
+        # worker still finishing its last hop cannot affect the next run.
+        self._hop_stop_event = threading.Event()
         
         # Data
         self.presets = {}
+        # st_mtime_ns of presets.json as last loaded or written; see _load_presets().
+        self._presets_mtime = None
         self.current_preset = None
-        self.playlist = []
+        # Playlist stored as parallel arrays, as in the Qt GUI; _bw_idx
+        # indexes BANDWIDTHS.
+        self._bw_names = list(self.BANDWIDTHS)
+        self._bw_values_hz = np.array(list(self.BANDWIDTHS.values()), dtype=np.int64)
+        self._freq_hz = np.empty(0, dtype=np.int64)
+        self._level = np.empty(0, dtype=np.float64)
+        self._bw_idx = np.empty(0, dtype=np.int8)
+        self._names = []
+        # Rows currently shown in the playlist listbox, kept in step with it.
+        self._listbox_labels = []
+        # See _request_listbox_refresh().
+        self._listbox_refresh_queued = False
+        self._pending_listbox_select = None
         self.current_playlist_index = 0
         self.active_hop_playlist = None
-        self.state_refresh_in_progress = False
-        self.state_refresh_job = None
+        # Set to make the state monitor thread read immediately (or notice a
+        # disconnect) instead of waiting out its interval.
+        self.state_refresh_event = threading.Event()
+        # One reused thread for one-shot controller operations (RF enable);
+        # repeated clicks queue behind each other instead of racing.
+        self._io_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="smy02-io")
+        # Last options written to each status widget; see _set_label().
+        self._label_options = {}
         self.auto_follow_hop_var = tk.BooleanVar(value=True)
         self.highlight_hop_in_list_var = tk.BooleanVar(value=False)
         self.sync_controls_with_hop_var = tk.BooleanVar(value=False)
+        # Listbox row currently painted as the hop marker, if any.
+        self._hop_marker_idx = None
+        self._mirror_var(self.sync_controls_with_hop_var, "_sync_controls_with_hop")
         
         self._create_widgets()
         self._load_presets()
         self.root.protocol("WM_DELETE_WINDOW", self._on_closing)
         
+    def _mirror_var(self, var, attr):
+        """
+        Keep `self.<attr>` equal to `var`'s value via a write trace.
+
+        The hop worker reads the plain attribute instead of calling
+        var.get(), which goes through Tcl and is not safe off the Tk thread.
+        """
+        def update(*_):
+            try:
+                setattr(self, attr, var.get())
+            except tk.TclError:
+                pass  # half-typed entry text; keep the last valid value
+        update()
+        var.trace_add("write", update)
+        
     def _create_widgets(self):
         """Create GUI widgets."""
         
@@ -149,8 +249,11 @@ class SMY02GUI:
         
         ttk.Label(preset_frame, text="Load Preset:").grid(row=1, column=0, sticky=tk.W, padx=5, pady=5)
         self.preset_list_var = tk.StringVar()
+        # Re-read presets.json each time the list opens, so edits made by
+        # another instance show up; unchanged files are skipped by mtime.
         self.preset_combo = ttk.Combobox(preset_frame, textvariable=self.preset_list_var,
-                                        state="readonly", width=20)
+                                        state="readonly", width=20,
+                                        postcommand=self._load_presets)
         self.preset_combo.grid(row=1, column=1, padx=5, pady=5)
         self.preset_combo.bind("<<ComboboxSelected>>", lambda e: self._load_preset())
         
@@ -173,6 +276,7 @@ class SMY02GUI:
         ttk.Button(top_row, text="Stop Hopping", command=self._stop_hopping).pack(side=tk.LEFT, padx=5)
         ttk.Label(top_row, text="Dwell Time (sec):").pack(side=tk.LEFT, padx=10)
         self.dwell_var = tk.DoubleVar(value=2.0)
+        self._mirror_var(self.dwell_var, "_dwell_seconds")
         ttk.Spinbox(top_row, from_=0.5, to=60, textvariable=self.dwell_var, width=8).pack(side=tk.LEFT)
         ttk.Button(top_row, text="Add to Playlist", command=self._add_to_playlist).pack(side=tk.LEFT, padx=5)
         ttk.Button(top_row, text="Remove Selected", command=self._remove_from_playlist).pack(side=tk.LEFT, padx=5)
@@ -185,6 +289,8 @@ class SMY02GUI:
         ttk.Button(bottom_row, text="Export CSV", command=self._export_playlist_csv).pack(side=tk.LEFT, padx=5)
         ttk.Button(bottom_row, text="Save Playlist", command=self._save_playlist_json).pack(side=tk.LEFT, padx=5)
         ttk.Button(bottom_row, text="Load Playlist", command=self._load_playlist_json).pack(side=tk.LEFT, padx=5)
+        # Shown only while a CSV import is parsing in the background.
+        self.import_progress = ttk.Progressbar(bottom_row, mode="indeterminate", length=100)
         ttk.Checkbutton(
             bottom_row,
             text="Auto-scroll to current hop",
@@ -266,6 +372,7 @@ class SMY02GUI:
             list_frame,
             yscrollcommand=scrollbar.set,
             height=8,
+            selectmode=tk.EXTENDED,
             selectbackground="#FFD400",
             selectforeground="#000000",
             activestyle="none",
@@ -284,6 +391,10 @@ class SMY02GUI:
             font=("Arial", 13, "bold"),
         )
         self.current_hop_label.pack(fill=tk.X, pady=2)
+        # Non-fatal hop problems; see _flash_hop_error().
+        self.hop_error_label = ttk.Label(playlist_frame, text="", foreground="red")
+        self.hop_error_label.pack(fill=tk.X)
+        self._hop_error_job = None
         
     def _connect(self):
         """Connect to SMY02 device."""
@@ -293,8 +404,7 @@ class SMY02GUI:
                 self.connected = True
                 model = self.controller.model or "Unknown"
                 self.status_label.config(text=f"Connected ({model})", foreground="green")
-                self._refresh_device_state()
-                self._schedule_device_state_refresh()
+                self._start_device_state_monitor()
                 logger.info("Connected to SMY02")
             else:
                 messagebox.showerror("Error", "Failed to connect to device")
@@ -312,56 +422,47 @@ class SMY02GUI:
             self.controller.disconnect()
             self.connected = False
             self.status_label.config(text="Disconnected", foreground="red")
-            self.device_state_label.config(text="RF: N/A | LEVEL: N/A | FM: N/A | AF: N/A", foreground="gray")
-            self._cancel_device_state_refresh()
+            self._set_label(self.device_state_label, text="RF: N/A | LEVEL: N/A | FM: N/A | AF: N/A", foreground="gray")
+            self.state_refresh_event.set()
 
     def _format_device_state(self, state):
         return f"RF: {state['rf']} | LEVEL: {state['level']} | FM: {state['fm']} | AF: {state['af']}"
 
     def _refresh_device_state(self):
-        """Refresh live device state in background thread."""
-        if not self.connected or not self.controller:
-            return
-        if self.state_refresh_in_progress:
-            return
-
-        self.state_refresh_in_progress = True
-        thread = threading.Thread(target=self._refresh_device_state_worker, daemon=True)
+        """Ask the state monitor thread for an immediate read."""
+        if self.connected and self.controller:
+            self.state_refresh_event.set()
+
+    def _start_device_state_monitor(self):
+        """Start the one long-lived thread that polls device state while connected."""
+        self.state_refresh_event.clear()
+        thread = threading.Thread(
+            target=self._device_state_monitor, args=(self.controller,), daemon=True
+        )
         thread.start()
 
-    def _refresh_device_state_worker(self):
-        try:
-            state = self.controller.get_device_state()
-            self.root.after(0, lambda: self.device_state_label.config(
-                text=self._format_device_state(state), foreground="black"
-            ))
-        except Exception as e:
-            logger.debug(f"State refresh failed: {e}")
-            self.root.after(0, lambda: self.device_state_label.config(
-                text="RF: read error | LEVEL: read error | FM: read error | AF: read error",
-                foreground="red",
-            ))
-        finally:
-            self.root.after(0, self._state_refresh_done)
-
-    def _state_refresh_done(self):
-        self.state_refresh_in_progress = False
-
-    def _schedule_device_state_refresh(self):
-        self._cancel_device_state_refresh()
-        if self.connected:
-            self.state_refresh_job = self.root.after(3000, self._auto_device_state_refresh)
-
-    def _auto_device_state_refresh(self):
-        if not self.connected:
-            return
-        self._refresh_device_state()
-        self._schedule_device_state_refresh()
-
-    def _cancel_device_state_refresh(self):
-        if self.state_refresh_job is not None:
-            self.root.after_cancel(self.state_refresh_job)
-            self.state_refresh_job = None
+    def _device_state_monitor(self, controller):
+        # Runs until disconnect or reconnect (a new controller), reading once
+        # on start, then every 3 s or when the Refresh button sets the event.
+        while self.connected and self.controller is controller:
+            try:
+                state = controller.get_device_state()
+                text, color = self._format_device_state(state), "black"
+            except Exception as e:
+                logger.debug("State refresh failed: %s", e)
+                text = "RF: read error | LEVEL: read error | FM: read error | AF: read error"
+                color = "red"
+            try:
+                self.root.after(0, self._show_device_state, controller, text, color)
+            except (RuntimeError, tk.TclError):
+                return  # window already destroyed
+            self.state_refresh_event.wait(3.0)
+            self.state_refresh_event.clear()
+
+    def _show_device_state(self, controller, text, color):
+        # Drop a read that finished after disconnecting or reconnecting.
+        if self.connected and self.controller is controller:
+            self._set_label(self.device_state_label, text=text, foreground=color)
     
     def _set_frequency(self):
         """Set frequency."""
@@ -370,7 +471,7 @@ class SMY02GUI:
             return
         try:
             freq_mhz = self.freq_var.get()
-            freq_hz = int(freq_mhz * 1e6)
+            freq_hz = round(freq_mhz * 1e6)
             
             if self.controller.set_frequency(freq_hz):
                 logger.info(f"Frequency set to {freq_mhz} MHz")
@@ -423,8 +524,7 @@ class SMY02GUI:
             # Disable transmission (quick operation, no threading needed)
             if self.controller.disable_output():
                 self.transmitting = False
-                self.tx_button.config(text="Enable RF")
-                self.tx_status.config(text="RF: OFF", foreground="red")
+                self._apply_tx_state(False)
                 logger.info("RF transmission disabled")
             else:
                 messagebox.showerror("Error", "Failed to disable RF output")
@@ -433,50 +533,43 @@ class SMY02GUI:
             freq_mhz = self.freq_var.get()
             level = self.level_var.get()
             bw_name = self.bw_var.get()
-            thread = threading.Thread(
-                target=self._enable_transmit_worker,
-                args=(freq_mhz, level, bw_name),
-                daemon=True,
-            )
-            thread.start()
+            self._io_executor.submit(self._enable_transmit_worker, freq_mhz, level, bw_name)
     
     def _enable_transmit_worker(self, freq_mhz, level, bw_name):
         """Background worker to enable transmission."""
         try:
-            # Set parameters
-            freq_hz = int(freq_mhz * 1e6)
-            
-            logger.info("Setting frequency...")
-            if not self.controller.set_frequency(freq_hz):
-                self.root.after(0, lambda: messagebox.showerror("Error", "Failed to set frequency"))
-                return
+            # Frequency, level and FM deviation go out in one write; a
+            # single status read then syncs with the device and reports
+            # whether any of them was rejected, instead of a fixed pause
+            # after each setter.
+            freq_hz = round(freq_mhz * 1e6)
             
-            sleep(0.3)
-            
-            logger.info("Setting level...")
-            if not self.controller.set_amplitude(level):
-                self.root.after(0, lambda: messagebox.showerror("Error", "Failed to set level"))
+            logger.info("Setting frequency, level and bandwidth...")
+            if not self.controller.apply_hop(freq_hz, level, self.BANDWIDTHS[bw_name]):
+                self.root.after(0, messagebox.showerror, "Error", "Failed to set frequency/level/bandwidth")
                 return
             
-            sleep(0.3)
-            
-            logger.info("Setting bandwidth...")
-            if not self._apply_bandwidth(bw_name):
-                self.root.after(0, lambda: messagebox.showwarning("Warning", "Bandwidth command may not be supported by this SMY02 firmware"))
-            sleep(0.3)
+            err, esr = self.controller.get_err_and_esr()
+            if esr:
+                logger.warning(f"Device reported ESR={esr} ({err}) after setting frequency/level/bandwidth")
+                self.root.after(
+                    0, messagebox.showwarning,
+                    "Warning", f"Device reported an error (ESR={esr}, {err}); check frequency, level and bandwidth",
+                )
+            else:
+                logger.info(f"Bandwidth set to {bw_name} (deviation: {self.BANDWIDTHS[bw_name]} Hz)")
             
             logger.info("Enabling RF output...")
             if self.controller.enable_output():
                 self.transmitting = True
-                self.root.after(0, lambda: self.tx_button.config(text="Disable RF"))
-                self.root.after(0, lambda: self.tx_status.config(text="RF: ON", foreground="green"))
+                self.root.after(0, self._apply_tx_state, True)
                 logger.info("RF transmission enabled")
             else:
-                self.root.after(0, lambda: messagebox.showerror("Error", "Failed to enable RF output"))
+                self.root.after(0, messagebox.showerror, "Error", "Failed to enable RF output")
         
         except Exception as e:
             logger.error(f"Enable transmit error: {e}")
-            self.root.after(0, lambda: messagebox.showerror("Error", f"Transmission failed: {e}"))
+            self.root.after(0, messagebox.showerror, "Error", f"Transmission failed: {e}")
     
     def _shutdown(self):
         """Shutdown device completely."""
@@ -485,11 +578,30 @@ class SMY02GUI:
         try:
             self.controller.disable_output()
             self.transmitting = False
-            self.tx_button.config(text="Enable RF")
-            self.tx_status.config(text="RF: OFF", foreground="red")
+            self._apply_tx_state(False)
             logger.info("Device shutdown complete")
         except Exception as e:
             logger.error(f"Shutdown failed: {e}")
+
+    def _apply_tx_state(self, on):
+        """Show RF on/off on the transmit button and status label together."""
+        if on:
+            self._set_label(self.tx_button, text="Disable RF")
+            self._set_label(self.tx_status, text="RF: ON", foreground="green")
+        else:
+            self._set_label(self.tx_button, text="Enable RF")
+            self._set_label(self.tx_status, text="RF: OFF", foreground="red")
+
+    def _set_label(self, widget, **options):
+        """Configure a status widget, skipping the write if nothing changed.
+
+        The state monitor and hop worker repost mostly unchanged text; an
+        equal write would still cost a Tcl call and a redraw.
+        """
+        if self._label_options.get(widget) == options:
+            return
+        self._label_options[widget] = options
+        widget.config(**options)
     
     def _save_preset(self):
         """Save current settings as preset."""
@@ -505,9 +617,11 @@ class SMY02GUI:
             'modulation': self.mod_var.get(),
         }
         
-        self.presets[name] = preset
-        self._save_presets_to_file()
-        self._update_preset_combo()
+        # Re-saving an identical preset leaves presets.json untouched.
+        if self.presets.get(name) != preset:
+            self.presets[name] = preset
+            self._save_presets_to_file()
+            self._update_preset_combo()
         self.preset_name_var.set("")
         messagebox.showinfo("Success", f"Preset '{name}' saved")
         logger.info(f"Preset saved: {name}")
@@ -548,51 +662,81 @@ class SMY02GUI:
         level = self.level_var.get()
         name = self.preset_list_var.get() or f"{freq} MHz @ {level} dBm"
         
-        entry = {
-            'name': name,
-            'frequency': freq,
-            'level': level,
-            'bandwidth': self.bw_var.get(),
-        }
-        
-        self.playlist.append(entry)
-        self._refresh_playlist_listbox(select_idx=len(self.playlist) - 1)
+        idx = len(self._names)
+        self._splice_playlist(idx, 0, [round(freq * 1e6)], [level], [self._bw_index(self.bw_var.get())], [name])
+        self._splice_playlist_listbox(idx, 0, 1, select_idx=idx)
         logger.info(f"Added to playlist: {name}")
     
     def _remove_from_playlist(self):
-        """Remove selected entry from playlist."""
+        """Remove selected entries from playlist."""
         selection = self.playlist_listbox.curselection()
         if not selection:
             messagebox.showwarning("Warning", "Select an entry to remove")
             return
         
         idx = selection[0]
-        self.playlist.pop(idx)
-        next_idx = min(idx, len(self.playlist) - 1)
-        self._refresh_playlist_listbox(select_idx=next_idx if self.playlist else None)
-        logger.info(f"Removed from playlist at index {idx}")
+        if len(selection) == 1:
+            self._splice_playlist(idx, 1)
+            next_idx = min(idx, len(self._names) - 1)
+            self._splice_playlist_listbox(idx, 1, 0, select_idx=next_idx if self._names else None)
+        else:
+            drop = set(selection)
+            self._set_playlist(
+                np.delete(self._freq_hz, selection),
+                np.delete(self._level, selection),
+                np.delete(self._bw_idx, selection),
+                [name for i, name in enumerate(self._names) if i not in drop],
+            )
+            next_idx = min(idx, len(self._names) - 1)
+            self._refresh_playlist_listbox(select_idx=next_idx if self._names else None)
+        logger.info(f"Removed {len(selection)} playlist entries starting at index {idx}")
     
     def _clear_playlist(self):
         """Clear entire playlist."""
         if messagebox.askyesno("Confirm", "Clear entire playlist?"):
-            self.playlist.clear()
+            self._set_playlist([], [], [], [])
             self._refresh_playlist_listbox()
             logger.info("Playlist cleared")
 
     def _clone_selected_playlist_entry(self):
-        """Clone selected playlist entry."""
+        """Clone selected playlist entries, each inserted right after its source."""
         selection = self.playlist_listbox.curselection()
         if not selection:
             messagebox.showwarning("Warning", "Select an entry to clone")
             return
 
-        idx = selection[0]
-        source = self.playlist[idx]
-        clone = dict(source)
-        clone["name"] = f"{source['name']} (copy)"
-        self.playlist.insert(idx + 1, clone)
-        self._refresh_playlist_listbox(select_idx=idx + 1)
-        logger.info(f"Cloned playlist entry at index {idx}")
+        if len(selection) == 1:
+            idx = selection[0]
+            self._splice_playlist(
+                idx + 1, 0,
+                self._freq_hz[idx:idx + 1], self._level[idx:idx + 1], self._bw_idx[idx:idx + 1],
+                [f"{self._names[idx]} (copy)"],
+            )
+            self._splice_playlist_listbox(idx + 1, 0, 1, select_idx=idx + 1)
+        else:
+            self._bulk_clone_entries(selection)
+        logger.info(f"Cloned {len(selection)} playlist entries")
+
+    def _bulk_clone_entries(self, indices):
+        """Duplicate rows `indices` in one pass: each column is repeated once."""
+        counts = np.ones(len(self._names), dtype=np.intp)
+        counts[list(indices)] = 2
+        selected = set(indices)
+        names = []
+        for i, name in enumerate(self._names):
+            names.append(name)
+            if i in selected:
+                names.append(f"{name} (copy)")
+        self._set_playlist(
+            np.repeat(self._freq_hz, counts),
+            np.repeat(self._level, counts),
+            np.repeat(self._bw_idx, counts),
+            names,
+        )
+        self._refresh_playlist_listbox()
+        # Each clone sits after its source, shifted by the clones before it.
+        for shift, i in enumerate(sorted(selected), start=1):
+            self.playlist_listbox.selection_set(i + shift)
 
     def _move_playlist_up(self):
         """Move selected playlist entry up."""
@@ -605,8 +749,8 @@ class SMY02GUI:
         if idx == 0:
             return
 
-        self.playlist[idx - 1], self.playlist[idx] = self.playlist[idx], self.playlist[idx - 1]
-        self._refresh_playlist_listbox(select_idx=idx - 1)
+        self._swap_playlist_rows(idx - 1, idx)
+        self._splice_playlist_listbox(idx - 1, 2, 2, select_idx=idx - 1)
         logger.info(f"Moved playlist entry from {idx} to {idx - 1}")
 
     def _move_playlist_down(self):
@@ -617,15 +761,20 @@ class SMY02GUI:
             return
 
         idx = selection[0]
-        if idx >= len(self.playlist) - 1:
+        if idx >= len(self._names) - 1:
             return
 
-        self.playlist[idx + 1], self.playlist[idx] = self.playlist[idx], self.playlist[idx + 1]
-        self._refresh_playlist_listbox(select_idx=idx + 1)
+        self._swap_playlist_rows(idx, idx + 1)
+        self._splice_playlist_listbox(idx, 2, 2, select_idx=idx + 1)
         logger.info(f"Moved playlist entry from {idx} to {idx + 1}")
 
     def _import_playlist_csv(self):
         """Import playlist entries from CSV file."""
+        from tkinter import filedialog
+
+        if self.import_progress.winfo_manager():
+            return  # an import is already running
+
         file_path = filedialog.askopenfilename(
             title="Import Playlist CSV",
             filetypes=[("CSV files", "*.csv"), ("All files", "*.*")],
@@ -633,54 +782,95 @@ class SMY02GUI:
         if not file_path:
             return
 
+        # Parse on a worker thread so a large file does not freeze the GUI;
+        # the result is applied back on the Tk thread.
+        self.import_progress.pack(side=tk.LEFT, padx=5)
+        self.import_progress.start()
+        threading.Thread(target=self._import_csv_worker, args=(file_path,), daemon=True).start()
+
+    def _import_csv_worker(self, file_path):
         try:
-            imported = []
-            with open(file_path, "r", newline="") as f:
-                reader = csv.DictReader(f)
-                if not reader.fieldnames:
-                    raise ValueError("CSV header not found")
-
-                for row in reader:
-                    lower = {str(k).strip().lower(): str(v).strip() for k, v in row.items() if k is not None}
-                    freq_raw = lower.get("frequency_mhz") or lower.get("frequency")
-                    if not freq_raw:
-                        continue
-
-                    frequency = float(freq_raw)
-                    level = float(lower.get("level_dbm") or lower.get("level") or -20.0)
-                    bandwidth = lower.get("bandwidth") or "12.5 kHz"
-                    if bandwidth not in self.BANDWIDTHS:
-                        bandwidth = "12.5 kHz"
-                    name = lower.get("name") or f"{frequency} MHz @ {level} dBm"
-
-                    imported.append(
-                        {
-                            "name": name,
-                            "frequency": frequency,
-                            "level": level,
-                            "bandwidth": bandwidth,
-                        }
-                    )
-
-            if not imported:
-                messagebox.showwarning("Warning", "No valid rows found in CSV")
-                return
+            columns = self._parse_playlist_csv(file_path)
+        except Exception as e:
+            self.root.after(0, self._import_csv_failed, e)
+        else:
+            self.root.after(0, self._apply_imported_csv, file_path, columns)
+
+    def _parse_playlist_csv(self, file_path):
+        """
+        Read a playlist CSV into (freq_hz, levels, bw_idx, names) column lists.
+
+        Runs off the Tk thread, so it must not touch widgets or Tk variables.
+        """
+        import csv
+
+        freq_hz, levels, bw_idx, names = [], [], [], []
+        with open(file_path, "r", newline="") as f:
+            reader = csv.reader(f)
+            header = [h.strip().lower() for h in next(reader, [])]
+            if not header:
+                raise ValueError("CSV header not found")
+
+            # Resolve column positions once from the header instead of
+            # building a lower-cased dict for every row.
+            def column(*keys):
+                return next((header.index(k) for k in keys if k in header), None)
+
+            f_idx = column("frequency_mhz", "frequency")
+            if f_idx is None:
+                raise ValueError("CSV has no frequency_mhz/frequency column")
+            l_idx = column("level_dbm", "level")
+            bw_col = column("bandwidth")
+            name_col = column("name")
+
+            def field(row, i):
+                return row[i].strip() if i is not None and i < len(row) else ""
+
+            for row in reader:
+                freq_raw = field(row, f_idx)
+                if not freq_raw:
+                    continue
 
-            if self.playlist and messagebox.askyesno("Import Mode", "Replace current playlist with imported CSV?"):
-                self.playlist = imported
-            else:
-                self.playlist.extend(imported)
+                frequency = float(freq_raw)
+                level = float(field(row, l_idx) or -20.0)
+                freq_hz.append(round(frequency * 1e6))
+                levels.append(level)
+                bw_idx.append(self._bw_index(field(row, bw_col)))
+                names.append(field(row, name_col) or f"{frequency} MHz @ {level} dBm")
+        return freq_hz, levels, bw_idx, names
+
+    def _stop_import_progress(self):
+        self.import_progress.stop()
+        self.import_progress.pack_forget()
+
+    def _import_csv_failed(self, error):
+        self._stop_import_progress()
+        messagebox.showerror("Error", f"Failed to import CSV: {error}")
+        logger.error(f"CSV import failed: {error}")
+
+    def _apply_imported_csv(self, file_path, columns):
+        self._stop_import_progress()
+        freq_hz, levels, bw_idx, names = columns
+        if not names:
+            messagebox.showwarning("Warning", "No valid rows found in CSV")
+            return
 
-            self._refresh_playlist_listbox(select_idx=len(self.playlist) - 1)
-            messagebox.showinfo("Success", f"Imported {len(imported)} playlist entries")
-            logger.info(f"Imported {len(imported)} entries from {file_path}")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to import CSV: {e}")
-            logger.error(f"CSV import failed: {e}")
+        if self._names and messagebox.askyesno("Import Mode", "Replace current playlist with imported CSV?"):
+            self._set_playlist(freq_hz, levels, bw_idx, names)
+            self._refresh_playlist_listbox(select_idx=len(self._names) - 1)
+        else:
+            start = len(self._names)
+            self._splice_playlist(start, 0, freq_hz, levels, bw_idx, names)
+            self._splice_playlist_listbox(start, 0, len(names), select_idx=len(self._names) - 1)
+        messagebox.showinfo("Success", f"Imported {len(names)} playlist entries")
+        logger.info(f"Imported {len(names)} entries from {file_path}")
 
     def _export_playlist_csv(self):
         """Export playlist entries to CSV file."""
-        if not self.playlist:
+        import csv
+        from tkinter import filedialog
+
+        if not self._names:
             messagebox.showwarning("Warning", "Playlist is empty")
             return
 
@@ -697,34 +887,45 @@ class SMY02GUI:
             with open(file_path, "w", newline="") as f:
                 writer = csv.writer(f)
                 writer.writerow(["name", "frequency_mhz", "level_dbm", "bandwidth"])
-                for entry in self.playlist:
-                    writer.writerow([entry["name"], entry["frequency"], entry["level"], entry["bandwidth"]])
+                writer.writerows(
+                    [entry["name"], entry["frequency"], entry["level"], entry["bandwidth"]]
+                    for entry in self._playlist_entries()
+                )
 
-            messagebox.showinfo("Success", f"Exported {len(self.playlist)} entries to CSV")
-            logger.info(f"Exported {len(self.playlist)} entries to {file_path}")
+            messagebox.showinfo("Success", f"Exported {len(self._names)} entries to CSV")
+            logger.info(f"Exported {len(self._names)} entries to {file_path}")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to export CSV: {e}")
             logger.error(f"CSV export failed: {e}")
 
     def _save_playlist_json(self):
         """Save current playlist to JSON file."""
-        if not self.playlist:
+        from tkinter import filedialog
+
+        if not self._names:
             messagebox.showwarning("Warning", "Playlist is empty")
             return
 
         file_path = filedialog.asksaveasfilename(
             title="Save Playlist",
             defaultextension=".json",
-            filetypes=[("JSON files", "*.json"), ("All files", "*.*")],
+            filetypes=[("JSON files", "*.json"), ("Compressed JSON files", "*.json.gz"), ("All files", "*.*")],
             initialfile="playlist.json",
         )
         if not file_path:
             return
 
         try:
-            with open(file_path, "w") as f:
-                json.dump(self.playlist, f, indent=2)
-            messagebox.showinfo("Success", f"Saved {len(self.playlist)} entries")
+            if file_path.endswith(".gz"):
+                # Compressed saves are not meant for hand editing: compact
+                # separators, and fast compression since JSON shrinks well
+                # even at level 1.
+                import gzip
+                payload = gzip.compress(_json_dumps(self._playlist_entries(), compact=True), compresslevel=1)
+            else:
+                payload = _json_dumps(self._playlist_entries())
+            _write_atomic(file_path, payload)
+            messagebox.showinfo("Success", f"Saved {len(self._names)} entries")
             logger.info(f"Saved playlist to {file_path}")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save playlist: {e}")
@@ -732,58 +933,159 @@ class SMY02GUI:
 
     def _load_playlist_json(self):
         """Load playlist from JSON file and show frequencies in list."""
+        from tkinter import filedialog
+
         file_path = filedialog.askopenfilename(
             title="Load Playlist",
-            filetypes=[("JSON files", "*.json"), ("All files", "*.*")],
+            filetypes=[("JSON files", "*.json *.json.gz"), ("All files", "*.*")],
         )
         if not file_path:
             return
 
         try:
-            with open(file_path, "r") as f:
-                data = json.load(f)
+            raw = Path(file_path).read_bytes()
+            if raw[:2] == b"\x1f\x8b":  # gzip magic, whatever the file is named
+                import gzip
+                raw = gzip.decompress(raw)
+            data = _json_loads(raw)
 
             if not isinstance(data, list):
                 raise ValueError("Invalid playlist format: root must be a list")
 
-            loaded = []
+            freq_hz, levels, bw_idx, names = [], [], [], []
+            skipped = 0
             for item in data:
-                if not isinstance(item, dict):
+                # One guard per entry instead of type checks per field; a
+                # malformed entry (not an object, missing or non-numeric
+                # frequency) is skipped rather than failing the whole load.
+                try:
+                    freq = float(item["frequency"])
+                    level = float(item.get("level", -20.0))
+                    name = item.get("name")
+                except (KeyError, TypeError, ValueError, AttributeError):
+                    skipped += 1
                     continue
-                freq = float(item.get("frequency"))
-                level = float(item.get("level", -20.0))
-                bw = str(item.get("bandwidth", "12.5 kHz"))
-                if bw not in self.BANDWIDTHS:
-                    bw = "12.5 kHz"
-                name = str(item.get("name", f"{freq} MHz @ {level} dBm"))
-                loaded.append(
-                    {
-                        "name": name,
-                        "frequency": freq,
-                        "level": level,
-                        "bandwidth": bw,
-                    }
-                )
-
-            if not loaded:
+                freq_hz.append(round(freq * 1e6))
+                levels.append(level)
+                bw_idx.append(self._bw_index(item.get("bandwidth")))
+                names.append(str(name) if name is not None else f"{freq} MHz @ {level} dBm")
+            if skipped:
+                logger.warning(f"Skipped {skipped} invalid playlist entries in {file_path}")
+
+            if not names:
                 messagebox.showwarning("Warning", "No valid playlist entries found")
                 return
 
-            self.playlist = loaded
-            self._refresh_playlist_listbox(select_idx=0)
-            messagebox.showinfo("Success", f"Loaded {len(loaded)} entries")
+            self._set_playlist(freq_hz, levels, bw_idx, names)
+            self._request_listbox_refresh(select_idx=0)
+            messagebox.showinfo("Success", f"Loaded {len(names)} entries")
             logger.info(f"Loaded playlist from {file_path}")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load playlist: {e}")
             logger.error(f"Load playlist failed: {e}")
 
+    def _bw_index(self, name):
+        """Index of bandwidth `name` in BANDWIDTHS, ignoring case and spaces; unknown names map to 12.5 kHz."""
+        return self._BW_INDEX.get(str(name or "").lower().replace(" ", ""), self._BW_DEFAULT)
+
+    def _set_playlist(self, freq_hz, level, bw_idx, names):
+        self._freq_hz = np.asarray(freq_hz, dtype=np.int64)
+        self._level = np.asarray(level, dtype=np.float64)
+        self._bw_idx = np.asarray(bw_idx, dtype=np.int8)
+        self._names = list(names)
+
+    def _splice_playlist(self, start, delete_count, freq_hz=(), level=(), bw_idx=(), names=()):
+        """Replace `delete_count` playlist rows at `start` with the given rows."""
+        stop = start + delete_count
+        self._set_playlist(
+            np.concatenate((self._freq_hz[:start], np.asarray(freq_hz, dtype=np.int64), self._freq_hz[stop:])),
+            np.concatenate((self._level[:start], np.asarray(level, dtype=np.float64), self._level[stop:])),
+            np.concatenate((self._bw_idx[:start], np.asarray(bw_idx, dtype=np.int8), self._bw_idx[stop:])),
+            self._names[:start] + list(names) + self._names[stop:],
+        )
+
+    def _swap_playlist_rows(self, a, b):
+        for column in (self._freq_hz, self._level, self._bw_idx):
+            column[[a, b]] = column[[b, a]]
+        self._names[a], self._names[b] = self._names[b], self._names[a]
+
+    def _playlist_entries(self):
+        """Playlist as the list-of-dicts layout used in saved JSON and CSV files."""
+        return [
+            {
+                "name": name,
+                "frequency": hz / 1e6,
+                "level": lvl,
+                "bandwidth": self._bw_names[bw],
+            }
+            for name, hz, lvl, bw in zip(
+                self._names, self._freq_hz.tolist(), self._level.tolist(), self._bw_idx.tolist()
+            )
+        ]
+
+    def _playlist_labels(self, start=0, stop=None):
+        """Listbox text for playlist rows start..stop."""
+        return [
+            f"{name} ({hz / 1e6} MHz)"
+            for name, hz in zip(self._names[start:stop], self._freq_hz[start:stop].tolist())
+        ]
+
     def _refresh_playlist_listbox(self, select_idx=None):
         """Render playlist listbox from internal data."""
-        self.playlist_listbox.delete(0, tk.END)
-        for entry in self.playlist:
-            self.playlist_listbox.insert(tk.END, f"{entry['name']} ({entry['frequency']} MHz)")
-
-        if select_idx is not None and 0 <= select_idx < len(self.playlist):
+        labels = self._playlist_labels()
+        shown = self._listbox_labels
+        # Skip the delete/insert when the rows are already shown (e.g. a
+        # sweep regenerated with the same settings), and only add the tail
+        # when rows were appended (a sweep added to the playlist).
+        if labels != shown:
+            n = len(shown)
+            if len(labels) > n and labels[:n] == shown:
+                self.playlist_listbox.insert(tk.END, *labels[n:])
+            else:
+                self._hop_marker_idx = None
+                self.playlist_listbox.delete(0, tk.END)
+                # One insert call with all rows instead of one Tcl round-trip per row.
+                self.playlist_listbox.insert(tk.END, *labels)
+            self._listbox_labels = labels
+        self._select_playlist_row(select_idx)
+
+    def _request_listbox_refresh(self, select_idx=None):
+        """
+        Queue one _refresh_playlist_listbox() for when Tk is next idle.
+
+        Several playlist rebuilds in a row (e.g. repeated sweep generation)
+        then cost one re-render; the latest select_idx wins.
+        """
+        self._pending_listbox_select = select_idx
+        if not self._listbox_refresh_queued:
+            self._listbox_refresh_queued = True
+            self.root.after_idle(self._run_listbox_refresh)
+
+    def _run_listbox_refresh(self):
+        self._listbox_refresh_queued = False
+        self._refresh_playlist_listbox(select_idx=self._pending_listbox_select)
+
+    def _splice_playlist_listbox(self, start, delete_count, insert_count, select_idx=None):
+        """
+        Replace `delete_count` listbox rows at `start` with `insert_count`
+        rows rendered from the playlist at `start`.
+
+        Used after edits that touch a few rows, so only those rows are
+        formatted and sent to Tk instead of re-rendering the whole list.
+        """
+        # Rows shift; the next hop repaints the marker at its new index.
+        self._clear_hop_marker()
+        labels = self._playlist_labels(start, start + insert_count)
+        if delete_count:
+            self.playlist_listbox.delete(start, start + delete_count - 1)
+        if insert_count:
+            self.playlist_listbox.insert(start, *labels)
+        self._listbox_labels[start:start + delete_count] = labels
+        self._select_playlist_row(select_idx)
+
+    def _select_playlist_row(self, select_idx):
+        self.playlist_listbox.selection_clear(0, tk.END)
+        if select_idx is not None and 0 <= select_idx < len(self._names):
             self.playlist_listbox.selection_set(select_idx)
             self.playlist_listbox.see(select_idx)
 
@@ -805,44 +1107,33 @@ class SMY02GUI:
                 messagebox.showerror("Error", "Toggle every N must be >= 1")
                 return
 
-            ascending = stop >= start
-            current = start
-            entries = []
-            idx = 0
-            eps = step / 10.0
-
-            while (current <= stop + eps) if ascending else (current >= stop - eps):
-                if alt_enabled:
-                    block = (idx // toggle_every) % 2
-                    level = alt_level if block == 1 else base_level
-                else:
-                    level = base_level
-
-                freq = round(current, 6)
-                entries.append(
-                    {
-                        "name": f"Sweep {freq} MHz @ {level} dBm",
-                        "frequency": freq,
-                        "level": level,
-                        "bandwidth": self.bw_var.get(),
-                    }
-                )
-                idx += 1
-                current = current + step if ascending else current - step
+            # Build every step at once: start + i*step has no accumulated
+            # float drift, and a tenth of a step of slack keeps the stop
+            # value itself in the sweep.
+            count = int(np.floor(abs(stop - start) / step + 0.1)) + 1
+            idx = np.arange(count)
+            freqs = np.round(start + np.copysign(step, stop - start) * idx, 6)
+            if alt_enabled:
+                levels = np.where((idx // toggle_every) % 2 == 1, alt_level, base_level)
+            else:
+                levels = np.full(count, base_level)
 
-            if not entries:
-                messagebox.showwarning("Warning", "No sweep entries generated")
-                return
+            freq_hz = np.round(freqs * 1e6).astype(np.int64)
+            bw_idx = np.full(count, self._bw_index(self.bw_var.get()), dtype=np.int8)
+            names = [
+                f"Sweep {freq} MHz @ {level} dBm"
+                for freq, level in zip(freqs.tolist(), levels.tolist())
+            ]
 
             if self.sweep_replace_var.get():
-                self.playlist = entries
+                self._set_playlist(freq_hz, levels, bw_idx, names)
             else:
-                self.playlist.extend(entries)
+                self._splice_playlist(len(self._names), 0, freq_hz, levels, bw_idx, names)
 
-            self._refresh_playlist_listbox(select_idx=0 if self.playlist else None)
+            self._request_listbox_refresh(select_idx=0 if self._names else None)
             logger.info(
                 "Generated %d sweep entries (%s -> %s MHz, step %s MHz, alt level=%s, every N=%d)",
-                len(entries),
+                count,
                 start,
                 stop,
                 step,
@@ -858,7 +1149,7 @@ class SMY02GUI:
             messagebox.showwarning("Warning", "Device not connected")
             return
         
-        if not self.playlist:
+        if not self._names:
             messagebox.showwarning("Warning", "Playlist is empty")
             return
         
@@ -866,109 +1157,174 @@ class SMY02GUI:
             messagebox.showwarning("Warning", "Hopping already running")
             return
         
-        # Freeze a snapshot for deterministic hopping sequence.
-        self.active_hop_playlist = copy.deepcopy(self.playlist)
+        # Freeze a snapshot for deterministic hopping sequence. Columns are
+        # plain lists (FM deviation resolved once for all rows) so each hop
+        # reads native ints/floats.
+        self.active_hop_playlist = (
+            self._freq_hz.tolist(),
+            self._level.tolist(),
+            self._bw_values_hz[self._bw_idx].tolist(),
+            [self._bw_names[bw] for bw in self._bw_idx.tolist()],
+            list(self._names),
+        )
         self.playlist_running = True
         self.current_playlist_index = 0
+        self._hop_stop_event = threading.Event()
         self.hop_status.config(text="Hopping: ON", foreground="green")
-        dwell_seconds = self.dwell_var.get()
         
         # Start hopping in background thread
-        self.playlist_thread = threading.Thread(target=self._hopping_worker, args=(dwell_seconds,), daemon=True)
+        self.playlist_thread = threading.Thread(
+            target=self._hopping_worker,
+            args=(self.active_hop_playlist, self._hop_stop_event),
+            daemon=True,
+        )
         self.playlist_thread.start()
         logger.info("Frequency hopping started")
     
     def _stop_hopping(self):
         """Stop frequency hopping."""
         self.playlist_running = False
-        self.hop_status.config(text="Hopping: OFF", foreground="red")
-        self.current_hop_label.config(text="CURRENT HOP: -", foreground="#B00000")
+        # Wakes the worker from its dwell right away.
+        self._hop_stop_event.set()
+        self._show_hopping_off()
         logger.info("Frequency hopping stopped")
 
-    def _update_hop_marker(self, idx, entry):
-        """Update list marker and label to the current hop entry."""
-        if self.highlight_hop_in_list_var.get():
-            self.playlist_listbox.selection_clear(0, tk.END)
-            if 0 <= idx < len(self.playlist):
-                self.playlist_listbox.selection_set(idx)
-                self.playlist_listbox.activate(idx)
-                if self.auto_follow_hop_var.get():
-                    self.playlist_listbox.see(idx)
-        self.current_hop_label.config(
-            text=f"CURRENT HOP: {entry['name']} ({entry['frequency']} MHz)",
+    def _show_hopping_off(self):
+        self._clear_hop_marker()
+        self.hop_status.config(text="Hopping: OFF", foreground="red")
+        self._set_label(self.current_hop_label, text="CURRENT HOP: -", foreground="#B00000")
+
+    def _update_hop_marker(self, idx, name, freq_mhz, level, bandwidth, sync_controls=False, tx_on=False):
+        """Update list marker, label and (optionally) the controls and RF status to the current hop entry."""
+        if tx_on:
+            self._apply_tx_state(True)
+        # Repaint only the previous and current marker rows, so a hop costs
+        # the same few Tcl calls however long the playlist is.
+        if self.highlight_hop_in_list_var.get() and 0 <= idx < len(self._names):
+            if idx != self._hop_marker_idx:
+                self._clear_hop_marker()
+                self.playlist_listbox.itemconfig(idx, background="#FFD400")
+                self._hop_marker_idx = idx
+            if self.auto_follow_hop_var.get():
+                # see() is a no-op when the row is already visible.
+                self.playlist_listbox.see(idx)
+        else:
+            self._clear_hop_marker()
+        self._set_label(
+            self.current_hop_label,
+            text=f"CURRENT HOP: {name} ({freq_mhz} MHz)",
             foreground="#005A00",
         )
+        if sync_controls:
+            self.freq_var.set(freq_mhz)
+            self.level_var.set(level)
+            self.bw_var.set(bandwidth)
+    
+    def _flash_hop_error(self, message):
+        """
+        Show a non-fatal hop problem in the red banner for 5 s.
+
+        Used instead of a modal dialog while hopping continues; a repeat of
+        the message just extends the display.
+        """
+        self._set_label(self.hop_error_label, text=message[:120])
+        if self._hop_error_job is not None:
+            self.root.after_cancel(self._hop_error_job)
+        self._hop_error_job = self.root.after(5000, self._clear_hop_error)
+
+    def _clear_hop_error(self):
+        self._hop_error_job = None
+        self._set_label(self.hop_error_label, text="")
+
+    def _clear_hop_marker(self):
+        if self._hop_marker_idx is not None:
+            if self._hop_marker_idx < self.playlist_listbox.size():
+                self.playlist_listbox.itemconfig(self._hop_marker_idx, background="")
+            self._hop_marker_idx = None
     
-    def _hopping_worker(self, dwell_seconds):
+    def _hopping_worker(self, hop_playlist, stop_event):
         """Worker thread for frequency hopping."""
         if not self.connected:
             return
         
         try:
-            hop_playlist = self.active_hop_playlist or []
+            freqs_hz, levels, fms_hz, bandwidths, names = hop_playlist
             rf_enable_failed = False
-            last_bw = None
-            while self.playlist_running:
-                if not hop_playlist:
+            # Last values sent; a setting equal to the previous hop's is not
+            # re-sent (e.g. sweeps that only alternate the level).
+            last_freq_hz = last_level = last_fm_hz = None
+            # Bound once; the loop body then uses fast local lookups.
+            controller = self.controller
+            set_frequency, set_amplitude = controller.set_frequency, controller.set_amplitude
+            after, stopped, wait = self.root.after, stop_event.is_set, stop_event.wait
+            update_marker = self._update_hop_marker
+            hop_order = itertools.cycle(range(len(names)))
+            while not stopped():
+                if not names:
                     break
                 
-                entry = hop_playlist[self.current_playlist_index]
-                
-                # Update GUI marker/label in one place to keep them in sync.
-                idx = self.current_playlist_index
-                self.root.after(0, lambda i=idx, e=entry: self._update_hop_marker(i, e))
+                i = self.current_playlist_index = next(hop_order)
+                freq_hz, level, fm_hz, bandwidth, name = freqs_hz[i], levels[i], fms_hz[i], bandwidths[i], names[i]
                 
                 # Set frequency and level
-                freq_hz = int(entry['frequency'] * 1e6)
-                if not self.controller.set_frequency(freq_hz):
-                    self.root.after(0, lambda: messagebox.showerror("Error", f"Failed to set hop frequency: {entry['frequency']} MHz"))
-                    break
-
-                if not self.controller.set_amplitude(entry['level']):
-                    self.root.after(0, lambda: messagebox.showerror("Error", f"Failed to set hop level: {entry['level']} dBm"))
-                    break
-
-                if entry['bandwidth'] != last_bw:
-                    self._apply_bandwidth(entry['bandwidth'])
-                    last_bw = entry['bandwidth']
+                if freq_hz != last_freq_hz:
+                    if not set_frequency(freq_hz):
+                        after(0, messagebox.showerror, "Error", f"Failed to set hop frequency: {freq_hz / 1e6} MHz")
+                        break
+                    last_freq_hz = freq_hz
+
+                if level != last_level:
+                    if not set_amplitude(level):
+                        after(0, messagebox.showerror, "Error", f"Failed to set hop level: {level} dBm")
+                        break
+                    last_level = level
+
+                if fm_hz != last_fm_hz:
+                    if controller.set_modulation_fm(fm_hz):
+                        logger.info("Bandwidth set to %s (deviation: %s Hz)", bandwidth, fm_hz)
+                    else:
+                        logger.warning("Failed to set bandwidth to %s", bandwidth)
+                        after(0, self._flash_hop_error, f"Failed to set bandwidth to {bandwidth}")
+                    last_fm_hz = fm_hz
 
+                tx_enabled = False
                 if not self.transmitting and not rf_enable_failed:
-                    if not self.controller.enable_output():
+                    if not controller.enable_output():
                         rf_enable_failed = True
                         logger.warning("RF enable command failed during hopping; continuing with parameter hopping.")
-                        self.root.after(
+                        after(
                             0,
-                            lambda: messagebox.showwarning(
-                                "Warning",
-                                "RF enable command failed (ESR error). Hopping will continue applying frequencies."
-                            ),
+                            self._flash_hop_error,
+                            "RF enable command failed (ESR error). Hopping will continue applying frequencies.",
                         )
                     else:
                         self.transmitting = True
-                        self.root.after(0, lambda: self.tx_button.config(text="Disable RF"))
-                        self.root.after(0, lambda: self.tx_status.config(text="RF: ON", foreground="green"))
-
-                if self.sync_controls_with_hop_var.get():
-                    self.root.after(0, lambda e=entry: self.freq_var.set(e['frequency']))
-                    self.root.after(0, lambda e=entry: self.level_var.set(e['level']))
-                    self.root.after(0, lambda e=entry: self.bw_var.set(e['bandwidth']))
-                logger.info(f"Hop to: {entry['name']}")
-                
-                # Dwell time
-                sleep(dwell_seconds)
+                        tx_enabled = True
+
+                # All GUI changes for this hop (marker, label, synced
+                # controls, RF status) go to Tk as one callback, once the
+                # hop has been applied.
+                after(
+                    0, update_marker,
+                    i, name, freq_hz / 1e6, level, bandwidth, self._sync_controls_with_hop, tx_enabled,
+                )
+                logger.info("Hop to: %s", name)
                 
-                # Next frequency
-                self.current_playlist_index = (self.current_playlist_index + 1) % len(hop_playlist)
+                # Dwell time; edits to the dwell field apply from the next hop.
+                if wait(self._dwell_seconds):
+                    break
         
         except Exception as e:
-            logger.error(f"Hopping error: {e}")
-            self.root.after(0, lambda: messagebox.showerror("Error", f"Hopping error: {e}"))
+            logger.error("Hopping error: %s", e)
+            self.root.after(0, messagebox.showerror, "Error", f"Hopping error: {e}")
         
         finally:
-            self.playlist_running = False
-            self.active_hop_playlist = None
-            self.root.after(0, lambda: self.hop_status.config(text="Hopping: OFF", foreground="red"))
-            self.root.after(0, lambda: self.current_hop_label.config(text="CURRENT HOP: -", foreground="#B00000"))
+            # Only reset state if no newer run has started meanwhile.
+            if self._hop_stop_event is stop_event:
+                stop_event.set()
+                self.playlist_running = False
+                self.active_hop_playlist = None
+                self.root.after(0, self._show_hopping_off)
     
     def _update_preset_combo(self):
         """Update preset combobox with current presets."""
@@ -978,18 +1334,22 @@ class SMY02GUI:
         """Save presets to JSON file."""
         try:
             presets_file = Path("presets.json")
-            with open(presets_file, 'w') as f:
-                json.dump(self.presets, f, indent=2)
+            _write_atomic(presets_file, _json_dumps(self.presets))
+            self._presets_mtime = presets_file.stat().st_mtime_ns
         except Exception as e:
             logger.error(f"Failed to save presets: {e}")
     
     def _load_presets(self):
-        """Load presets from JSON file."""
+        """Load presets from JSON file, unless it is unchanged since the last load or save."""
         try:
             presets_file = Path("presets.json")
             if presets_file.exists():
+                mtime = presets_file.stat().st_mtime_ns
+                if mtime == self._presets_mtime:
+                    return
                 with open(presets_file, 'r') as f:
                     self.presets = json.load(f)
+                self._presets_mtime = mtime
                 self._update_preset_combo()
                 logger.info(f"Loaded {len(self.presets)} presets")
         except Exception as e:
@@ -999,7 +1359,8 @@ class SMY02GUI:
         """Clean shutdown on window close."""
         if self.playlist_running:
             self._stop_hopping()
-        self._cancel_device_state_refresh()
+        # Stop accepting work; an operation already running finishes on its own.
+        self._io_executor.shutdown(wait=False)
         if self.connected:
             self._shutdown()
             self._disconnect()
@@ -4,11 +4,19 @@ SMY02 Signal Generator Controller
 Module for controlling Rhode Schwarz SMY02 signal generator via GPIB/USB interface.
 """
 
-import pyvisa
-from typing import Optional, List, Dict
+import functools
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, List, Dict, Tuple, Union
 import logging
+import re
 import threading
-from time import sleep
+from time import monotonic, sleep
+
+try:
+    from .visa_cache import get_rm
+except ImportError:  # imported as a top-level module with src/ on sys.path
+    from visa_cache import get_rm
 
 # Configure logging
 logging.basicConfig(
@@ -17,6 +25,74 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+TERMINATION = '\r\n'
+
+# First number in a response such as 'RF  144.000000E+6' or 'ESR 32'.
+_NUM_RE = re.compile(r'[-+]?\d+(?:\.\d*)?(?:[eE][-+]?\d+)?')
+
+# get_device_state() fields and the queries tried for each, in order.
+_STATE_QUERIES = {
+    "rf": ["RF?", "FREQ?", "SOUR:FREQ?"],
+    "level": ["LEVEL?", "POW?", "SOUR:POW?"],
+    "fm": ["FM?", "FM:STAT?"],
+    "af": ["AF?", "FM:INT?"],
+}
+
+_ESR_QUERY = f"*ESR?{TERMINATION}".encode("ascii")
+
+
+# Wire forms of the per-hop setting commands, encoded and terminated. Sweeps
+# and playlists revisit the same values, so each is formatted only once and
+# written with write_raw().
+@functools.lru_cache(maxsize=8192)
+def _rf_cmd(frequency: int) -> bytes:
+    return f"RF {frequency}{TERMINATION}".encode("ascii")
+
+
+@functools.lru_cache(maxsize=8192)
+def _level_cmd(amplitude: float) -> bytes:
+    return f"LEVEL {amplitude}{TERMINATION}".encode("ascii")
+
+
+@functools.lru_cache(maxsize=8192)
+def _fm_cmd(deviation: int) -> bytes:
+    return f"FM {deviation}{TERMINATION}".encode("ascii")
+
+
+@functools.lru_cache(maxsize=8192)
+def _hop_cmd(frequency: Optional[int], amplitude: Optional[float],
+             deviation: Optional[int]) -> bytes:
+    cmds = []
+    if frequency is not None:
+        cmds.append(f"RF {frequency}")
+    if amplitude is not None:
+        cmds.append(f"LEVEL {amplitude}")
+    if deviation is not None:
+        cmds.append(f"FM {deviation}")
+    return (";".join(cmds) + TERMINATION).encode("ascii")
+
+
+def run_sweep(write: Callable[[bytes], object], encoded_cmds: List[bytes], settle: float) -> None:
+    """
+    Send pre-encoded commands in order, starting each one `settle` seconds
+    after the previous write at the earliest.
+
+    Kept outside the controller so the loop touches only locals: no lock,
+    attribute or cache lookups per step.
+
+    Args:
+        write: Raw write function, e.g. an instrument's write_raw
+        encoded_cmds: Terminated wire-form commands
+        settle: Minimum spacing between writes in seconds
+    """
+    next_ready = 0.0
+    for cmd in encoded_cmds:
+        remaining = next_ready - monotonic()
+        if remaining > 0:
+            sleep(remaining)
+        write(cmd)
+        next_ready = monotonic() + settle
+
 
 class SMY02Controller:
     """Controller for Rhode Schwarz SMY02 signal generator."""
@@ -32,9 +108,33 @@ class SMY02Controller:
         self.instrument = None
         self.idn = ""
         self.model = ""
+        # Set by connect() from *IDN?; selects the SMY02 command paths.
+        self._is_smy02 = False
         self._fm_initialized = False
         self._modulation_mode = None
-        self.rm = pyvisa.ResourceManager()
+        # Last successfully written RF/LEVEL/FM values, served by the getters
+        # unless force=True. Setters skip writes that would not change them.
+        self._cached = {}
+        # (time, state) from the last get_device_state() read; cleared by
+        # every method that changes device settings. Setters that change a
+        # single field only mark it in _state_stale, so the next read
+        # re-queries just that field.
+        self._state_snapshot = None
+        self._state_stale = set()
+        # monotonic() time at which the last write has settled; the next
+        # bus access waits for it instead of sleeping after every write.
+        self._next_ready_ts = 0.0
+        # Write termination appended by _write(); matches write_termination.
+        self._term = TERMINATION.encode("ascii")
+        # Non-SMY02 setters check *ESR? once per this many writes rather
+        # than after each one; see flush_and_verify().
+        self._esr_check_interval = 16
+        self._writes_since_check = 0
+        # Per action, the index of the candidate command that last worked;
+        # see _try_commands_with_check().
+        self._winning_cmd: Dict[str, int] = {}
+        # Shared by every controller in the process; see visa_cache.
+        self.rm = get_rm()
         self._io_lock = threading.RLock()
 
     def connect(self) -> bool:
@@ -50,36 +150,47 @@ class SMY02Controller:
                 # Use a longer timeout for queries from this device
                 self.instrument.timeout = 5000  # 5 second timeout
                 # Use CRLF terminations which are commonly expected by instruments
-                self.instrument.read_termination = '\r\n'
-                self.instrument.write_termination = '\r\n'
+                self.instrument.read_termination = TERMINATION
+                self.instrument.write_termination = TERMINATION
+                self._term = TERMINATION.encode("ascii")
                 
                 # Verify connection
                 idn = self.instrument.query("*IDN?").strip()
                 self.idn = idn
                 parts = [p.strip() for p in idn.split(",")]
                 self.model = parts[1] if len(parts) > 1 else "Unknown"
-                logger.info(f"Connected to device: {idn}")
+                self._is_smy02 = "SMY02" in idn.upper()
+                logger.info("Connected to device: %s", idn)
                 return True
             except Exception as e:
-                logger.error(f"Failed to connect: {e}")
+                logger.error("Failed to connect: %s", e)
                 return False
 
     def disconnect(self):
         """Disconnect from the signal generator."""
         with self._io_lock:
+            self._state_snapshot = None
             if self.instrument:
                 self.instrument.close()
                 logger.info("Disconnected from device")
                 self.instrument = None
+                self._is_smy02 = False
+                self._writes_since_check = 0
+                self._winning_cmd.clear()
                 self._fm_initialized = False
                 self._modulation_mode = None
+                self._cached.clear()
 
-    def set_frequency(self, frequency: float) -> bool:
+    def set_frequency(self, frequency: float, force: bool = False) -> bool:
         """
         Set output frequency in Hz.
 
+        Nothing is sent if this frequency is already the last one written.
+
         Args:
             frequency: Frequency in Hz (e.g., 1e9 for 1 GHz)
+            force: Write even if the frequency is unchanged, e.g. after
+                front-panel changes
 
         Returns:
             True if successful, False otherwise
@@ -88,37 +199,45 @@ class SMY02Controller:
             return False
         
         with self._io_lock:
-            cmd = f"RF {int(frequency)}"
-            is_smy02 = "SMY02" in (self.model or "").upper() or "SMY02" in (self.idn or "").upper()
+            if not force and self._cached.get("RF") == float(int(frequency)):
+                return True
+            self._invalidate_state("rf")
             
             try:
-                logger.debug(f"Setting frequency with: {cmd}")
-                self.instrument.write(cmd)
-                sleep(0.05 if is_smy02 else 0.2)
-                if is_smy02:
+                logger.debug("Setting frequency with: RF %d", frequency)
+                self._write(_rf_cmd(int(frequency)), 0.05 if self._is_smy02 else 0.2)
+                if self._is_smy02:
                     # SMY02 can raise transient panel errors if ESR is queried for every RF change.
                     # Use write-only path for stable hopping/sweeps.
-                    logger.info(f"Frequency set to {frequency} Hz")
+                    self._cached["RF"] = float(int(frequency))
+                    logger.debug("Frequency set to %s Hz", frequency)
                     return True
 
-                # Non-SMY02 fallback: keep ESR safety check.
-                esr = self.get_esr()
-                logger.debug(f"*ESR? after RF command: {esr}")
-                if esr is not None and esr == 0:
-                    logger.info(f"Frequency set to {frequency} Hz")
+                # Non-SMY02 fallback: keep ESR safety check, batched over
+                # several writes.
+                self._cached["RF"] = float(int(frequency))
+                self._writes_since_check += 1
+                if self._writes_since_check < self._esr_check_interval:
+                    logger.debug("Frequency set to %s Hz", frequency)
+                    return True
+                if self.flush_and_verify():
+                    logger.debug("Frequency set to %s Hz", frequency)
                     return True
-                logger.error(f"Frequency set failed. ESR: {esr}")
+                logger.error("Frequency set failed")
                 return False
             except Exception as e:
-                logger.error(f"Failed to set frequency: {e}")
+                logger.error("Failed to set frequency: %s", e)
                 return False
 
-    def set_amplitude(self, amplitude: float) -> bool:
+    def set_amplitude(self, amplitude: float, force: bool = False) -> bool:
         """
         Set output amplitude in dBm.
 
+        Nothing is sent if this level is already the last one written.
+
         Args:
             amplitude: Amplitude in dBm
+            force: Write even if the level is unchanged
 
         Returns:
             True if successful, False otherwise
@@ -127,26 +246,30 @@ class SMY02Controller:
             return False
         
         with self._io_lock:
-            cmd = f"LEVEL {amplitude}"
-            is_smy02 = "SMY02" in (self.model or "").upper() or "SMY02" in (self.idn or "").upper()
+            if not force and self._cached.get("LEVEL") == float(amplitude):
+                return True
+            self._invalidate_state("level")
             
             try:
-                logger.debug(f"Setting amplitude with: {cmd}")
-                self.instrument.write(cmd)
-                sleep(0.05 if is_smy02 else 0.2)
-                if is_smy02:
-                    logger.info(f"Amplitude set to {amplitude} dBm")
+                logger.debug("Setting amplitude with: LEVEL %s", amplitude)
+                self._write(_level_cmd(float(amplitude)), 0.05 if self._is_smy02 else 0.2)
+                if self._is_smy02:
+                    self._cached["LEVEL"] = float(amplitude)
+                    logger.debug("Amplitude set to %s dBm", amplitude)
                     return True
 
-                esr = self.get_esr()
-                logger.debug(f"*ESR? after LEVEL command: {esr}")
-                if esr is not None and esr == 0:
-                    logger.info(f"Amplitude set to {amplitude} dBm")
+                self._cached["LEVEL"] = float(amplitude)
+                self._writes_since_check += 1
+                if self._writes_since_check < self._esr_check_interval:
+                    logger.debug("Amplitude set to %s dBm", amplitude)
                     return True
-                logger.error(f"Amplitude set failed. ESR: {esr}")
+                if self.flush_and_verify():
+                    logger.debug("Amplitude set to %s dBm", amplitude)
+                    return True
+                logger.error("Amplitude set failed")
                 return False
             except Exception as e:
-                logger.error(f"Failed to set amplitude: {e}")
+                logger.error("Failed to set amplitude: %s", e)
                 return False
 
     def enable_output(self) -> bool:
@@ -160,27 +283,22 @@ class SMY02Controller:
             return False
         
         with self._io_lock:
+            self._state_snapshot = None
             try:
-                is_smy02 = "SMY02" in (self.model or "").upper() or "SMY02" in (self.idn or "").upper()
                 # For SMY02 prefer strict vendor command only, to avoid generating
                 # extra command errors from unsupported SCPI aliases.
-                candidates = ["OUTP ON"] if is_smy02 else ["OUTP ON", "OUTP:STAT ON", "OUTPON", "LEVEL:ON", "RF:ON"]
+                candidates = ["OUTP ON"] if self._is_smy02 else ["OUTP ON", "OUTP:STAT ON", "OUTPON", "LEVEL:ON", "RF:ON"]
                 last_esr = None
                 for cmd in candidates:
-                    self.clear_status()
-                    sleep(0.1)
-                    logger.debug(f"Sending: {cmd}")
-                    self.instrument.write(cmd)
-                    sleep(0.2)
-
-                    esr = self.get_esr()
+                    logger.debug("Sending: %s", cmd)
+                    esr = self._write_checked(cmd)
                     last_esr = esr
                     if esr is None or esr == 0:
                         logger.info("RF output enabled")
                         return True
                     # On some SMY02 firmware revisions OUTP ON can report command/status
                     # bits despite RF path being enabled; avoid retrying invalid aliases.
-                    if is_smy02 and esr in (32, 53):
+                    if self._is_smy02 and esr in (32, 53):
                         logger.warning("Enable output returned ESR=%s on SMY02; treating as non-fatal", esr)
                         return True
 
@@ -193,10 +311,10 @@ class SMY02Controller:
                     )
                     return True
 
-                logger.error(f"Enable output failed. ESR: {last_esr}")
+                logger.error("Enable output failed. ESR: %s", last_esr)
                 return False
             except Exception as e:
-                logger.error(f"Failed to enable output: {e}")
+                logger.error("Failed to enable output: %s", e)
                 return False
 
     def disable_output(self) -> bool:
@@ -210,28 +328,45 @@ class SMY02Controller:
             return False
         
         with self._io_lock:
+            self._state_snapshot = None
             try:
-                self.clear_status()
-                sleep(0.1)
-                
-                # Send disable commands
-                for cmd in ["OUTP OFF", "LEVEL:OFF"]:
-                    logger.debug(f"Sending: {cmd}")
-                    self.instrument.write(cmd)
-                    sleep(0.15)
-                
+                if self._is_smy02:
+                    # Send disable commands in one write. LEVEL:OFF goes
+                    # first so a rejected OUTP OFF cannot stop the mute.
+                    cmd = "*CLS;LEVEL:OFF;OUTP OFF"
+                    logger.debug("Sending: %s", cmd)
+                    self._write_synced(cmd)
+                else:
+                    # LEVEL:OFF is not standard SCPI; keep it out of the
+                    # OUTP OFF message so a rejection cannot drop the disable.
+                    logger.debug("Sending: OUTP OFF")
+                    esr = self._write_checked("OUTP OFF")
+                    try:
+                        self._write_synced("LEVEL:OFF")
+                    except Exception as e:
+                        logger.debug("LEVEL:OFF failed: %s", e)
+                    if esr != 0:
+                        self._cached.pop("LEVEL", None)
+                        logger.error("Disable output failed. ESR: %s", esr)
+                        return False
+                # LEVEL:OFF mutes; the next level write must go out.
+                self._cached.pop("LEVEL", None)
+
                 logger.info("RF output disabled")
                 return True
             except Exception as e:
-                logger.error(f"Failed to disable output: {e}")
+                logger.error("Failed to disable output: %s", e)
                 return False
 
-    def set_modulation_fm(self, deviation: float = 5000) -> bool:
+    def set_modulation_fm(self, deviation: float = 5000, force: bool = False) -> bool:
         """
         Enable FM modulation with 1 kHz tone.
 
+        Nothing is sent if FM is already on with this deviation.
+
         Args:
             deviation: FM deviation in Hz (default 5 kHz)
+            force: Write even if the deviation is unchanged
 
         Returns:
             True if successful, False otherwise
@@ -240,42 +375,42 @@ class SMY02Controller:
             return False
         
         with self._io_lock:
+            if (not force and self._modulation_mode == "FM"
+                    and self._cached.get("FM") == int(deviation)):
+                return True
+            self._invalidate_state("fm", "af")
             try:
-                is_smy02 = "SMY02" in (self.model or "").upper() or "SMY02" in (self.idn or "").upper()
-                if is_smy02:
+                if self._is_smy02:
                     # Keep command set minimal on SMY02 to avoid front-panel ERR spam.
                     # Initialize tone source once; during hopping only deviation is updated.
+                    # Any setup commands go out in the same write as the deviation.
                     try:
+                        cmds = []
                         if not self._fm_initialized:
-                            for cmd in ["FM:INT 1.000E+3", "AF 1000", "FM:ON"]:
-                                logger.debug(f"Sending (init FM): {cmd}")
-                                self.instrument.write(cmd)
-                                sleep(0.06)
-                            self._fm_initialized = True
+                            cmds += ["FM:INT 1.000E+3", "AF 1000", "FM:ON"]
                         elif self._modulation_mode != "FM":
                             # Ensure we actually switch back from AM to FM.
-                            for cmd in ["AM:OFF", "FM:ON"]:
-                                logger.debug(f"Sending (switch to FM): {cmd}")
-                                self.instrument.write(cmd)
-                                sleep(0.05)
+                            cmds += ["AM:OFF", "FM:ON"]
                         cmd = f"FM {int(deviation)}"
-                        logger.debug(f"Sending (SMY02 deviation): {cmd}")
-                        self.instrument.write(cmd)
-                        sleep(0.06)
+                        if logger.isEnabledFor(logging.DEBUG):
+                            logger.debug("Sending (SMY02 FM): %s", ";".join(cmds + [cmd]))
+                        if cmds:
+                            self._write_synced(";".join(cmds + [cmd]))
+                        else:
+                            self._write(_fm_cmd(int(deviation)), 0.06)
+                        self._fm_initialized = True
                         self._modulation_mode = "FM"
-                        logger.info(f"FM deviation set to {deviation} Hz via '{cmd}'")
+                        self._cached["FM"] = int(deviation)
+                        logger.info("FM deviation set to %s Hz via '%s'", deviation, cmd)
                         return True
                     except Exception as e:
-                        logger.error(f"Failed SMY02 FM set: {e}")
+                        logger.error("Failed SMY02 FM set: %s", e)
                         return False
 
                 # Non-SMY02 fallback with ESR probing.
-                self.clear_status()
-                sleep(0.1)
-                for cmd in ["FM:INT 1.000E+3", "AF 1000"]:
-                    logger.debug(f"Sending: {cmd}")
-                    self.instrument.write(cmd)
-                    sleep(0.15)
+                cmd = "*CLS;FM:INT 1.000E+3;AF 1000"
+                logger.debug("Sending: %s", cmd)
+                self._write_synced(cmd)
                 deviation_cmds = [
                     f"FM {int(deviation)}",
                     f"FM:DEV {int(deviation)}",
@@ -283,21 +418,9 @@ class SMY02Controller:
                     f"FM:DEVIATION {int(deviation)}",
                     f"FM:INT:DEV {int(deviation)}",
                 ]
-                deviation_set = False
-                for cmd in deviation_cmds:
-                    try:
-                        self.clear_status()
-                        sleep(0.05)
-                        logger.debug(f"Trying deviation command: {cmd}")
-                        self.instrument.write(cmd)
-                        sleep(0.15)
-                        esr = self.get_esr()
-                        if esr is None or esr == 0:
-                            deviation_set = True
-                            logger.info(f"FM deviation set to {deviation} Hz via '{cmd}'")
-                            break
-                    except Exception:
-                        continue
+                deviation_set = self._try_commands_with_check(deviation_cmds, key="fm_deviation")
+                if deviation_set:
+                    logger.info("FM deviation set to %s Hz", deviation)
 
                 if not deviation_set:
                     logger.warning(
@@ -305,15 +428,86 @@ class SMY02Controller:
                         deviation
                     )
 
-                self.instrument.write("FM:ON")
-                sleep(0.15)
+                self._write_synced("FM:ON")
                 self._modulation_mode = "FM"
+                if deviation_set:
+                    self._cached["FM"] = int(deviation)
                 logger.info("FM modulation enabled")
                 return True
             except Exception as e:
-                logger.error(f"Failed to set modulation: {e}")
+                logger.error("Failed to set modulation: %s", e)
                 return False
 
+    def apply_hop(
+        self,
+        frequency: Optional[float],
+        amplitude: Optional[float],
+        deviation: Optional[float] = None,
+        force: bool = False,
+    ) -> bool:
+        """
+        Set frequency, level and optionally FM deviation in a single write.
+
+        Commands are joined with ';' so a playlist hop costs one bus
+        transaction, with no status queries in between. If FM has not been
+        set up yet the deviation goes through set_modulation_fm() instead.
+        Parameters passed as None, or equal to the last value written, are
+        left unchanged; if nothing changes nothing is sent.
+
+        Args:
+            frequency: Frequency in Hz, or None to leave it unchanged
+            amplitude: Amplitude in dBm, or None to leave it unchanged
+            deviation: FM deviation in Hz, or None to leave FM unchanged
+            force: Send every parameter given, even if unchanged
+
+        Returns:
+            True if the write succeeded, False otherwise
+        """
+        if not self.instrument:
+            return False
+
+        with self._io_lock:
+            if deviation is not None and (not self._fm_initialized or self._modulation_mode != "FM"):
+                if not self.set_modulation_fm(deviation, force):
+                    return False
+                deviation = None
+
+            cached = self._cached
+            if frequency is not None:
+                frequency = int(frequency)
+                if not force and cached.get("RF") == frequency:
+                    frequency = None
+            if amplitude is not None:
+                amplitude = float(amplitude)
+                if not force and cached.get("LEVEL") == amplitude:
+                    amplitude = None
+            if deviation is not None:
+                deviation = int(deviation)
+                if not force and cached.get("FM") == deviation:
+                    deviation = None
+            if frequency is None and amplitude is None and deviation is None:
+                return True
+            if frequency is not None:
+                self._invalidate_state("rf")
+            if amplitude is not None:
+                self._invalidate_state("level")
+            if deviation is not None:
+                self._invalidate_state("fm")
+            cmd = _hop_cmd(frequency, amplitude, deviation)
+            try:
+                logger.debug("Sending (hop): %r", cmd)
+                self._write(cmd)
+            except Exception as e:
+                logger.error("Failed to apply hop: %s", e)
+                return False
+            if frequency is not None:
+                cached["RF"] = float(frequency)
+            if amplitude is not None:
+                cached["LEVEL"] = amplitude
+            if deviation is not None:
+                cached["FM"] = deviation
+            return True
+
     def set_modulation_am(self) -> bool:
         """
         Enable AM modulation mode.
@@ -324,29 +518,29 @@ class SMY02Controller:
             return False
 
         with self._io_lock:
+            self._state_snapshot = None
             try:
-                is_smy02 = "SMY02" in (self.model or "").upper() or "SMY02" in (self.idn or "").upper()
-                if is_smy02:
-                    for cmd in ["FM:OFF", "AM:ON"]:
-                        logger.debug(f"Sending (SMY02 AM): {cmd}")
-                        self.instrument.write(cmd)
-                        sleep(0.06)
+                if self._is_smy02:
+                    cmd = "FM:OFF;AM:ON"
+                    logger.debug("Sending (SMY02 AM): %s", cmd)
+                    self._write_synced(cmd)
                     self._modulation_mode = "AM"
+                    self._cached.pop("FM", None)
                     logger.info("AM modulation enabled")
                     return True
 
                 # Generic fallback variants for non-SMY02.
                 for cmd in ["FM:OFF", "AM:ON", "AM ON", "AM:STAT ON"]:
                     try:
-                        self.instrument.write(cmd)
-                        sleep(0.08)
+                        self._write(cmd, 0.08)
                     except Exception:
                         continue
                 self._modulation_mode = "AM"
+                self._cached.pop("FM", None)
                 logger.info("AM modulation enabled")
                 return True
             except Exception as e:
-                logger.error(f"Failed to set AM modulation: {e}")
+                logger.error("Failed to set AM modulation: %s", e)
                 return False
 
     def set_lfo_frequency(self, frequency: float) -> bool:
@@ -364,10 +558,10 @@ class SMY02Controller:
             f"SOUR:LFO:FREQ {frequency}",
             f"SOUR:MOD:LFO:FREQ {frequency}",
         ]
-        if not self._try_commands_with_check(candidates):
+        if not self._try_commands_with_check(candidates, key="lfo_frequency"):
             logger.error("Failed to set LFO frequency")
             return False
-        logger.info(f"LFO frequency set to {frequency} Hz")
+        logger.info("LFO frequency set to %s Hz", frequency)
         return True
 
     def enable_lfo(self) -> bool:
@@ -378,7 +572,7 @@ class SMY02Controller:
             True if successful, False otherwise
         """
         candidates = ["LFO:STAT ON", "LFO:STATE ON", "SOUR:LFO:STAT ON", "SOUR:MOD:LFO:STAT ON"]
-        if not self._try_commands_with_check(candidates):
+        if not self._try_commands_with_check(candidates, key="lfo_enable"):
             logger.error("Failed to enable LFO")
             return False
         logger.info("LFO enabled")
@@ -392,32 +586,127 @@ class SMY02Controller:
             True if successful, False otherwise
         """
         candidates = ["LFO:STAT OFF", "LFO:STATE OFF", "SOUR:LFO:STAT OFF", "SOUR:MOD:LFO:STAT OFF"]
-        if not self._try_commands_with_check(candidates):
+        if not self._try_commands_with_check(candidates, key="lfo_disable"):
             logger.error("Failed to disable LFO")
             return False
         logger.info("LFO disabled")
         return True
 
-    def get_frequency(self) -> Optional[float]:
+    def sweep(self, frequencies: List[float], settle: float = 0.05) -> bool:
+        """
+        Step through a list of frequencies as fast as the settle time allows.
+
+        Commands are encoded up front and sent by run_sweep() while the I/O
+        lock is held, so no other thread's traffic lands mid-sweep.
+
+        Args:
+            frequencies: Frequencies in Hz, in step order
+            settle: Minimum time in seconds between steps
+
+        Returns:
+            True if every step was written, False otherwise
+        """
+        if not self.instrument or not frequencies:
+            return False
+        cmds = [_rf_cmd(int(f)) for f in frequencies]
+        with self._io_lock:
+            self._state_snapshot = None
+            self._wait_settled()
+            try:
+                run_sweep(self.instrument.write_raw, cmds, settle)
+            except Exception as e:
+                logger.error("Sweep failed: %s", e)
+                self._cached.pop("RF", None)
+                return False
+            self._pace(settle)
+            self._cached["RF"] = float(int(frequencies[-1]))
+            return True
+
+    def upload_list(self, frequencies: List[float]) -> bool:
+        """
+        Load a frequency list into the instrument and arm bus-triggered stepping.
+
+        After this, each trigger_step() advances the instrument to the next
+        list entry with a single *TRG, so a sweep does not pay for one RF
+        write per hop. The list syntax depends on firmware; the candidates
+        are probed like the LFO commands, starting with an IEEE-488.2
+        definite-length binary block of little-endian uint32 values (4 bytes
+        per entry instead of ~10 in ASCII).
+
+        Args:
+            frequencies: Frequencies in Hz, in step order
+
+        Returns:
+            True if *ESR? read 0 after both the list and the step mode,
+            False otherwise
+        """
+        if not frequencies:
+            return False
+        ints = [int(f) for f in frequencies]
+        values = ",".join(str(f) for f in ints)
+        candidates = [f"SWEEP:FREQ:LIST {values}", f"MEM:SEQ:FREQ {values}"]
+        key = "sweep_list_ascii"
+        # The binary block only holds uint32 values.
+        if all(0 <= f <= 0xFFFFFFFF for f in ints):
+            data = struct.pack(f"<{len(ints)}I", *ints)
+            size = str(len(data))
+            candidates.insert(0, b"SWEEP:FREQ:LIST:BIN #%d%s%s%s" % (len(size), size.encode("ascii"), data, self._term))
+            key = "sweep_list"
+        # The syntax is unconfirmed, so only a definite ESR of 0 counts.
+        if not self._try_commands_with_check(candidates, key=key, strict=True):
+            logger.error("Failed to upload frequency list")
+            return False
+        if not self._try_commands_with_check(["SWEEP:MODE STEP;SWEEP:TRIG:SOUR BUS"], key="sweep_mode", strict=True):
+            logger.error("Failed to arm list stepping")
+            return False
+        # The RF setting now comes from the list.
+        self._cached.pop("RF", None)
+        logger.info("Uploaded %s-entry frequency list", len(frequencies))
+        return True
+
+    def trigger_step(self) -> bool:
+        """
+        Advance an uploaded frequency list by one entry.
+
+        Returns:
+            True if the trigger was sent, False otherwise
+        """
+        if not self.instrument:
+            return False
+        with self._io_lock:
+            self._state_snapshot = None
+            try:
+                self._write("*TRG")
+                return True
+            except Exception as e:
+                logger.error("Failed to trigger list step: %s", e)
+                return False
+
+    def get_frequency(self, force: bool = False) -> Optional[float]:
         """
-        Query current frequency setting.
+        Get current frequency setting.
+
+        Returns the last value written by set_frequency() without bus
+        traffic. Changes made on the front panel are not seen; pass
+        force=True to read the instrument.
+
+        Args:
+            force: Always query the instrument
 
         Returns:
             Frequency in Hz, or None if query fails
         """
+        if not force and "RF" in self._cached:
+            return self._cached["RF"]
         # Prefer the vendor-specific RF? query which returns a formatted string
         with self._io_lock:
             try:
+                self._wait_settled()
                 resp = self.instrument.query("RF?")
                 # Expect something like: 'RF  144.000000E+6'
-                parts = resp.strip().split()
-                for tok in parts:
-                    try:
-                        # try parsing token as float (scientific notation)
-                        val = float(tok)
-                        return val
-                    except Exception:
-                        continue
+                m = _NUM_RE.search(resp)
+                if m:
+                    return float(m.group())
             except Exception:
                 pass
 
@@ -432,23 +721,30 @@ class SMY02Controller:
         logger.error("Failed to get frequency: no response to known queries")
         return None
 
-    def get_amplitude(self) -> Optional[float]:
+    def get_amplitude(self, force: bool = False) -> Optional[float]:
         """
-        Query current amplitude setting.
+        Get current amplitude setting.
+
+        Returns the last value written by set_amplitude() without bus
+        traffic. Changes made on the front panel are not seen; pass
+        force=True to read the instrument.
+
+        Args:
+            force: Always query the instrument
 
         Returns:
             Amplitude in dBm, or None if query fails
         """
+        if not force and "LEVEL" in self._cached:
+            return self._cached["LEVEL"]
         # Prefer vendor-specific LEVEL? response like 'LEVEL  -20.0'
         with self._io_lock:
             try:
+                self._wait_settled()
                 resp = self.instrument.query("LEVEL?")
-                parts = resp.strip().split()
-                for tok in parts:
-                    try:
-                        return float(tok)
-                    except Exception:
-                        continue
+                m = _NUM_RE.search(resp)
+                if m:
+                    return float(m.group())
             except Exception:
                 pass
 
@@ -462,10 +758,14 @@ class SMY02Controller:
         logger.error("Failed to get amplitude: no response to known queries")
         return None
 
-    def get_device_state(self) -> Dict[str, str]:
+    def get_device_state(self, max_age: float = 0.0) -> Dict[str, str]:
         """
         Read current instrument state for GUI display.
 
+        Args:
+            max_age: Reuse the previous read if it is at most this many
+                seconds old; only fields written since are queried again
+
         Returns:
             Dict with keys: rf, level, fm, af
         """
@@ -474,22 +774,38 @@ class SMY02Controller:
             return state
 
         with self._io_lock:
+            snapshot = self._state_snapshot
+            if snapshot is not None and monotonic() - snapshot[0] <= max_age:
+                if not self._state_stale:
+                    return dict(snapshot[1])
+                read_time, state = snapshot[0], dict(snapshot[1])
+                fields = [f for f in _STATE_QUERIES if f in self._state_stale]
+            else:
+                read_time, fields = None, list(_STATE_QUERIES)
             old_timeout = self.instrument.timeout
             try:
                 # Keep GUI state reads snappy.
                 self.instrument.timeout = 1000
-                state["rf"] = self._query_first(["RF?", "FREQ?", "SOUR:FREQ?"]) or "N/A"
-                state["level"] = self._query_first(["LEVEL?", "POW?", "SOUR:POW?"]) or "N/A"
-                state["fm"] = self._query_first(["FM?", "FM:STAT?"]) or "N/A"
-                state["af"] = self._query_first(["AF?", "FM:INT?"]) or "N/A"
+                for field in fields:
+                    state[field] = self._query_first(_STATE_QUERIES[field]) or "N/A"
             except Exception as e:
-                logger.debug(f"Failed to read device state: {e}")
+                logger.debug("Failed to read device state: %s", e)
             finally:
                 self.instrument.timeout = old_timeout
+            self._state_stale.clear()
+            self._state_snapshot = (read_time or monotonic(), dict(state))
         return state
 
+    def _invalidate_state(self, *fields: str):
+        """Mark state fields as changed, or drop the snapshot if none are given."""
+        if fields and self._state_snapshot is not None:
+            self._state_stale.update(fields)
+        else:
+            self._state_snapshot = None
+
     def _query_first(self, queries: List[str]) -> Optional[str]:
         """Return first successful query response, stripped."""
+        self._wait_settled()
         for query in queries:
             try:
                 response = self.instrument.query(query)
@@ -501,24 +817,30 @@ class SMY02Controller:
 
     def reset(self) -> bool:
         """
-        Reset the device to default settings.
+        Clear status and reset the device to default settings.
 
         Returns:
             True if successful, False otherwise
         """
         with self._io_lock:
+            self._state_snapshot = None
             try:
-                self.instrument.write("*RST")
+                # Clear status and reset in one transaction; *OPC? waits
+                # for the reset to finish instead of a fixed sleep.
+                self._write_synced("*CLS;*RST")
+                self._cached.clear()
                 logger.info("Device reset to defaults")
                 return True
             except Exception as e:
-                logger.error(f"Failed to reset device: {e}")
+                logger.error("Failed to reset device: %s", e)
                 return False
 
     def get_esr(self) -> Optional[int]:
         """
         Query the Standard Event Status Register (*ESR?) and return its integer value.
-        Uses a short timeout to prevent hangs.
+        Uses a short timeout to prevent hangs. The reply is at most a few
+        digits, so it is fetched with one bounded read_bytes() call instead
+        of query()'s read loop.
 
         Returns:
             Integer ESR value, or None if query fails/times out
@@ -531,35 +853,167 @@ class SMY02Controller:
                 old_timeout = self.instrument.timeout
                 self.instrument.timeout = 500  # 500 ms timeout
                 try:
-                    resp = self.instrument.query("*ESR?")
-                    val = int(resp.strip().split()[-1])  # Extract numeric value
-                    return val
+                    self._wait_settled()
+                    self.instrument.write_raw(_ESR_QUERY)
+                    resp = self.instrument.read_bytes(16, break_on_termchar=True)
+                    m = _NUM_RE.search(resp.decode("ascii"))
+                    return int(m.group()) if m else None
                 finally:
                     self.instrument.timeout = old_timeout
             except Exception as e:
-                logger.debug(f"*ESR? query failed: {e}")
+                logger.debug("*ESR? query failed: %s", e)
                 return None
 
+    def flush_and_verify(self) -> bool:
+        """
+        Check *ESR? for the setter writes not yet verified.
+
+        set_frequency() and set_amplitude() on non-SMY02 instruments only
+        query *ESR? every _esr_check_interval writes; call this to check
+        the rest, e.g. at the end of a burst. A failed check drops the
+        cached RF/LEVEL values, since any of the unchecked writes may have
+        been rejected.
+
+        Returns:
+            True if no writes were pending or ESR reads 0, False otherwise
+        """
+        if not self.instrument:
+            return False
+        with self._io_lock:
+            if not self._writes_since_check:
+                return True
+            self._writes_since_check = 0
+            esr = self.get_esr()
+            logger.debug("*ESR? after batched writes: %s", esr)
+            if esr is not None and esr == 0:
+                return True
+            logger.error("Batched write check failed. ESR: %s", esr)
+            self._cached.clear()
+            return False
+
+    def get_system_error(self) -> Optional[str]:
+        """
+        Read one entry from the instrument error queue.
+
+        Returns:
+            Error string (e.g. "0,No error"), or None if the query fails
+        """
+        if not self.instrument:
+            return None
+        with self._io_lock:
+            old_timeout = self.instrument.timeout
+            try:
+                self.instrument.timeout = 500
+                return self._query_first(["ERR?", "SYST:ERR?"])
+            finally:
+                self.instrument.timeout = old_timeout
+
+    def get_err_and_esr(self) -> Tuple[Optional[str], Optional[int]]:
+        """
+        Read the error queue and *ESR? in one compound query.
+
+        Falls back to get_system_error() and get_esr() if the compound
+        query fails.
+
+        Returns:
+            (error string, ESR value); either may be None
+        """
+        if not self.instrument:
+            return None, None
+        with self._io_lock:
+            old_timeout = self.instrument.timeout
+            try:
+                self.instrument.timeout = 500
+                self._wait_settled()
+                err, esr = self.instrument.query("ERR?;*ESR?").split(";")
+                return err.strip(), int(_NUM_RE.search(esr).group())
+            except Exception as e:
+                logger.debug("ERR?;*ESR? query failed: %s", e)
+            finally:
+                self.instrument.timeout = old_timeout
+            return self.get_system_error(), self.get_esr()
+
+    def _wait_settled(self):
+        """Block until the settle time started by the last write has elapsed."""
+        remaining = self._next_ready_ts - monotonic()
+        if remaining > 0:
+            sleep(remaining)
+
+    def _pace(self, settle: float):
+        """Start a settle period of `settle` seconds from now."""
+        self._next_ready_ts = monotonic() + settle
+
+    def _write(self, cmd: Union[str, bytes], settle: float = 0.0):
+        """
+        Write a command once the previous write has settled.
+
+        The settle time for this command is not slept here; it only delays
+        the next write or query, so back-to-back hops overlap it with the
+        caller's own work. Bytes are taken as an already terminated wire
+        form. Either way the command goes out through write_raw(), skipping
+        pyvisa's per-call encoding and termination handling in write().
+        """
+        self._wait_settled()
+        if not isinstance(cmd, bytes):
+            cmd = cmd.encode("ascii") + self._term
+        self.instrument.write_raw(cmd)
+        self._pace(settle)
+
+    def _write_synced(self, cmd: str):
+        """
+        Write a command and block on *OPC? until the instrument has processed it.
+
+        Used for mode changes, where waiting for the actual completion is
+        shorter than a worst-case settle time.
+        """
+        self._write(cmd)
+        self.instrument.query("*OPC?")
+
+    def _write_checked(self, cmd: str) -> Optional[int]:
+        """
+        Send *CLS, `cmd` and *ESR? as one compound query.
+
+        One bus transaction instead of clear, write and query round trips;
+        the instrument runs the commands in order, so *ESR? reports on `cmd`.
+        A rejected `cmd` can make the parser discard the rest of the
+        message, so an unanswered query falls back to a standalone get_esr().
+
+        Returns:
+            ESR value after `cmd`, or None if it could not be read
+        """
+        self._wait_settled()
+        try:
+            m = _NUM_RE.search(self.instrument.query(f"*CLS;{cmd};*ESR?"))
+            if m:
+                return int(m.group())
+        except Exception as e:
+            logger.debug("*CLS;%s;*ESR? query failed: %s", cmd, e)
+        return self.get_esr()
+
     def clear_status(self) -> bool:
         """Clear status/error queues on the instrument."""
         if not self.instrument:
             return False
         with self._io_lock:
             try:
-                self.instrument.write("*CLS")
-                sleep(0.05)
+                self._write("*CLS", 0.05)
                 return True
             except Exception as e:
-                logger.debug(f"Failed to clear status: {e}")
+                logger.debug("Failed to clear status: %s", e)
                 return False
 
-    def _try_commands_with_check(self, commands: List[str], verify_queries: Optional[List[str]] = None) -> bool:
+    def _try_commands_with_check(self, commands: List[Union[str, bytes]],
+                                 verify_queries: Optional[List[str]] = None,
+                                 key: Optional[str] = None, strict: bool = False) -> bool:
         """
         Try a list of command candidates and check ESR only (no blocking query verification).
         
         Args:
-            commands: List of commands to try
+            commands: List of commands to try; bytes are sent as-is, see _write()
             verify_queries: Ignored (for backward compatibility)
+            key: Name of the action; the position of the candidate that
+                worked is remembered under it and tried first next time
+            strict: Treat an unreadable ESR as a failure instead of success
         
         Returns True if any command succeeds (ESR = 0)
         """
@@ -567,34 +1021,46 @@ class SMY02Controller:
             return False
 
         with self._io_lock:
-            for cmd in commands:
+            self._state_snapshot = None
+            order = list(range(len(commands)))
+            winner = self._winning_cmd.get(key)
+            if winner is not None and winner < len(commands):
+                order.remove(winner)
+                order.insert(0, winner)
+            for i in order:
+                cmd = commands[i]
                 try:
-                    # clear previous errors
-                    try:
-                        self.clear_status()
-                    except Exception:
-                        pass
-
-                    logger.debug(f"Trying command: {cmd}")
-                    self.instrument.write(cmd)
-                    sleep(0.15)
-
-                    # Only check ESR, never query command values (they can timeout)
-                    esr = self.get_esr()
-                    logger.debug(f"*ESR? after {cmd}: {esr}")
+                    logger.debug("Trying command: %s", cmd)
+                    if isinstance(cmd, bytes):
+                        # Pre-terminated wire form; cannot be compounded.
+                        try:
+                            self.clear_status()
+                        except Exception:
+                            pass
+                        self._write(cmd, 0.15)
+                        esr = self.get_esr()
+                    else:
+                        # Only check ESR, never query command values (they can timeout)
+                        esr = self._write_checked(cmd)
+                    logger.debug("*ESR? after %s: %s", cmd, esr)
 
                     if esr is not None and esr == 0:
-                        logger.debug(f"Command successful: {cmd}")
-                        return True
+                        logger.debug("Command successful: %s", cmd)
+                        if key is not None:
+                            self._winning_cmd[key] = i
                     elif esr is not None:
-                        logger.debug(f"Command '{cmd}' returned ESR={esr}, trying next")
+                        logger.debug("Command '%s' returned ESR=%s, trying next", cmd, esr)
+                        continue
+                    elif strict:
+                        logger.debug("ESR check inconclusive for '%s', trying next", cmd)
                         continue
                     else:
-                        logger.debug(f"ESR check inconclusive for '{cmd}', assuming success")
-                        return True
+                        # Not remembered as the winner: it was never confirmed.
+                        logger.debug("ESR check inconclusive for '%s', assuming success", cmd)
+                    return True
                         
                 except Exception as e:
-                    logger.debug(f"Command {cmd!r} failed with exception: {e}")
+                    logger.debug("Command %r failed with exception: %s", cmd, e)
                     continue
 
         logger.error("All command candidates failed or produced errors")
@@ -608,11 +1074,27 @@ class SMY02Controller:
         Returns:
             List of VISA resource names
         """
-        rm = pyvisa.ResourceManager()
-        devices = rm.list_resources()
-        logger.info(f"Available devices: {devices}")
+        devices = get_rm().list_resources()
+        logger.info("Available devices: %s", devices)
         return list(devices)
 
+    @staticmethod
+    def connect_all(controllers: List["SMY02Controller"]) -> List[bool]:
+        """
+        Connect several controllers at once.
+
+        Each connect() opens its session and reads *IDN? on its own thread,
+        so a multi-instrument setup waits for the slowest device rather than
+        the sum of all of them.
+
+        Returns:
+            connect() result per controller, in the same order
+        """
+        if not controllers:
+            return []
+        with ThreadPoolExecutor(len(controllers)) as pool:
+            return list(pool.map(SMY02Controller.connect, controllers))
+
 
 if __name__ == "__main__":
     # Example usage
@@ -0,0 +1,29 @@
+"""
+Process-wide VISA resource manager cache.
+
+Creating a ResourceManager loads the VISA backend and enumerating resources
+probes every address on every interface; both are slow on NI-VISA. Scripts
+share one manager per process and only enumerate when a listing is actually
+needed.
+"""
+
+import functools
+from typing import Tuple
+
+import pyvisa
+
+
+@functools.lru_cache(maxsize=1)
+def get_rm() -> pyvisa.ResourceManager:
+    """Return the process-wide ResourceManager, creating it on first use."""
+    return pyvisa.ResourceManager()
+
+
+@functools.lru_cache(maxsize=1)
+def known_devices() -> Tuple[str, ...]:
+    """
+    Return the cached result of list_resources().
+
+    Call known_devices.cache_clear() to force a fresh bus scan.
+    """
+    return tuple(get_rm().list_resources())
@@ -0,0 +1,131 @@
+"""
+Per-instrument I/O handler thread.
+
+Each instrument gets its own InstrHandler thread that owns all bus traffic
+for that device. Callers enqueue work and keep going; results are reaped
+later with drain(), so GPIB turnaround time overlaps with the caller's own
+work and with other instruments' handlers.
+"""
+
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class InstrHandler(threading.Thread):
+    """
+    Worker thread that serializes I/O for one instrument.
+
+    Work items put on cmd_q are tuples:
+        ("write", cmd)             -> instrument.write(cmd), result None
+        ("query", cmd)             -> instrument.query(cmd).strip()
+        ("call", func, args)       -> func(*args), e.g. a controller method
+        ("submit", func, args, fut) -> func(*args), resolving fut
+
+    Every item except "submit" produces exactly one (item, result, error)
+    tuple on result_q, in submission order. A "submit" result goes only to
+    its Future.
+    """
+
+    def __init__(self, instrument: Any = None, name: str = "InstrHandler"):
+        """
+        Args:
+            instrument: Opened pyvisa resource used by "write"/"query" items.
+                May be None if only "call" items are submitted.
+            name: Thread name, shown in logs
+        """
+        super().__init__(name=name, daemon=True)
+        self.instrument = instrument
+        self.cmd_q: queue.Queue = queue.Queue()
+        self.result_q: queue.Queue = queue.Queue()
+
+    def run(self):
+        while True:
+            item = self.cmd_q.get()
+            try:
+                if item is _STOP:
+                    return
+                if item[0] == "submit":
+                    self._resolve(item)
+                    continue
+                try:
+                    result = self._execute(item)
+                    self.result_q.put((item, result, None))
+                except Exception as e:
+                    logger.debug("%s: %r failed: %s", self.name, item, e)
+                    self.result_q.put((item, None, e))
+            finally:
+                self.cmd_q.task_done()
+
+    @staticmethod
+    def _resolve(item: Tuple):
+        _, func, args, future = item
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(func(*args))
+        except Exception as e:
+            logger.debug("%r failed: %s", func, e)
+            future.set_exception(e)
+
+    def _execute(self, item: Tuple) -> Any:
+        kind = item[0]
+        if kind == "write":
+            self.instrument.write(item[1])
+            return None
+        if kind == "query":
+            return self.instrument.query(item[1]).strip()
+        if kind == "call":
+            func, args = item[1], item[2]
+            return func(*args)
+        raise ValueError(f"Unknown handler item: {kind!r}")
+
+    def write(self, cmd: str):
+        """Enqueue a write."""
+        self.cmd_q.put(("write", cmd))
+
+    def query(self, cmd: str):
+        """Enqueue a query; the response is returned by drain()."""
+        self.cmd_q.put(("query", cmd))
+
+    def call(self, func: Callable, *args):
+        """Enqueue func(*args) to run on the handler thread."""
+        self.cmd_q.put(("call", func, args))
+
+    def submit(self, func: Callable, *args) -> Future:
+        """
+        Enqueue func(*args) and return a Future for its result.
+
+        Nothing is put on result_q, so a caller that does not need the
+        result can drop the Future, e.g. to fire off hops back to back.
+        """
+        future = Future()
+        self.cmd_q.put(("submit", func, args, future))
+        return future
+
+    def drain(self) -> List[Tuple[Tuple, Any, Any]]:
+        """
+        Wait until every queued item has run and return their results.
+
+        Returns:
+            List of (item, result, error) tuples in submission order;
+            error is the raised exception or None.
+        """
+        self.cmd_q.join()
+        results = []
+        while True:
+            try:
+                results.append(self.result_q.get_nowait())
+            except queue.Empty:
+                return results
+
+    def stop(self, timeout: float = 5.0):
+        """Finish queued work, then end the thread."""
+        self.cmd_q.put(_STOP)
+        self.join(timeout)
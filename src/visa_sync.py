@@ -0,0 +1,23 @@
+"""
+Synchronized writes for the instrument scripts.
+
+Scripts wait for each command to be processed with *OPC? instead of
+sleeping a fixed time after it. Their command sets are small and fixed, so
+the wire forms are encoded once and sent with write_raw().
+"""
+
+import functools
+
+
+@functools.lru_cache(maxsize=256)
+def _wire(cmd: str, termination: str) -> bytes:
+    """Wire form of a command: encoded, with the write termination."""
+    return (cmd + termination).encode("ascii")
+
+
+def sync_write(instr, cmd: str) -> None:
+    """Write a command and block on *OPC? until the instrument has processed it."""
+    term = instr.write_termination
+    instr.write_raw(_wire(cmd, term))
+    instr.write_raw(_wire("*OPC?", term))
+    instr.read()
@@ -13,6 +13,7 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from smy02_controller import SMY02Controller
+from visa_handler import InstrHandler
 
 
 class TestSMY02Controller(unittest.TestCase):
@@ -66,7 +67,7 @@ class TestSMY02Controller(unittest.TestCase):
         result = self.controller.enable_output()
 
         self.assertTrue(result)
-        mock_instrument.write.assert_called_with("OUTP ON")
+        mock_instrument.query.assert_called_with("*CLS;OUTP ON;*ESR?")
 
     @patch('pyvisa.ResourceManager')
     def test_list_available_devices(self, mock_rm):
@@ -82,6 +83,249 @@ class TestSMY02Controller(unittest.TestCase):
 
         self.assertEqual(len(devices), 2)
 
+    @patch('pyvisa.ResourceManager')
+    def test_get_system_error(self, mock_rm):
+        """Test reading the error queue."""
+        mock_instrument = MagicMock()
+        mock_instrument.query.return_value = "0,No error\r\n"
+        self.controller.instrument = mock_instrument
+
+        self.assertEqual(self.controller.get_system_error(), "0,No error")
+        mock_instrument.query.assert_called_with("ERR?")
+
+    @patch('pyvisa.ResourceManager')
+    def test_get_err_and_esr(self, mock_rm):
+        """Test reading error queue and ESR in one compound query."""
+        mock_instrument = MagicMock()
+        mock_instrument.query.return_value = "0,No error;ESR 32\r\n"
+        self.controller.instrument = mock_instrument
+
+        self.assertEqual(self.controller.get_err_and_esr(), ("0,No error", 32))
+        mock_instrument.query.assert_called_once_with("ERR?;*ESR?")
+
+    @patch('pyvisa.ResourceManager')
+    def test_get_frequency_uses_cached_value(self, mock_rm):
+        """Test that a written frequency is read back without a query unless forced."""
+        mock_instrument = MagicMock()
+        mock_instrument.query.return_value = "RF  100.000000E+6"
+        self.controller.instrument = mock_instrument
+        self.controller._is_smy02 = True
+
+        self.controller.set_frequency(144e6)
+
+        self.assertEqual(self.controller.get_frequency(), 144e6)
+        mock_instrument.query.assert_not_called()
+        self.assertEqual(self.controller.get_frequency(force=True), 100e6)
+
+    @patch('pyvisa.ResourceManager')
+    def test_set_frequency_writes_raw_command(self, mock_rm):
+        """Test that SMY02 frequency writes send the terminated wire form."""
+        mock_instrument = MagicMock()
+        self.controller.instrument = mock_instrument
+        self.controller._is_smy02 = True
+
+        self.assertTrue(self.controller.set_frequency(144e6))
+        mock_instrument.write_raw.assert_called_once_with(b"RF 144000000\r\n")
+        mock_instrument.write.assert_not_called()
+
+    @patch('pyvisa.ResourceManager')
+    def test_esr_checked_once_per_interval(self, mock_rm):
+        """Test that non-SMY02 setters batch the *ESR? check."""
+        mock_instrument = MagicMock()
+        mock_instrument.read_bytes.return_value = b"0\r\n"
+        self.controller.instrument = mock_instrument
+        self.controller._esr_check_interval = 3
+
+        for hz in (1e8, 2e8):
+            self.assertTrue(self.controller.set_frequency(hz))
+        mock_instrument.read_bytes.assert_not_called()
+
+        self.assertTrue(self.controller.set_frequency(3e8))
+        mock_instrument.write_raw.assert_called_with(b"*ESR?\r\n")
+        mock_instrument.read_bytes.assert_called_once()
+
+        self.controller.set_amplitude(-20)
+        mock_instrument.read_bytes.return_value = b"32\r\n"
+        self.assertFalse(self.controller.flush_and_verify())
+        self.assertEqual(self.controller._cached, {})
+
+    @patch('pyvisa.ResourceManager')
+    def test_apply_hop_single_write(self, mock_rm):
+        """Test that a hop sends RF, LEVEL and FM in one write."""
+        mock_instrument = MagicMock()
+        self.controller.instrument = mock_instrument
+        self.controller._fm_initialized = True
+        self.controller._modulation_mode = "FM"
+
+        result = self.controller.apply_hop(144e6, -20.0, 6250)
+
+        self.assertTrue(result)
+        mock_instrument.write_raw.assert_called_once_with(b"RF 144000000;LEVEL -20.0;FM 6250\r\n")
+        mock_instrument.query.assert_not_called()
+
+    @patch('pyvisa.ResourceManager')
+    def test_apply_hop_skips_unchanged(self, mock_rm):
+        """Test that None parameters are left out of the hop write."""
+        mock_instrument = MagicMock()
+        self.controller.instrument = mock_instrument
+
+        self.controller.apply_hop(None, -30.0)
+        mock_instrument.write_raw.assert_called_once_with(b"LEVEL -30.0\r\n")
+
+        mock_instrument.reset_mock()
+        self.assertTrue(self.controller.apply_hop(None, None))
+        mock_instrument.write_raw.assert_not_called()
+
+    @patch('pyvisa.ResourceManager')
+    def test_apply_hop_sends_only_changes(self, mock_rm):
+        """Test that values equal to the last write are not resent."""
+        mock_instrument = MagicMock()
+        self.controller.instrument = mock_instrument
+        self.controller._fm_initialized = True
+        self.controller._modulation_mode = "FM"
+
+        self.controller.apply_hop(144e6, -20.0, 6250)
+        mock_instrument.reset_mock()
+        self.assertTrue(self.controller.apply_hop(145e6, -20.0, 6250))
+        mock_instrument.write_raw.assert_called_once_with(b"RF 145000000\r\n")
+
+        mock_instrument.reset_mock()
+        self.controller.apply_hop(145e6, -20.0, 6250, force=True)
+        mock_instrument.write_raw.assert_called_once_with(b"RF 145000000;LEVEL -20.0;FM 6250\r\n")
+
+    @patch('pyvisa.ResourceManager')
+    def test_candidate_winner_tried_first(self, mock_rm):
+        """Test that the command alias that worked is tried first next time."""
+        mock_instrument = MagicMock()
+        mock_instrument.query.side_effect = ["32", "0"]
+        self.controller.instrument = mock_instrument
+
+        self.assertTrue(self.controller.enable_lfo())
+
+        mock_instrument.reset_mock()
+        mock_instrument.query.side_effect = ["0"]
+        self.assertTrue(self.controller.enable_lfo())
+        mock_instrument.query.assert_called_once_with("*CLS;LFO:STATE ON;*ESR?")
+
+    @patch('pyvisa.ResourceManager')
+    def test_unanswered_check_falls_back_to_esr(self, mock_rm):
+        """Test that a dropped fused *ESR? is re-read and never recorded as a winner."""
+        mock_instrument = MagicMock()
+        mock_instrument.query.side_effect = RuntimeError("timeout")
+        mock_instrument.read_bytes.return_value = b""
+        self.controller.instrument = mock_instrument
+
+        self.assertTrue(self.controller.enable_lfo())
+        mock_instrument.write_raw.assert_called_with(b"*ESR?\r\n")
+        self.assertNotIn("lfo_enable", self.controller._winning_cmd)
+
+        mock_instrument.read_bytes.return_value = b"0\r\n"
+        self.assertTrue(self.controller.enable_lfo())
+        self.assertIn("lfo_enable", self.controller._winning_cmd)
+
+    @patch('pyvisa.ResourceManager')
+    def test_upload_list_needs_confirmed_esr(self, mock_rm):
+        """Test that upload_list fails on unreadable ESR and skips the binary block out of range."""
+        mock_instrument = MagicMock()
+        mock_instrument.query.side_effect = RuntimeError("timeout")
+        mock_instrument.read_bytes.return_value = b""
+        self.controller.instrument = mock_instrument
+        self.controller._cached["RF"] = 144e6
+
+        self.assertFalse(self.controller.upload_list([144e6, 2 ** 32]))
+        mock_instrument.write_raw.assert_called_with(b"*ESR?\r\n")
+        self.assertEqual(self.controller._cached["RF"], 144e6)
+
+    @patch('pyvisa.ResourceManager')
+    def test_sweep_writes_each_step(self, mock_rm):
+        """Test that a sweep sends one pre-encoded RF write per step, in order."""
+        mock_instrument = MagicMock()
+        self.controller.instrument = mock_instrument
+
+        self.assertTrue(self.controller.sweep([144e6, 145e6], settle=0))
+
+        self.assertEqual(
+            [c.args[0] for c in mock_instrument.write_raw.call_args_list],
+            [b"RF 144000000\r\n", b"RF 145000000\r\n"],
+        )
+        self.assertEqual(self.controller.get_frequency(), 145e6)
+
+    @patch('pyvisa.ResourceManager')
+    def test_get_device_state_max_age(self, mock_rm):
+        """Test that a recent state read is reused until a setting is written."""
+        mock_instrument = MagicMock()
+        mock_instrument.query.return_value = "RF  144.000000E+6"
+        self.controller.instrument = mock_instrument
+
+        self.controller.get_device_state()
+        calls = mock_instrument.query.call_count
+        self.controller.get_device_state(max_age=60)
+        self.assertEqual(mock_instrument.query.call_count, calls)
+
+        self.controller.set_amplitude(-20)
+        self.controller.get_device_state(max_age=60)
+        self.assertGreater(mock_instrument.query.call_count, calls)
+
+    @patch('pyvisa.ResourceManager')
+    def test_get_device_state_requeries_written_field(self, mock_rm):
+        """Test that only the field a setter changed is queried again."""
+        mock_instrument = MagicMock()
+        mock_instrument.query.return_value = "RF  144.000000E+6"
+        self.controller.instrument = mock_instrument
+        self.controller._is_smy02 = True
+
+        self.controller.get_device_state()
+        mock_instrument.query.reset_mock()
+        self.controller.set_frequency(145e6)
+        self.controller.get_device_state(max_age=60)
+        mock_instrument.query.assert_called_once_with("RF?")
+
+
+class TestInstrHandler(unittest.TestCase):
+    """Test cases for InstrHandler."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.instrument = MagicMock()
+        self.instrument.query.return_value = "144000000\r\n"
+        self.handler = InstrHandler(self.instrument)
+        self.handler.start()
+
+    def tearDown(self):
+        self.handler.stop()
+
+    def test_drain_returns_results_in_order(self):
+        """Test that queued items run in order and drain collects them."""
+        self.handler.write("RF 144000000")
+        self.handler.query("RF?")
+        self.handler.call(lambda x: x * 2, 21)
+
+        results = self.handler.drain()
+
+        self.assertEqual([r[1] for r in results], [None, "144000000", 42])
+        self.instrument.write.assert_called_with("RF 144000000")
+
+    def test_errors_are_reported_not_raised(self):
+        """Test that a failing item reports its exception and later items still run."""
+        self.instrument.write.side_effect = RuntimeError("timeout")
+        self.handler.write("RF 1")
+        self.handler.query("RF?")
+
+        results = self.handler.drain()
+
+        self.assertIsInstance(results[0][2], RuntimeError)
+        self.assertEqual(results[1][1], "144000000")
+
+    def test_submit_resolves_future(self):
+        """Test that submitted calls resolve their Future and skip result_q."""
+        self.instrument.write.side_effect = RuntimeError("timeout")
+        ok = self.handler.submit(lambda x: x + 1, 41)
+        failed = self.handler.submit(self.instrument.write, "RF 1")
+
+        self.assertEqual(ok.result(timeout=5), 42)
+        self.assertIsInstance(failed.exception(timeout=5), RuntimeError)
+        self.assertEqual(self.handler.drain(), [])
+
 
 if __name__ == "__main__":
     unittest.main()